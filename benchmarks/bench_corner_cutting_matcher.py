@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark the compiled corner-cutting matcher against the original per-pattern loop.
+
+Generates a synthetic tree of Python files in memory, scans it with both
+implementations, checks that they find exactly the same issues and prints
+the time each one took.
+
+Usage:
+    python benchmarks/bench_corner_cutting_matcher.py --files 2000 --lines 200
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from typing import Any, Dict, List
+
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+from utils.reports.corner_cutting.matcher import PatternMatcher
+from utils.reports.corner_cutting.run_command import LAZY_WORDS_FILE
+
+
+CODE_LINES = [
+    "import os",
+    "def handler(event, context):",
+    "    value = compute(event['key'])",
+    "    if value is None:",
+    "        return {}",
+    "    for item in items:",
+    "        total += item.price * item.quantity",
+    "    logger.info(f\"processed {len(items)} items\")",
+    "class Repository:",
+    "    \"\"\"Stores records in the database.\"\"\"",
+    "        self.session.commit()",
+    "",
+]
+
+
+def build_patterns() -> Dict[str, List[Dict[str, str]]]:
+    """
+    Build a pattern set from the shipped lazy words list plus a few regex patterns.
+    """
+    with open(LAZY_WORDS_FILE, 'r') as f:
+        phrases = json.load(f)["lazy_words_and_phrases"]
+
+    return {
+        "Lazy Words and Phrases": [
+            {"pattern": rf"\b{re.escape(phrase)}\b", "description": f"Uses '{phrase}'"}
+            for phrase in phrases
+        ],
+        "Placeholders": [
+            {"pattern": r"\b(TODO|FIXME|XXX)\b", "description": "Unfinished work"},
+            {"pattern": r"raise NotImplementedError", "description": "Not implemented"},
+            {"pattern": r"^\s*pass\s*$", "description": "Empty block"},
+        ],
+    }
+
+
+def build_files(files: int, lines: int, hit_rate: float, phrases: List[str], seed: int) -> Dict[str, str]:
+    """
+    Generate the contents of a synthetic tree, injecting a phrase into some comments.
+    """
+    rng = random.Random(seed)
+    tree = {}
+    for file_index in range(files):
+        content = []
+        for _ in range(lines):
+            line = rng.choice(CODE_LINES)
+            if rng.random() < hit_rate:
+                line += f"  # {rng.choice(phrases)} until the real service exists"
+            content.append(line)
+        tree[f"pkg_{file_index // 100}/module_{file_index}.py"] = '\n'.join(content)
+    return tree
+
+
+def legacy_scan(content: str, relative_path: str, patterns: Dict[str, List[Dict[str, str]]]) -> List[Dict[str, Any]]:
+    """
+    The original scanner: every pattern is searched on every line.
+    """
+    issues = []
+    for category, category_patterns in patterns.items():
+        for pattern_info in category_patterns:
+            pattern = pattern_info['pattern']
+            description = pattern_info['description']
+            for i, line in enumerate(content.split('\n')):
+                if re.search(pattern, line, re.IGNORECASE):
+                    issues.append({
+                        "file": relative_path,
+                        "line": i + 1,
+                        "category": category,
+                        "pattern": pattern,
+                        "message": description,
+                        "snippet": line.strip()
+                    })
+    return issues
+
+
+def main() -> None:
+    """
+    Run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the corner-cutting matcher.")
+    parser.add_argument("--files", type=int, default=2000, help="Number of files to generate (default: 2000)")
+    parser.add_argument("--lines", type=int, default=200, help="Lines per file (default: 200)")
+    parser.add_argument("--hit-rate", type=float, default=0.02, help="Fraction of lines with a phrase (default: 0.02)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    patterns = build_patterns()
+    phrases = [info["description"][6:-1] for info in patterns["Lazy Words and Phrases"]]
+    tree = build_files(args.files, args.lines, args.hit_rate, phrases, args.seed)
+
+    start = time.perf_counter()
+    legacy_issues = [issue for path, content in tree.items() for issue in legacy_scan(content, path, patterns)]
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matcher = PatternMatcher(patterns)
+    matcher_issues = [
+        matcher.to_issue(hit, path)
+        for path, content in tree.items()
+        for hit in matcher.scan(content)
+    ]
+    matcher_seconds = time.perf_counter() - start
+
+    if matcher_issues != legacy_issues:
+        raise SystemExit("The matcher and the original loop found different issues.")
+
+    results = {
+        "files": args.files,
+        "lines": args.files * args.lines,
+        "patterns": len(matcher.patterns),
+        "issues": len(matcher_issues),
+        "legacy_seconds": round(legacy_seconds, 4),
+        "matcher_seconds": round(matcher_seconds, 4),
+        "speedup": round(legacy_seconds / matcher_seconds, 1),
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"Scanned {results['lines']} lines in {results['files']} files for {results['patterns']} patterns "
+              f"({results['issues']} issues)")
+        print(f"  original loop:     {legacy_seconds:.3f} seconds")
+        print(f"  compiled matcher:  {matcher_seconds:.3f} seconds ({results['speedup']}x faster)")
+
+
+if __name__ == "__main__":
+    main()
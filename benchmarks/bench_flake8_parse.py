@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark parsing structured flake8 output against the original split(':', 3) loop.
+
+Generates the same synthetic violations in flake8's default format and in the
+structured format, parses each with its parser, checks that they find the same
+issues and prints the time each one took. The structured output is parsed both
+as a whole and line by line, as --stream feeds it while flake8 runs.
+
+Usage:
+    python benchmarks/bench_flake8_parse.py --issues 50000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+from utils.reports.flake8.parse_output import FIELD_SEPARATOR, Flake8OutputParser, parse_output
+
+
+MESSAGES = [
+    ("E501", "line too long (112 > 79 characters)"),
+    ("W291", "trailing whitespace"),
+    ("F401", "'os.path' imported but unused"),
+    ("E302", "expected 2 blank lines, found 1"),
+    ("E231", "missing whitespace after ':'"),
+    ("F841", "local variable 'result' is assigned to but never used"),
+]
+
+
+def build_violations(issues: int, files: int, windows_paths: bool, seed: int) -> List[tuple]:
+    """
+    Generate synthetic violations as (path, row, col, code, text) tuples.
+    """
+    rng = random.Random(seed)
+    root = "C:\\project\\" if windows_paths else "./"
+    separator = "\\" if windows_paths else "/"
+    return [
+        (f"{root}pkg_{index % files // 100}{separator}module_{index % files}.py",
+         rng.randint(1, 2000), rng.randint(1, 120), *rng.choice(MESSAGES))
+        for index in range(issues)
+    ]
+
+
+def legacy_parse_output(output: str) -> List[Dict[str, Any]]:
+    """
+    The original parser: each line is split on ":".
+    """
+    issues = []
+    for line in output.strip().split('\n'):
+        if not line:
+            continue
+        try:
+            parts = line.split(':', 3)
+            if len(parts) >= 4:
+                code_message = parts[3].strip().split(' ', 1)
+                issues.append({
+                    "file": parts[0],
+                    "line": parts[1],
+                    "column": parts[2],
+                    "error_code": code_message[0] if len(code_message) > 0 else "",
+                    "message": code_message[1] if len(code_message) > 1 else ""
+                })
+            else:
+                issues.append({"message": line})
+        except Exception:
+            issues.append({"message": line})
+    return issues
+
+
+def main() -> None:
+    """
+    Run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the structured flake8 parser.")
+    parser.add_argument("--issues", type=int, default=50000, help="Number of violations to generate (default: 50000)")
+    parser.add_argument("--files", type=int, default=700, help="Number of files the violations are spread over (default: 700)")
+    parser.add_argument("--windows-paths", action="store_true", help="Generate Windows-style paths with drive letters")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of runs to take the fastest of (default: 5)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    violations = build_violations(args.issues, args.files, args.windows_paths, args.seed)
+    default_output = "".join(f"{path}:{row}:{col}: {code} {text}\n" for path, row, col, code, text in violations)
+    structured_output = "".join(
+        FIELD_SEPARATOR.join([path, str(row), str(col), code, text]) + "\n"
+        for path, row, col, code, text in violations
+    )
+
+    structured_lines = structured_output.splitlines()
+
+    legacy_seconds = structured_seconds = streamed_seconds = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        legacy_issues = legacy_parse_output(default_output)
+        legacy_seconds = min(legacy_seconds, time.perf_counter() - start)
+
+        results = SimpleNamespace()
+        start = time.perf_counter()
+        parse_output(structured_output, results)
+        structured_seconds = min(structured_seconds, time.perf_counter() - start)
+
+        streamed_results = SimpleNamespace()
+        start = time.perf_counter()
+        stream_parser = Flake8OutputParser()
+        for line in structured_lines:
+            stream_parser.feed(line)
+        parse_output(stream_parser, streamed_results)
+        streamed_seconds = min(streamed_seconds, time.perf_counter() - start)
+
+    expected = [
+        {"file": path, "line": str(row), "column": str(col), "error_code": code, "message": text}
+        for path, row, col, code, text in violations
+    ]
+    if results.issues != expected or streamed_results.issues != expected:
+        raise SystemExit("The structured parser did not find the generated issues.")
+
+    results_json = {
+        "issues": args.issues,
+        "windows_paths": args.windows_paths,
+        "legacy_misparsed": sum(issue != expected_issue for issue, expected_issue in zip(legacy_issues, expected)),
+        "legacy_seconds": round(legacy_seconds, 4),
+        "structured_seconds": round(structured_seconds, 4),
+        "speedup": round(legacy_seconds / structured_seconds, 1),
+        "streamed_seconds": round(streamed_seconds, 4),
+        "streamed_speedup": round(legacy_seconds / streamed_seconds, 1),
+    }
+
+    if args.json:
+        print(json.dumps(results_json, indent=2))
+    else:
+        print(f"Parsed {args.issues} flake8 violations")
+        print(f"  split(':', 3) loop: {legacy_seconds:.3f} seconds ({results_json['legacy_misparsed']} issues misparsed)")
+        print(f"  structured format:  {structured_seconds:.3f} seconds ({results_json['speedup']}x faster)")
+        print(f"  streamed lines:     {streamed_seconds:.3f} seconds ({results_json['streamed_speedup']}x faster)")
+
+
+if __name__ == "__main__":
+    main()
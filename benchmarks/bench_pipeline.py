@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark the whole pipeline of every collector on a synthetic project.
+
+Generates a project with a given number of modules and tests, and injects a given
+number of flake8 violations, mypy errors and corner-cutting phrases. Each collector
+then runs on it the way main.py runs it, and the time of every stage is recorded:
+run_command, parse_output and format_report from Collector.run, and the whole of
+RunTestsAndSaveTheirResults._generate_reports (which calls format_report again).
+
+Everything runs offline. The unit tests run in a virtual environment created with
+`python -m venv --without-pip`, and collectors whose tool is not installed are skipped.
+Results are printed, or written with --output, as JSON so runs can be compared across commits.
+
+Usage:
+    python benchmarks/bench_pipeline.py --files 200 --tests 400 --flake8-violations 1000 --output bench.json
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+from unittest.mock import patch
+
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+from configs import Configs
+from main import RunTestsAndSaveTheirResults, create_results
+from reports.collector import Collector
+from reports.registry import COLLECTOR_PACKAGES, load_collector_resources
+from utils.common.enumerate_project_files import clear_enumeration_cache
+from utils.reports.corner_cutting import run_command as corner_cutting_run_command
+
+
+# Tools each collector needs on the PATH. The others only need Python.
+REQUIRED_TOOLS = {"mypy": "mypy", "flake8": "flake8"}
+
+# One of each is injected in turn, with the code that makes flake8 report it.
+FLAKE8_VIOLATIONS = [
+    "value_{n} = 'this line is far too long for flake8, which allows at most seventy-nine characters'",
+    "import os as unused_{n}",
+    "trailing_{n} = {n}    ",
+]
+
+CORNER_CUTTING_LINE = "# {phrase}"
+
+
+def build_project(root: Path, files: int, tests: int, flake8_violations: int, mypy_errors: int,
+                  corner_cutting: int, seed: int) -> Dict[str, int]:
+    """
+    Write a synthetic project of files modules in pkg/ and tests test methods in tests/.
+
+    Returns:
+        Dict[str, int]: The number of lines of code and tests written
+    """
+    rng = random.Random(seed)
+    phrases = json.loads(corner_cutting_run_command.LAZY_WORDS_FILE.read_text())["lazy_words_and_phrases"]
+
+    # Spread the injected lines over the modules at random.
+    injected: List[List[str]] = [[] for _ in range(files)]
+    for n in range(flake8_violations):
+        injected[rng.randrange(files)].append(FLAKE8_VIOLATIONS[n % len(FLAKE8_VIOLATIONS)].format(n=n))
+    for n in range(mypy_errors):
+        injected[rng.randrange(files)].append(f"wrong_type_{n}: int = 'not an int'")
+    for n in range(corner_cutting):
+        injected[rng.randrange(files)].append(CORNER_CUTTING_LINE.format(phrase=rng.choice(phrases)))
+
+    (root / "pkg").mkdir()
+    (root / "pkg" / "__init__.py").write_text("")
+    lines = 0
+    for index in range(files):
+        # Imports go first, so flake8 only reports them as unused and not also as E402.
+        imports = [line for line in injected[index] if line.startswith("import ")]
+        content = [
+            *imports,
+            f'"""Synthetic module {index}."""',
+            "",
+            "",
+            f"def add_{index}(value: int) -> int:",
+            f'    """Return value plus {index}."""',
+            f"    return value + {index}",
+            "",
+            "",
+            f"def scale_{index}(values: list[int]) -> list[int]:",
+            f'    """Return every value times {index}."""',
+            f"    return [value * {index} for value in values]",
+            "",
+            "",
+            *(line for line in injected[index] if not line.startswith("import ")),
+        ]
+        (root / "pkg" / f"module_{index}.py").write_text("\n".join(content) + "\n")
+        lines += len(content)
+
+    (root / "tests").mkdir()
+    (root / "tests" / "__init__.py").write_text("")
+    test_files = max(1, min(files, tests // 10 or 1))
+    for file_index in range(test_files):
+        content = ["import unittest", "", f"from pkg.module_{file_index} import add_{file_index}", "", "",
+                   f"class TestModule{file_index}(unittest.TestCase):"]
+        for test_index in range(file_index, tests, test_files):
+            content += [
+                "",
+                f"    def test_add_{test_index}(self):",
+                f"        self.assertEqual(add_{file_index}({test_index}), {test_index + file_index})",
+            ]
+        (root / "tests" / f"test_module_{file_index}.py").write_text("\n".join(content) + "\n")
+    return {"lines": lines, "test_files": test_files}
+
+
+def timed(function: Callable[..., Any], seconds: List[float]) -> Callable[..., Any]:
+    """
+    Wrap a function so the wall time of each call is appended to seconds.
+    """
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            seconds.append(time.perf_counter() - start)
+    return wrapper
+
+
+def run_collector(name: str, configs: Configs) -> Dict[str, Any]:
+    """
+    Run one collector on the project and return the time of each of its stages.
+    """
+    stages: Dict[str, List[float]] = {"run_command": [], "parse_output": [], "format_report": []}
+    resources = load_collector_resources(name, create_results)
+    for stage, seconds in stages.items():
+        resources[stage] = timed(resources[stage], seconds)
+
+    collector = Collector(configs=configs, resources=resources)
+    runner = RunTestsAndSaveTheirResults(configs, {"collectors": [collector]})
+    clear_enumeration_cache()
+
+    start = time.perf_counter()
+    collector.run()
+    run_seconds = time.perf_counter() - start
+
+    # format_report is only called by the report generation.
+    format_calls = len(stages["format_report"])
+    start = time.perf_counter()
+    runner._generate_reports(collector)
+    generate_seconds = time.perf_counter() - start
+
+    return {
+        "run_command": sum(stages["run_command"]),
+        "parse_output": sum(stages["parse_output"]),
+        "format_report": sum(stages["format_report"][format_calls:]),
+        "collector_run": run_seconds,
+        "generate_reports": generate_seconds,
+        "issues": len(collector.results.issues) + len(collector.results.corner_cutting),
+        "tests": collector.results.tests,
+        "status": collector.results.status,
+    }
+
+
+def main() -> None:
+    """
+    Run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark every collector on a synthetic project.")
+    parser.add_argument("--files", type=int, default=100, help="Number of modules to generate (default: 100)")
+    parser.add_argument("--tests", type=int, default=200, help="Number of test methods to generate (default: 200)")
+    parser.add_argument("--flake8-violations", type=int, default=300, help="Number of flake8 violations to inject (default: 300)")
+    parser.add_argument("--mypy-errors", type=int, default=100, help="Number of mypy errors to inject (default: 100)")
+    parser.add_argument("--corner-cutting", type=int, default=100, help="Number of corner-cutting phrases to inject (default: 100)")
+    parser.add_argument("--collectors", nargs="+", choices=list(COLLECTOR_PACKAGES), default=list(COLLECTOR_PACKAGES),
+                        help="Collectors to benchmark (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs per collector (default: 3)")
+    parser.add_argument("--warm", action="store_true",
+                        help="Keep the reports directory and tool caches between runs instead of starting each run cold")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--output", type=Path, default=None, help="Write the JSON results to this file instead of printing them")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir) / "project"
+        root.mkdir()
+        sizes = build_project(root, args.files, args.tests, args.flake8_violations, args.mypy_errors,
+                              args.corner_cutting, args.seed)
+
+        # The test virtual environment only needs the standard library, so no packages are installed.
+        venv_path = Path(temp_dir) / "venv"
+        subprocess.run([sys.executable, "-m", "venv", "--without-pip", str(venv_path)], check=True)
+
+        results_json: Dict[str, Any] = {
+            "python": sys.version.split()[0],
+            "commit": subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                     cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip(),
+            "parameters": {key: value for key, value in vars(args).items() if key != "output"},
+            "project": sizes,
+            "collectors": {},
+        }
+
+        with patch.dict(os.environ, {"TEST_VENV_PATH": str(venv_path)}):
+            for name in args.collectors:
+                tool = REQUIRED_TOOLS.get(name)
+                if tool and shutil.which(tool) is None:
+                    results_json["collectors"][name] = {"skipped": f"{tool} is not installed"}
+                    continue
+
+                runs = []
+                for _ in range(args.repeat):
+                    if not args.warm:
+                        shutil.rmtree(root / "test_reports", ignore_errors=True)
+                        shutil.rmtree(root / ".mypy_cache", ignore_errors=True)
+                    configs = Configs(test_dir=root / "tests", reports_dir=root / "test_reports",
+                                      respect_gitignore=False, verbosity=1, unittest_timeout=None,
+                                      regression_window=0)
+                    runs.append(run_collector(name, configs))
+
+                stages = ("run_command", "parse_output", "format_report", "collector_run", "generate_reports")
+                results_json["collectors"][name] = {
+                    "issues": runs[-1]["issues"],
+                    "tests": runs[-1]["tests"],
+                    "status": runs[-1]["status"],
+                    "stages": {
+                        stage: {
+                            "median_seconds": round(statistics.median(run[stage] for run in runs), 4),
+                            "min_seconds": round(min(run[stage] for run in runs), 4),
+                        }
+                        for stage in stages
+                    },
+                }
+
+    output = json.dumps(results_json, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+        print(f"Wrote {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
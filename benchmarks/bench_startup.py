@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark the startup time of the CLI.
+
+Times fresh interpreters that run `main.py --help` and that import main and load
+the flake8 collector, which is all the startup work of `--flake8` before flake8
+itself runs. Each scenario is also run once with `-X importtime` to list the
+modules that took longest to import. Exits with status 1 if the median time of
+a scenario is over its budget.
+
+Usage:
+    python benchmarks/bench_startup.py --repeat 20 --help-budget-ms 150 --flake8-budget-ms 200
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    "help": [os.path.join(ROOT_DIR, "main.py"), "--help"],
+    "flake8": [
+        "-c",
+        f"import sys; sys.path.insert(0, {ROOT_DIR!r}); import main; "
+        "main.load_collector_resources('flake8', main.create_results)",
+    ],
+}
+
+
+def time_scenario(args: List[str], repeat: int, cwd: str) -> List[float]:
+    """
+    Return the wall time in seconds of each of repeat fresh interpreters running args.
+    """
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], capture_output=True, check=True, cwd=cwd)
+        seconds.append(time.perf_counter() - start)
+    return seconds
+
+
+def slowest_imports(args: List[str], cwd: str, count: int) -> List[Dict[str, Any]]:
+    """
+    Return the modules with the highest cumulative import time, from `python -X importtime`.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], capture_output=True, text=True, check=True, cwd=cwd)
+    imports: List[Dict[str, Any]] = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        # Only top-level imports, so nested modules are not counted twice.
+        if module.startswith(" ") and not module.startswith("  "):
+            imports.append({"module": module.strip(), "self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000})
+    return sorted(imports, key=lambda entry: entry["cumulative_ms"], reverse=True)[:count]
+
+
+def main() -> None:
+    """
+    Run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the startup time of the CLI.")
+    parser.add_argument("--repeat", type=int, default=10, help="Number of interpreters to time per scenario (default: 10)")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports to list per scenario (default: 10)")
+    parser.add_argument("--help-budget-ms", type=float, default=None, help="Fail if --help takes longer than this")
+    parser.add_argument("--flake8-budget-ms", type=float, default=None, help="Fail if the --flake8 startup takes longer than this")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    budgets = {"help": args.help_budget_ms, "flake8": args.flake8_budget_ms}
+    results_json: Dict[str, Any] = {"python": sys.version.split()[0], "scenarios": {}}
+    over_budget = []
+
+    # An empty working directory, so the timed runs do not find or write anything of this repository's.
+    with tempfile.TemporaryDirectory() as cwd:
+        for name, scenario_args in SCENARIOS.items():
+            seconds = time_scenario(scenario_args, args.repeat, cwd)
+            median_ms = statistics.median(seconds) * 1000
+            results_json["scenarios"][name] = {
+                "median_ms": round(median_ms, 1),
+                "min_ms": round(min(seconds) * 1000, 1),
+                "budget_ms": budgets[name],
+                "slowest_imports": slowest_imports(scenario_args, cwd, args.top),
+            }
+            if budgets[name] is not None and median_ms > budgets[name]:
+                over_budget.append(name)
+
+    if args.json:
+        print(json.dumps(results_json, indent=2))
+    else:
+        for name, scenario in results_json["scenarios"].items():
+            budget = f" (budget {scenario['budget_ms']:.0f} ms)" if scenario["budget_ms"] is not None else ""
+            print(f"{name}: median {scenario['median_ms']:.1f} ms, min {scenario['min_ms']:.1f} ms{budget}")
+            for entry in scenario["slowest_imports"]:
+                print(f"  {entry['cumulative_ms']:8.1f} ms  {entry['module']}")
+
+    if over_budget:
+        print(f"Over budget: {', '.join(over_budget)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
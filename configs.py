@@ -1,13 +1,15 @@
 from dataclasses import dataclass
 from functools import cached_property
 from pathlib import Path
-from typing import Any, Optional
-
-
-import pathspec
+from typing import TYPE_CHECKING, Any, Optional
 
 
 from utils.common.load_gitignore_patterns_if_needed import load_gitignore_patterns_if_needed
+from utils.common.report_files import PUBLISH_MODES, report_suffix
+
+# pathspec is only imported when .gitignore patterns are loaded.
+if TYPE_CHECKING:
+    import pathspec
 
 
 @dataclass
@@ -21,12 +23,62 @@ class Configs:
         respect_gitignore: Whether to ignore files matching gitignore patterns
         verbosity: Level of detail in test output
         gitignore_spec: PathSpec object containing gitignore patterns (set in post_init)
+        jobs: Number of collectors to run concurrently (1 runs them one after another)
+        unittest_shards: Number of processes to split the unittest suite across
+        mypy_daemon: Whether to run mypy through the mypy daemon (dmypy)
+        corner_cutting_cache: Whether to reuse corner-cutting issues for unchanged files
+        corner_cutting_hash_contents: Whether to also compare file contents when mtime or size changed
+        corner_cutting_workers: Number of processes to scan files for corner-cutting with
+        unittest_fork_server: Whether to run the tests in children forked from a server that keeps the project's dependencies imported
+        unittest_events: Whether to run the tests with the event runner and read per-test events instead of parsing the text output
+        flake8_structured: Whether to run flake8 with a machine-readable --format instead of its default one
+        changed_since: Optional git ref. If set, flake8 and mypy only check the files changed since it
+        test_impact: Whether to only run the test modules that import a file changed since the last run (or since changed_since)
+        test_impact_full_run_every: With test_impact, run the whole suite at least once every this many runs (0 to never)
+        unittest_timeout: Seconds the unit tests may run for before their processes are stopped, or None for no limit
+        mypy_timeout: Seconds mypy may run for before it is stopped, or None for no limit
+        flake8_timeout: Seconds flake8 may run for before it is stopped, or None for no limit
+        result_cache: Whether to reuse the results of a collector whose input files, tool version and settings are unchanged
+        report_format: How JSON reports are written: "pretty" (indented), "compact" or "jsonl" (JSON Lines)
+        report_compression: Optional compression of the JSON reports, "gzip" or "xz"
+        publish_latest: How the latest_* reports are published from the timestamped ones: "hardlink", "symlink" or "copy"
+        history: Whether to append every collector's results to the SQLite run history in the reports directory
+        regression_window: Number of past reports the baseline timings of performance regression detection are built from (0 to turn it off)
+        regression_threshold: Number of scaled median absolute deviations above its baseline median a timing must be to be flagged as a regression
+        stream: Whether to parse tool output line by line while the tools run, instead of after they exit
+        profile: Whether to profile each phase of every collector with cProfile, writing .pstats files and a summary to the reports directory
+        trace: Whether to record a span for each phase of every collector and write them as a Chrome trace event file to the reports directory
     """
     test_dir: Path
     reports_dir: Path
     respect_gitignore: bool
     verbosity: int
-    gitignore_spec: Optional[pathspec.PathSpec] = None
+    gitignore_spec: Optional["pathspec.PathSpec"] = None
+    jobs: int = 1
+    unittest_shards: int = 1
+    mypy_daemon: bool = False
+    corner_cutting_cache: bool = True
+    corner_cutting_hash_contents: bool = False
+    corner_cutting_workers: int = 1
+    unittest_events: bool = True
+    unittest_fork_server: bool = False
+    flake8_structured: bool = True
+    changed_since: Optional[str] = None
+    test_impact: bool = False
+    test_impact_full_run_every: int = 10
+    result_cache: bool = False
+    unittest_timeout: Optional[float] = 30.0
+    mypy_timeout: Optional[float] = None
+    flake8_timeout: Optional[float] = None
+    report_format: str = "pretty"
+    report_compression: Optional[str] = None
+    publish_latest: str = "hardlink"
+    history: bool = False
+    regression_window: int = 20
+    regression_threshold: float = 3.0
+    stream: bool = False
+    profile: bool = False
+    trace: bool = False
 
     @cached_property
     def ROOT_DIR(self) -> Path:
@@ -43,6 +95,23 @@ class Configs:
         if not self.reports_dir.exists():
             self.reports_dir.mkdir(parents=True, exist_ok=True)
 
+        if self.jobs < 1:
+            raise ValueError(f"jobs must be at least 1, got {self.jobs}.")
+
+        if self.unittest_shards < 1:
+            raise ValueError(f"unittest_shards must be at least 1, got {self.unittest_shards}.")
+
+        if self.corner_cutting_workers < 1:
+            raise ValueError(f"corner_cutting_workers must be at least 1, got {self.corner_cutting_workers}.")
+
+        # Raises a ValueError for an unsupported format or compression.
+        report_suffix(self.report_format, self.report_compression)
+        if self.publish_latest not in PUBLISH_MODES:
+            raise ValueError(f"publish_latest must be one of {', '.join(PUBLISH_MODES)}, got {self.publish_latest}.")
+
+        if self.regression_window < 0:
+            raise ValueError(f"regression_window must be at least 0, got {self.regression_window}.")
+
         self.gitignore_spec = load_gitignore_patterns_if_needed(self.respect_gitignore, self.reports_dir)
 
     def __getitem__(self, item: str) -> Any:
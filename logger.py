@@ -1,6 +1,7 @@
 import logging
-from logging.handlers import RotatingFileHandler
 import os
+import threading
+from typing import Any, Optional
 
 
 def get_logger(name: str,
@@ -33,9 +34,11 @@ def get_logger(name: str,
     console_handler = logging.StreamHandler()
 
     # Create 'logs' directory in the current working directory if it doesn't exist
-    logs_dir = os.path.join(os.getcwd(), 'logs')
+    logs_dir = get_logs_dir()
     os.makedirs(logs_dir, exist_ok=True)
 
+    # logging.handlers is slow to import, and only needed once a logger is set up
+    from logging.handlers import RotatingFileHandler
     log_file_path = os.path.join(logs_dir, log_file_name)
     file_handler = RotatingFileHandler(log_file_path, maxBytes=max_size, backupCount=backup_count)
 
@@ -51,4 +54,36 @@ def get_logger(name: str,
 
     return logger
 
-logger = get_logger(__name__)
+
+def get_logs_dir() -> str:
+    """Returns the directory log files are written to: 'logs' in the current working directory."""
+    return os.path.join(os.getcwd(), 'logs')
+
+
+class LazyLogger:
+    """Logger that is only set up by get_logger when it is first used.
+
+    Importing this module then neither creates the 'logs' directory nor opens
+    a log file, so commands that never log, such as --help, start faster.
+
+    Args:
+        name: Name of the logger.
+        **kwargs: Other arguments for get_logger.
+    """
+
+    def __init__(self, name: str, **kwargs: Any) -> None:
+        self._name = name
+        self._kwargs = kwargs
+        self._logger: Optional[logging.Logger] = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, attr: str) -> Any:
+        if self._logger is None:
+            # Collectors running in threads may log at the same time.
+            with self._lock:
+                if self._logger is None:
+                    self._logger = get_logger(self._name, **self._kwargs)
+        return getattr(self._logger, attr)
+
+
+logger = LazyLogger(__name__)
@@ -5,11 +5,12 @@ Main CLI entry point for running tests and generating reports.
 """
 import argparse
 from datetime import datetime
-import json
 import os
 import sys
+import time
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Any, Callable
+from typing import TYPE_CHECKING, Any, ContextManager
 
 
 # Add local utils to path if needed
@@ -17,42 +18,41 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 
 from configs import Configs
-from logger import logger
+from logger import get_logs_dir, logger
 
 from reports.collector import Collector
-from reports.services.flake8 import Flake8Collector
-from reports.services.mypy import MyPyCollector
-from reports.services.corner_cutting import CornerCuttingCollector
+from reports.registry import load_collector_resources
+from utils.common.enumerate_project_files import clear_enumeration_cache
+from utils.common.report_files import (
+    JSON_REPORT_SUFFIXES, PUBLISH_MODES, REPORT_COMPRESSIONS, REPORT_FORMATS,
+    atomic_path, publish_report, report_suffix, write_report,
+)
 
-# Import utility functions for collector resources
-from utils.reports.unittest.run_command import run_command as unittest_run_command
-from utils.reports.unittest.parse_output import parse_output as unittest_parse_output
-from utils.reports.unittest.format_report import format_report as unittest_format_report
-
-from utils.reports.flake8.run_command import run_command as flake8_run_command
-from utils.reports.flake8.parse_output import parse_output as flake8_parse_output
-from utils.reports.flake8.format_report import format_report as flake8_format_report
-
-from utils.reports.mypy.run_command import run_command as mypy_run_command
-from utils.reports.mypy.parse_output import parse_output as mypy_parse_output
-from utils.reports.mypy.format_report import format_report as mypy_format_report
-
-from utils.reports.corner_cutting.run_command import run_command as corner_cutting_run_command
-from utils.reports.corner_cutting.parse_output import parse_output as corner_cutting_parse_output
-from utils.reports.corner_cutting.format_report import format_report as corner_cutting_format_report
+# Only imported when the features that need them are turned on, to keep startup fast.
+if TYPE_CHECKING:
+    from utils.common.history_store import HistoryStore
+    from utils.common.profile_phases import PhaseProfiler
+    from utils.common.result_cache import ResultCache
+    from utils.common.trace_events import Tracer
 
 
 class RunTestsAndSaveTheirResults:
 
     def __init__(self, 
                  configs: Configs = None, 
-                 resources: dict[str, Callable] = None
+                 resources: dict[str, Any] = None
                  ) -> None:
         self.configs = configs
         self.resources = resources
 
         self.reports_dir: Path = self.configs.reports_dir
         self.collectors: list[Collector] = self.resources["collectors"]
+        self.timings: dict[str, float] = {}
+        self.result_cache: "ResultCache | None" = None
+        self.cache_keys: dict[str, str | None] = {}
+        self.history: "HistoryStore | None" = None
+        self.profiler: "PhaseProfiler | None" = None
+        self.tracer: "Tracer | None" = None
         self._validate_collector_attributes()
 
 
@@ -76,55 +76,280 @@ class RunTestsAndSaveTheirResults:
                     raise AttributeError(f"Collector {collector} results does not have '{attr}' attribute")
 
 
-    def _generate_reports(self, collector: Any) -> None:
+    def _generate_reports(self, collector: Any) -> list[Path]:
         """
         Generate both JSON and Markdown reports of the linting results.
+
+        Returns:
+            list[Path]: The timestamped JSON and markdown reports, then the latest ones
         """
         name = collector.name
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-
-        paths = [
-            f"{name}_report_{timestamp}.json",
-            f"{name}_report_{timestamp}.md",
-            f"latest_{name}_report.json",
-            f"latest_{name}_report.md"
+        report_format = getattr(self.configs, "report_format", "pretty")
+        json_suffix = report_suffix(report_format, getattr(self.configs, "report_compression", None))
+
+        json_path = self.reports_dir / f"{name}_report_{timestamp}{json_suffix}"
+        markdown_path = self.reports_dir / f"{name}_report_{timestamp}.md"
+
+        # Render and write each report once
+        write_report(collector.results.to_dict(), json_path, report_format)
+        markdown = '\n'.join(collector.generate_markdown_report())
+        with atomic_path(markdown_path) as temp_path:
+            with open(temp_path, 'w') as f:
+                f.write(markdown)
+
+        # then publish it as the latest report without writing it again.
+        publish_mode = getattr(self.configs, "publish_latest", "hardlink")
+        latest_paths = [
+            self.reports_dir / f"latest_{name}_report{json_suffix}",
+            self.reports_dir / f"latest_{name}_report.md",
         ]
+        for source, latest in zip((json_path, markdown_path), latest_paths):
+            publish_report(source, latest, publish_mode)
+        paths = [json_path, markdown_path, *latest_paths]
 
-        for path in paths:
-            path = self.reports_dir / path
-            match path.suffix:
-                case ".json":
-                    with open(path, 'w') as f:
-                        json.dump(collector.results.to_dict(), f, indent=2)
-                case ".md":
-                    # Write the markdown file
-                    with open(path, 'w') as f:
-                        f.write('\n'.join(collector.generate_markdown_report()))
-                case _:
-                    raise ValueError(f"Unsupported file type: {path.suffix}")
+        # A latest report in another format would be stale from now on.
+        for suffix in JSON_REPORT_SUFFIXES:
+            if suffix != json_suffix:
+                (self.reports_dir / f"latest_{name}_report{suffix}").unlink(missing_ok=True)
 
         logger.info(f"\n{name} reports generated in {self.reports_dir}:")
         for path in paths:
-            logger.info(f"{self.reports_dir / path}")
+            logger.info(f"{path}")
+        return paths
 
 
-    def run(self) -> int:
+    def _compute_cache_keys(self) -> None:
         """
-        Run the specified tests and generate reports.
+        Compute the result cache key of every collector before any of them runs.
         """
+        if not getattr(self.configs, "result_cache", False):
+            return
+
+        from utils.common.result_cache import ResultCache
+        self.result_cache = ResultCache(self.reports_dir)
         for collector in self.collectors:
-            name = collector.name
+            self.cache_keys[collector.name] = self.result_cache.key(collector.name, self.configs)
+
+
+    def _store_cache_entry(self, collector: Any) -> None:
+        """
+        Record the cache key the collector's latest report was written for.
+        """
+        if self.result_cache is not None:
+            self.result_cache.store(collector.name, self.cache_keys.get(collector.name), collector.results.status)
+
+
+    def _record_history(self, collector: Any) -> None:
+        """
+        Append the collector's results to the run history database.
+        """
+        if self.history is not None:
+            self.history.record(collector.results)
+
+
+    def _run_collector(self, collector: Any) -> bool:
+        """
+        Run a single collector, or restore its cached results, and record its wall time.
+        """
+        start = time.perf_counter()
+        with self._span(collector, "collector") as span:
+            try:
+                if self.result_cache is not None:
+                    report = self.result_cache.lookup(collector.name, self.cache_keys.get(collector.name))
+                    if report is not None:
+                        logger.info(f"{collector.name}: result cache hit, restoring the results of the last run")
+                        return collector.restore_results(report)
+                    logger.info(f"{collector.name}: result cache miss")
+                return collector.run()
+            finally:
+                elapsed = time.perf_counter() - start
+                self.timings[collector.name] = elapsed
+                collector.results.wall_time = round(elapsed, 3)
+                span["status"] = collector.results.status
+                span["cached"] = collector.results.cached
+
+
+    def _detect_regressions(self, collector: Any) -> None:
+        """
+        Compare the collector's timings against those of its earlier runs, then add them to the timings file.
+        """
+        from utils.common.detect_regressions import detect_regressions, record_timings
+        window = getattr(self.configs, "regression_window", 0)
+        regressions = detect_regressions(
+            collector.results, self.reports_dir,
+            window=window,
+            threshold=getattr(self.configs, "regression_threshold", 3.0),
+        )
+        record_timings(collector.results, self.reports_dir, window)
+        collector.results.performance_regressions = regressions
+        for regression in regressions:
+            logger.warning(
+                f"{collector.name}: {regression['kind']} {regression['name']} took {regression['duration']:.2f} seconds, "
+                f"{regression['slowdown']:.2f}x its median of {regression['median']:.2f} seconds over {regression['samples']} runs"
+            )
+
+
+    def _span(self, collector: Any, name: str) -> ContextManager[dict[str, Any]]:
+        """
+        Record a span of the collector with --trace, or do nothing without it.
+        """
+        if self.tracer is None:
+            return nullcontext({})
+        return self.tracer.span(name, collector=collector.name if collector is not None else None)
+
+
+    def _profile_phase(self, collector: Any, phase: str) -> ContextManager[None]:
+        """
+        Profile a phase of the collector with --profile, or do nothing without it.
+        """
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.phase(collector.name, phase)
+
+
+    def _finish_collector(self, collector: Any, tests_were_successful: bool) -> None:
+        """
+        Log, compare, write and record the results of a finished collector.
+        """
+        self._log_collector_result(collector, tests_were_successful)
+        with self._span(collector, "detect_regressions"):
+            self._detect_regressions(collector)
+        with self._span(collector, "generate_reports") as span, self._profile_phase(collector, "generate_reports"):
+            paths = self._generate_reports(collector)
+            if self.tracer is not None:
+                span["bytes"] = sum(path.stat().st_size for path in paths[:2])
+        with self._span(collector, "store_cache_entry"):
+            self._store_cache_entry(collector)
+        with self._span(collector, "record_history"):
+            self._record_history(collector)
+
+
+    def _write_trace(self, timestamp: str) -> None:
+        """
+        Write the --trace timeline of the run to the reports directory and publish it as the latest trace.
+        """
+        if self.tracer is None:
+            return
+        from utils.common.trace_events import TRACE_FILE_PREFIX
+        path = self.reports_dir / f"{TRACE_FILE_PREFIX}_{timestamp}.json"
+        latest_path = self.reports_dir / f"latest_{TRACE_FILE_PREFIX}.json"
+        self.tracer.write(path)
+        publish_report(path, latest_path, getattr(self.configs, "publish_latest", "hardlink"))
+        logger.info(f"\nTrace written to {path}, open it in chrome://tracing or https://ui.perfetto.dev")
+
+
+    def _write_profiles(self, timestamp: str) -> None:
+        """
+        Write the --profile output of every collector to the reports directory.
+        """
+        if self.profiler is None:
+            return
+        paths = self.profiler.write(self.reports_dir, timestamp)
+        logger.info(f"\nProfiles written in {self.reports_dir}:")
+        for path in paths:
+            logger.info(f"{path}")
 
-            logger.info(f"\n==== Running {name} ====")
 
-            tests_were_successful = collector.run()
+    def _log_collector_result(self, collector: Any, tests_were_successful: bool) -> None:
+        """
+        Log the outcome and wall time of a finished collector.
+        """
+        name = collector.name
+        if tests_were_successful:
+            logger.info(f"\n✅ All {name} tests passed!")
+        elif collector.results.status == "timed_out":
+            logger.info(f"\n⏱️ {name} timed out after {collector.results.timeout} seconds. Reporting what finished until then.")
+        else:
+            logger.info(f"\n❌ Tests {name} failed with {collector.results.errors} errors and {collector.results.failures} failures.")
+        logger.info(f"{name} finished in {self.timings[name]:.2f} seconds.")
+
 
-            if tests_were_successful:
-                logger.info(f"\n✅ All {name} tests passed!")
-            else:
-                logger.info(f"\n❌ Tests {name} failed with {collector.results.errors} errors and {collector.results.failures} failures.")
+    def run(self) -> int:
+        """
+        Run the specified tests and generate reports.
 
-            self._generate_reports(collector)
+        With more than one job, the collectors run in a thread pool, since each one
+        mostly waits on its own subprocess. Results are still logged and written in
+        collector order so the output is the same as a serial run.
+
+        A collector that raises is logged and left out, and the others are still reported.
+
+        Returns:
+            int: The exit status, 1 if any collector raised and 0 otherwise
+        """
+        start = time.perf_counter()
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        jobs = min(self.configs.jobs, len(self.collectors)) or 1
+
+        if getattr(self.configs, "trace", False):
+            from utils.common.trace_events import Tracer
+            self.tracer = Tracer()
+            for collector in self.collectors:
+                collector.tracer = self.tracer
+
+        # Every collector in this run shares one walk of the project.
+        clear_enumeration_cache()
+        with self._span(None, "compute_cache_keys"):
+            self._compute_cache_keys()
+        if getattr(self.configs, "history", False):
+            from utils.common.history_store import HISTORY_FILE, HistoryStore
+            self.history = HistoryStore(self.reports_dir / HISTORY_FILE)
+        if getattr(self.configs, "profile", False):
+            from utils.common.profile_phases import PhaseProfiler
+            self.profiler = PhaseProfiler()
+            for collector in self.collectors:
+                self.profiler.instrument(collector)
+            # cProfile profiles one thread at a time.
+            if jobs > 1:
+                logger.info("--profile runs the collectors one at a time")
+                jobs = 1
+
+        crashed = []
+        if jobs == 1:
+            for collector in self.collectors:
+                logger.info(f"\n==== Running {collector.name} ====")
+
+                try:
+                    tests_were_successful = self._run_collector(collector)
+                except Exception as e:
+                    logger.exception(f"{collector.name} failed to run: {e}")
+                    crashed.append(collector.name)
+                    continue
+                self._finish_collector(collector, tests_were_successful)
+        else:
+            names = ", ".join(collector.name for collector in self.collectors)
+            logger.info(f"\n==== Running {names} with {jobs} jobs ====")
+
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                futures = [executor.submit(self._run_collector, collector) for collector in self.collectors]
+
+                # Wait in submission order so logs and reports stay deterministic.
+                for collector, future in zip(self.collectors, futures):
+                    try:
+                        tests_were_successful = future.result()
+                    except Exception as e:
+                        logger.exception(f"{collector.name} failed to run: {e}")
+                        crashed.append(collector.name)
+                        continue
+
+                    logger.info(f"\n==== {collector.name} ====")
+                    self._finish_collector(collector, tests_were_successful)
+
+        if self.result_cache is not None:
+            self.result_cache.save()
+        if self.history is not None:
+            self.history.close()
+            self.history = None
+        self._write_profiles(timestamp)
+        self._write_trace(timestamp)
+
+        logger.info(f"\nTotal wall time: {time.perf_counter() - start:.2f} seconds.")
+        if crashed:
+            logger.error(f"{', '.join(crashed)} failed to run. See the errors above.")
+            return 1
+        return 0
 
 # results.py
 from dataclasses import dataclass, field
@@ -148,10 +373,39 @@ class Results:
     skipped: int = 0
     expected_failures: int = 0
     unexpected_successes: int = 0
+    wall_time: float = 0.0
+    cached: bool = False
+
+    # timeout attributes, set when the tool ran for longer than its time budget
+    timed_out: bool = False
+    timeout: float | None = None
+    unfinished_tests: list = field(default_factory=list)
+
+    # performance regressions against the timings of earlier runs
+    performance_regressions: list = field(default_factory=list)
+
+    # partial run attributes, set when only the files changed since a git ref were checked,
+    # or only the tests affected by changed files were run
+    partial: bool = False
+    changed_since: str = ""
+    checked_files: list = field(default_factory=list)
+    skipped_unaffected: list = field(default_factory=list)
+
+    # unittest attributes
+    test_durations: dict = field(default_factory=dict)
+    # status of each test by id, when the output names them. Kept for the history, not written to the report.
+    test_statuses: dict = field(default_factory=dict)
+
+    # corner cutting attributes
+    corner_cutting: list = field(default_factory=list)
+    total_files_scanned: int = 0
+    files_from_cache: int = 0
+    files_rescanned: int = 0
+    total_potential_instances: int = 0
 
     def to_dict(self):
         """Convert results to a dictionary."""
-        return {
+        report = {
             "summary": {
                 "name": self.name,
                 "errors": self.errors,
@@ -160,6 +414,7 @@ class Results:
                 "status": self.status,
                 "timestamp": self.timestamp,
                 "duration": self.duration,
+                "wall_time": self.wall_time,
                 "success_rate": self.success_rate
             },
             "details": {
@@ -167,6 +422,54 @@ class Results:
                 "issues": self.issues
             }
         }
+        if self.cached:
+            report["summary"]["cached"] = True
+        if self.timed_out:
+            report["summary"].update({"timed_out": True, "timeout": self.timeout})
+            if self.name == "unittest":
+                report["details"]["unfinished_tests"] = self.unfinished_tests
+        if self.performance_regressions:
+            report["summary"]["performance_regressions"] = len(self.performance_regressions)
+            report["details"]["performance_regressions"] = self.performance_regressions
+        if self.partial:
+            report["summary"].update({
+                "partial": True,
+                "changed_since": self.changed_since,
+                "checked_files": len(self.checked_files),
+            })
+            report["details"]["checked_files"] = self.checked_files
+            if self.name == "unittest":
+                report["summary"]["skipped_unaffected"] = len(self.skipped_unaffected)
+                report["details"]["skipped_unaffected"] = self.skipped_unaffected
+        if self.name == "unittest":
+            report["summary"].update({
+                "skipped": self.skipped,
+                "expected_failures": self.expected_failures,
+                "unexpected_successes": self.unexpected_successes,
+            })
+            report["details"]["test_durations"] = self.test_durations
+        if self.name == "corner_cutting":
+            report["summary"].update({
+                "total_files_scanned": self.total_files_scanned,
+                "files_from_cache": self.files_from_cache,
+                "files_rescanned": self.files_rescanned,
+                "total_potential_instances": self.total_potential_instances,
+            })
+            report["details"]["corner_cutting"] = self.corner_cutting
+        return report
+
+    def update_from_dict(self, report: dict) -> None:
+        """Restore results from a dictionary written by to_dict."""
+        summary, details = report["summary"], report["details"]
+        for name in ("errors", "failures", "tests", "status", "timestamp", "duration", "wall_time", "success_rate",
+                     "skipped", "expected_failures", "unexpected_successes", "partial", "changed_since", "timed_out", "timeout",
+                     "total_files_scanned", "files_from_cache", "files_rescanned", "total_potential_instances"):
+            if name in summary:
+                setattr(self, name, summary[name])
+        for name in ("test_cases", "issues", "checked_files", "skipped_unaffected", "unfinished_tests", "test_durations",
+                     "corner_cutting"):
+            if name in details:
+                setattr(self, name, details[name])
 
 def create_results(name: str) -> Results:
     """Factory function for creating result objects."""
@@ -174,6 +477,61 @@ def create_results(name: str) -> Results:
     results.name = name
     return results
 
+def build_collectors(configs: Configs, names: list[str]) -> list[Collector]:
+    """
+    Create a fresh collector, with empty results, for each of the named collectors.
+
+    Args:
+        configs: Configuration dataclass of the run
+        names: Names of the collectors, in the order they run
+
+    Returns:
+        list[Collector]: The collectors
+    """
+    return [Collector(configs=configs, resources=load_collector_resources(name, create_results)) for name in names]
+
+
+def watch(configs: Configs, names: list[str], interval: float) -> None:
+    """
+    Run the collectors, then keep rerunning the ones affected by each burst of file changes.
+
+    The process stays resident between runs, so modules are only imported once, and the
+    result cache, scan caches and mypy daemon in the reports directory stay warm.
+    Runs until interrupted.
+
+    Args:
+        configs: Configuration dataclass of the runs
+        names: Names of the selected collectors, in the order they run
+        interval: Seconds between polls of the project's files
+    """
+    from utils.common.watch_project import ProjectWatcher, collectors_for_changes
+
+    project_dir = configs.test_dir.parent.resolve()
+    test_dir = os.path.relpath(configs.test_dir.resolve(), project_dir)
+    watcher = ProjectWatcher(
+        project_dir,
+        configs.gitignore_spec if configs.respect_gitignore else None,
+        ignored_dirs=(configs.reports_dir, Path(get_logs_dir())),
+    )
+
+    rerun = names
+    while True:
+        try:
+            RunTestsAndSaveTheirResults(configs, {"collectors": build_collectors(configs, rerun)}).run()
+        except Exception as e:
+            # A failed run must not end the watch.
+            logger.exception(f"Error: {e}")
+
+        logger.info(f"\n==== Watching {project_dir} for changes (Ctrl+C to stop) ====")
+        while True:
+            changed = watcher.wait_for_changes(interval)
+            rerun = collectors_for_changes(changed, test_dir, names)
+            if rerun:
+                break
+            logger.info(f"{len(changed)} files changed, none of them checked by {', '.join(names)}")
+        logger.info(f"{len(changed)} files changed: rerunning {', '.join(rerun)}")
+
+
 def main() -> None:
     """
     Main entry point for the CLI.
@@ -201,6 +559,63 @@ def main() -> None:
                         help="Run only type checking and linting (no tests)")
     parser.add_argument("--respect-gitignore", "--gitignore", action="store_true",
                        help="Ignore files/folders listed in .gitignore during linting")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Number of collectors to run concurrently (default: 1)")
+    parser.add_argument("--shards", type=int, default=1,
+                        help="Number of processes to split the unittest suite across (default: 1)")
+    parser.add_argument("--mypy-daemon", action="store_true",
+                        help="Run mypy through a persistent mypy daemon (dmypy), falling back to plain mypy")
+    parser.add_argument("--no-corner-cutting-cache", action="store_true",
+                        help="Rescan every file instead of reusing cached corner-cutting results")
+    parser.add_argument("--corner-cutting-hash", action="store_true",
+                        help="Reuse cached corner-cutting results for files whose content is unchanged, even if their mtime changed")
+    parser.add_argument("--corner-cutting-workers", type=int, default=1,
+                        help="Number of processes to scan files for corner-cutting with (default: 1)")
+    parser.add_argument("--fork-server", action="store_true",
+                        help="Run the unit tests in children forked from a server that keeps the project's dependencies imported")
+    parser.add_argument("--no-unittest-events", action="store_true",
+                        help="Run the tests with plain unittest discover and parse its text output instead of per-test events")
+    parser.add_argument("--no-flake8-structured", action="store_true",
+                        help="Parse flake8's default output format instead of a machine-readable one")
+    parser.add_argument("--changed-since", metavar="REF", default=None,
+                        help="Only lint the files changed since a git ref, and only type check them and the files that import them")
+    parser.add_argument("--test-impact", action="store_true",
+                        help="Only run the test modules that import a file changed since the last run, or since --changed-since")
+    parser.add_argument("--full-run-every", type=int, default=10, metavar="N",
+                        help="With --test-impact, run the whole test suite at least once every N runs (default: 10, 0 to never)")
+    parser.add_argument("--unittest-timeout", type=float, default=30.0, metavar="SECONDS",
+                        help="Stop the unit tests after this many seconds and report what ran until then (default: 30, 0 for no limit)")
+    parser.add_argument("--mypy-timeout", type=float, default=0, metavar="SECONDS",
+                        help="Stop mypy after this many seconds and report what it found until then (default: no limit)")
+    parser.add_argument("--flake8-timeout", type=float, default=0, metavar="SECONDS",
+                        help="Stop flake8 after this many seconds and report what it found until then (default: no limit)")
+    parser.add_argument("--result-cache", action="store_true",
+                        help="Reuse the results of a collector whose input files, tool version and settings are unchanged "
+                             "since its last run, instead of running it again (default: off, as in Configs)")
+    parser.add_argument("--regression-window", type=int, default=20, metavar="N",
+                        help="Flag tests and collectors that got slower than in the last N reports (default: 20, 0 to turn off)")
+    parser.add_argument("--regression-threshold", type=float, default=3.0, metavar="MADS",
+                        help="Number of median absolute deviations above the median a timing must be to be flagged (default: 3)")
+    parser.add_argument("--report-format", choices=REPORT_FORMATS, default="pretty",
+                        help="Write JSON reports indented (pretty), without whitespace (compact) or as JSON Lines (jsonl) (default: pretty)")
+    parser.add_argument("--report-compression", choices=REPORT_COMPRESSIONS, default=None,
+                        help="Compress the JSON reports with gzip or xz (default: no compression)")
+    parser.add_argument("--publish-latest", choices=PUBLISH_MODES, default="hardlink",
+                        help="Publish the latest_* reports as hard links to, symbolic links to or copies of the timestamped reports (default: hardlink)")
+    parser.add_argument("--history", action="store_true",
+                        help="Append every collector's results to a SQLite run history in the reports directory")
+    parser.add_argument("--stream", action="store_true",
+                        help="Parse the output of unittest, flake8 and mypy while they run, logging live progress")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running, and rerun the collectors affected by each change to the project's files")
+    parser.add_argument("--watch-interval", type=float, default=0.5, metavar="SECONDS",
+                        help="Seconds between polls of the project's files with --watch (default: 0.5)")
+    parser.add_argument("--trace", action="store_true",
+                        help="Write a Chrome trace event timeline of every collector's phases to the reports directory. "
+                             "Only the runner process is traced: the tools, test shards and corner-cutting workers "
+                             "each show up as one span of the phase that started them")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile each phase of every collector with cProfile and write .pstats files and a summary to the reports directory")
     
     args = parser.parse_args()
 
@@ -216,54 +631,45 @@ def main() -> None:
         test_dir=project_path / "tests",
         reports_dir=project_path / "test_reports",
         respect_gitignore=args.respect_gitignore,
-        verbosity=1 if args.quiet else 2
+        verbosity=1 if args.quiet else 2,
+        jobs=args.jobs,
+        unittest_shards=args.shards,
+        mypy_daemon=args.mypy_daemon,
+        corner_cutting_cache=not args.no_corner_cutting_cache,
+        corner_cutting_hash_contents=args.corner_cutting_hash,
+        corner_cutting_workers=args.corner_cutting_workers,
+        unittest_events=not args.no_unittest_events,
+        unittest_fork_server=args.fork_server,
+        flake8_structured=not args.no_flake8_structured,
+        changed_since=args.changed_since,
+        test_impact=args.test_impact,
+        test_impact_full_run_every=args.full_run_every,
+        result_cache=args.result_cache,
+        unittest_timeout=args.unittest_timeout or None,
+        mypy_timeout=args.mypy_timeout or None,
+        flake8_timeout=args.flake8_timeout or None,
+        report_format=args.report_format,
+        report_compression=args.report_compression,
+        publish_latest=args.publish_latest,
+        history=args.history,
+        regression_window=args.regression_window,
+        regression_threshold=args.regression_threshold,
+        stream=args.stream,
+        profile=args.profile,
+        trace=args.trace
     )
 
 
         
-    # Run the tests if requested
-    resources = {
-        "collectors": []
+    # Only the selected collectors' modules are imported
+    selected = {
+        "unittest": run_tests, # Unit tests with unittest
+        "mypy": run_mypy, # Type checking
+        "flake8": run_flake8, # Code style
+        "corner_cutting": run_corner_cutting, # LLM laziness
     }
-    if run_tests: # Unit tests with unittest
-        unittest_resources = {
-            "name": "unittest",
-            "create_results": create_results,
-            "run_command": unittest_run_command,
-            "parse_output": unittest_parse_output,
-            "format_report": unittest_format_report
-        }
-        resources["collectors"].append(Collector(configs=configs, resources=unittest_resources))
-        
-    if run_mypy: # Type checking
-        mypy_resources = {
-            "name": "mypy",
-            "create_results": create_results,
-            "run_command": mypy_run_command,
-            "parse_output": mypy_parse_output,
-            "format_report": mypy_format_report
-        }
-        resources["collectors"].append(Collector(configs=configs, resources=mypy_resources))
-        
-    if run_flake8: # Code style
-        flake8_resources = {
-            "name": "flake8",
-            "create_results": create_results,
-            "run_command": flake8_run_command,
-            "parse_output": flake8_parse_output,
-            "format_report": flake8_format_report
-        }
-        resources["collectors"].append(Collector(configs=configs, resources=flake8_resources))
-        
-    if run_corner_cutting: # LLM laziness
-        corner_cutting_resources = {
-            "name": "corner_cutting",
-            "create_results": create_results,
-            "run_command": corner_cutting_run_command,
-            "parse_output": corner_cutting_parse_output,
-            "format_report": corner_cutting_format_report
-        }
-        resources["collectors"].append(Collector(configs=configs, resources=corner_cutting_resources))
+    names = [name for name, run in selected.items() if run]
+    resources = {"collectors": build_collectors(configs, names)}
     
     # Show usage help if nothing was run
     if not run_tests and not run_mypy and not run_flake8 and not run_corner_cutting:
@@ -271,10 +677,12 @@ def main() -> None:
 
     # Run the tests and save their results
     try:
+        if args.watch:
+            watch(configs, names, args.watch_interval)
         runner = RunTestsAndSaveTheirResults(configs, resources)
-        runner.run()
+        exit_status = runner.run()
         logger.info("\n==== All tests completed ====")
-        sys.exit(0)
+        sys.exit(exit_status)
     except KeyboardInterrupt:
         logger.info("\n\nKeyboard interrupt detected. Exiting...")
         sys.exit(0)
@@ -4,7 +4,8 @@
 Base collector interface for running tests and generating reports.
 Using inversion of control pattern for configuration and resource management.
 """
-from typing import Any, Dict, List, Callable, Optional
+from contextlib import nullcontext
+from typing import Any, ContextManager, Dict, List
 
 
 class Collector:
@@ -36,6 +37,9 @@ class Collector:
         self._run_command = self.resources["run_command"]
         self._parse_output = self.resources["parse_output"]
         self._format_report = self.resources["format_report"]
+        
+        # Optional Tracer that records a span per phase, set by the runner with --trace
+        self.tracer = self.resources.get("tracer")
 
     def run(self) -> bool:
         """
@@ -48,15 +52,46 @@ class Collector:
             raise ValueError("Required resources missing: run_command and/or parse_output")
             
         # Use resources to run command
-        output = self._run_command(self.configs)
+        with self._span("run_command") as span:
+            output = self._run_command(self.configs)
+            if self.tracer is not None:
+                # Only imported when tracing, to keep it out of the startup of other runs
+                from utils.common.trace_events import output_size
+                size = output_size(output)
+                if size is not None:
+                    span["bytes"] = size
         
         # Use resources to parse output
-        success: bool = self._parse_output(output, self.results)
+        with self._span("parse_output") as span:
+            success: bool = self._parse_output(output, self.results)
+            span["issues"] = len(self.results.issues) + len(getattr(self.results, "corner_cutting", []))
+            span["tests"] = self.results.tests
         
-        self.results.status = "pass" if success else "fail"
+        if getattr(self.results, "timed_out", False):
+            # Whatever the tool wrote before it was stopped is still in the results.
+            self.results.status = "timed_out"
+            success = False
+        else:
+            self.results.status = "pass" if success else "fail"
         
         return success
 
+    def restore_results(self, report: Dict[str, Any]) -> bool:
+        """
+        Restore the results of an earlier run instead of running the command.
+        
+        Args:
+            report: The JSON report the earlier results were saved as
+            
+        Returns:
+            bool: True if the earlier run was successful, False otherwise
+        """
+        self.results = self._create_results(self.name)
+        self.results.update_from_dict(report)
+        self.results.cached = True
+        
+        return self.results.status == "pass"
+
     def generate_markdown_report(self) -> List[str]:
         """
         Generate a Markdown report of the results.
@@ -68,4 +103,27 @@ class Collector:
             raise ValueError("Required resource missing: format_report")
             
         # Use resources to format the report
-        return self._format_report(self.results)
\ No newline at end of file
+        with self._span("format_report") as span:
+            content = self._format_report(self.results)
+            span["lines"] = len(content)
+        
+        # Timings are compared the same way for every collector
+        regressions = getattr(self.results, "performance_regressions", [])
+        if regressions:
+            from utils.common.detect_regressions import format_regressions
+            content = content + format_regressions(regressions)
+        return content
+
+    def _span(self, phase: str) -> ContextManager[Dict[str, Any]]:
+        """
+        Record a span of a phase with the tracer, or do nothing without one.
+        
+        Args:
+            phase: Name of the phase
+            
+        Returns:
+            ContextManager[Dict[str, Any]]: Yields the span's arguments, which counts can be added to
+        """
+        if self.tracer is None:
+            return nullcontext({})
+        return self.tracer.span(phase, collector=self.name)
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Registry of the collectors the CLI can run.
+Each collector's resource modules are only imported when the collector is selected.
+"""
+from importlib import import_module
+from typing import Any, Callable, Dict
+
+
+# Collectors in the order they run, each mapped to the package holding its
+# run_command, parse_output and format_report modules.
+COLLECTOR_PACKAGES: Dict[str, str] = {
+    "unittest": "utils.reports.unittest",
+    "mypy": "utils.reports.mypy",
+    "flake8": "utils.reports.flake8",
+    "corner_cutting": "utils.reports.corner_cutting",
+}
+
+# Resource functions each collector package provides, one module per function.
+RESOURCE_FUNCTIONS = ("run_command", "parse_output", "format_report")
+
+
+def load_collector_resources(name: str, create_results: Callable[[str], Any]) -> Dict[str, Any]:
+    """
+    Import a collector's resource functions and return its resources dictionary.
+
+    Args:
+        name: Name of the collector, one of COLLECTOR_PACKAGES
+        create_results: Factory function for the collector's results object
+
+    Returns:
+        Dict[str, Any]: The resources to create a Collector with
+    """
+    if name not in COLLECTOR_PACKAGES:
+        raise ValueError(f"Unknown collector: {name}")
+
+    resources: Dict[str, Any] = {"name": name, "create_results": create_results}
+    for function in RESOURCE_FUNCTIONS:
+        module = import_module(f"{COLLECTOR_PACKAGES[name]}.{function}")
+        resources[function] = getattr(module, function)
+    return resources
@@ -33,7 +33,13 @@ else
 fi
 
 # Run the tests
-python -m unittest discover -s "$PROJECT_DIR" -p test_*.py
+# Any arguments after the project directory are passed to python instead of the default discover,
+# e.g. "-m unittest tests.test_a tests.test_b" to run one shard of the suite.
+if [ $# -gt 1 ]; then
+    python "${@:2}"
+else
+    python -m unittest discover -s "$PROJECT_DIR" -p test_*.py
+fi
 
 # Deactivate the virtual environment
 deactivate || {
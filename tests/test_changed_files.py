@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for finding changed files and the files that import them.
+"""
+import shutil
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+
+from utils.common.enumerate_project_files import clear_enumeration_cache, enumerate_project_files
+from utils.common.get_changed_files import get_changed_files
+from utils.common.import_graph import build_import_graph
+from utils.common.partial_output import PartialOutput
+from utils.reports.flake8.parse_output import parse_output as flake8_parse_output
+
+
+def git(project: Path, *args: str) -> None:
+    """Run a git command in the project."""
+    subprocess.run(["git", "-c", "user.email=test@example.com", "-c", "user.name=test", *args],
+                   cwd=project, check=True, capture_output=True)
+
+
+class ProjectTestCase(unittest.TestCase):
+    """Base test case with a temporary project."""
+
+    def setUp(self):
+        """Create an empty project."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.project = Path(self.temp_dir.name)
+        clear_enumeration_cache()
+        self.addCleanup(clear_enumeration_cache)
+
+    def tearDown(self):
+        """Remove the project."""
+        self.temp_dir.cleanup()
+
+    def write(self, relative_path: str, content: str = "") -> None:
+        """Write a file in the project."""
+        path = self.project / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+
+@unittest.skipIf(shutil.which("git") is None, "git is not installed")
+class TestGetChangedFiles(ProjectTestCase):
+    """Test finding the files changed since a git ref."""
+
+    def setUp(self):
+        """Create a git repository with one commit."""
+        super().setUp()
+        for name in ("a.py", "b.py", "c.py", "d.py"):
+            self.write(f"pkg/{name}")
+        self.write(".gitignore", "ignored.py\n")
+        git(self.project, "init", "-q")
+        git(self.project, "add", "-A")
+        git(self.project, "commit", "-q", "-m", "initial")
+
+    def test_finds_unstaged_staged_and_untracked_files(self):
+        """Test that every kind of change is found and deleted and ignored files are not."""
+        self.write("pkg/a.py", "x = 1\n")
+        self.write("pkg/b.py", "y = 2\n")
+        git(self.project, "add", "pkg/b.py")
+        self.write("pkg/new.py")
+        self.write("ignored.py")
+        (self.project / "pkg" / "d.py").unlink()
+
+        self.assertEqual(get_changed_files(self.project, "HEAD"), ["pkg/a.py", "pkg/b.py", "pkg/new.py"])
+
+    def test_finds_committed_changes_since_ref(self):
+        """Test that changes committed after the ref are found."""
+        self.write("pkg/c.py", "z = 3\n")
+        git(self.project, "commit", "-q", "-am", "change c")
+
+        self.assertEqual(get_changed_files(self.project, "HEAD~1"), ["pkg/c.py"])
+        self.assertEqual(get_changed_files(self.project, "HEAD"), [])
+
+    def test_unknown_ref_raises(self):
+        """Test that a ref git does not know raises a RuntimeError."""
+        with self.assertRaises(RuntimeError):
+            get_changed_files(self.project, "no-such-branch")
+
+
+class TestImportGraph(ProjectTestCase):
+    """Test the import graph and reverse dependents."""
+
+    def setUp(self):
+        """Create a package whose modules import each other."""
+        super().setUp()
+        self.write("pkg/__init__.py")
+        self.write("pkg/a.py", "def f():\n    return 1\n")
+        self.write("pkg/b.py", "from .a import f\n")
+        self.write("pkg/sub/__init__.py")
+        self.write("pkg/sub/c.py", "from .. import b\n")
+        self.write("pkg/d.py", "import os\nimport pkg.sub.c\n")
+        self.write("pkg/unrelated.py", "import json\n")
+        self.write("src/lib/e.py", "from pkg.a import f\n")
+        self.write("broken.py", "def (\n")
+        self.cache_path = self.project / "import_graph.json"
+
+    def graph(self):
+        """Build the import graph of the project."""
+        clear_enumeration_cache()
+        return build_import_graph(enumerate_project_files(self.project), self.cache_path)
+
+    def test_dependents_follow_imports_transitively(self):
+        """Test that files importing a changed file, directly or not, are dependents."""
+        self.assertEqual(self.graph().dependents(["pkg/a.py"]), {
+            "pkg/a.py", "pkg/b.py", "pkg/sub/c.py", "pkg/d.py", "src/lib/e.py",
+        })
+
+    def test_dependencies_include_parent_packages(self):
+        """Test that importing a module also depends on its packages."""
+        self.assertEqual(self.graph().dependencies(["pkg/d.py"]), {
+            "pkg/d.py", "pkg/__init__.py", "pkg/sub/__init__.py", "pkg/sub/c.py", "pkg/b.py", "pkg/a.py",
+        })
+
+    def test_unparseable_files_have_no_imports(self):
+        """Test that a file with a syntax error is kept without imports."""
+        self.assertEqual(self.graph().imports["broken.py"], frozenset())
+
+    def test_cache_is_reused_until_a_file_changes(self):
+        """Test that cached imports are used for unchanged files and refreshed for changed ones."""
+        self.graph()
+        self.assertTrue(self.cache_path.exists())
+
+        self.write("pkg/unrelated.py", "from pkg import a\n")
+        self.assertIn("pkg/unrelated.py", self.graph().dependents(["pkg/a.py"]))
+
+
+class TestPartialOutput(unittest.TestCase):
+    """Test that parse_output records partial runs."""
+
+    def test_partial_run_is_recorded(self):
+        """Test that the ref and the checked files end up on the results."""
+        results = SimpleNamespace()
+        self.assertTrue(flake8_parse_output(PartialOutput("", "HEAD", ["pkg/a.py"]), results))
+        self.assertTrue(results.partial)
+        self.assertEqual((results.changed_since, results.checked_files), ("HEAD", ["pkg/a.py"]))
+
+    def test_full_run_is_not_partial(self):
+        """Test that plain output marks the run as complete."""
+        results = SimpleNamespace()
+        flake8_parse_output("", results)
+        self.assertFalse(results.partial)
+
+
+if __name__ == "__main__":
+    unittest.main()
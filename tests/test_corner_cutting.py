@@ -0,0 +1,263 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for the corner-cutting scanner.
+"""
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import json
+import os
+import re
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+
+from utils.common.enumerate_project_files import clear_enumeration_cache
+from utils.reports.corner_cutting import run_command as corner_cutting_run_command
+from utils.reports.corner_cutting.matcher import LAZY_WORDS_CATEGORY, PatternMatcher, load_patterns
+
+
+PATTERNS = {
+    "patterns": {
+        "Placeholders": [
+            {"pattern": r"\bfor now\b", "description": "Temporary solution"},
+            {"pattern": r"TODO", "description": "Unfinished work"},
+        ],
+        "Simulation": [
+            {"pattern": r"simulat(e|ed)", "description": "Simulated behaviour"},
+        ],
+    }
+}
+
+
+class CornerCuttingTestCase(unittest.TestCase):
+    """Base test case with a temporary project and pattern file."""
+
+    def setUp(self):
+        """Create a small project with a few Python files."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.project = self.root / "project"
+        (self.project / "tests").mkdir(parents=True)
+        (self.project / "pkg").mkdir()
+        (self.project / "venv").mkdir()
+
+        self.write("pkg/a.py", "x = 1  # TODO for now\ny = 2\n")
+        self.write("pkg/b.py", "def f():\n    return simulate()\n")
+        self.write("tests/test_a.py", "import unittest\n")
+        self.write("venv/ignored.py", "# TODO\n")
+
+        self.default_patterns_file = corner_cutting_run_command.LAZY_WORDS_FILE
+        self.patterns_file = self.root / "patterns.json"
+        self.patterns_file.write_text(json.dumps(PATTERNS))
+        patcher = patch.object(corner_cutting_run_command, "LAZY_WORDS_FILE", self.patterns_file)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.configs = SimpleNamespace(
+            test_dir=self.project / "tests",
+            reports_dir=self.project / "test_reports",
+            respect_gitignore=False,
+            gitignore_spec=None,
+            corner_cutting_cache=True,
+            corner_cutting_hash_contents=False,
+            corner_cutting_workers=1,
+        )
+        self.configs.reports_dir.mkdir()
+
+    def tearDown(self):
+        """Remove the temporary project."""
+        self.temp_dir.cleanup()
+
+    def write(self, relative_path: str, content: str) -> Path:
+        """Write a file in the project."""
+        path = self.project / relative_path
+        path.write_text(content)
+        return path
+
+    def scan(self) -> dict:
+        """Run the scanner on the project, as a new run would."""
+        clear_enumeration_cache()
+        return corner_cutting_run_command.run_command(self.configs)
+
+
+class TestCornerCuttingScan(CornerCuttingTestCase):
+    """Test what the scanner finds."""
+
+    def test_finds_every_pattern(self):
+        """Test that each pattern is reported on the line it matches."""
+        output = self.scan()
+
+        found = {(issue["file"], issue["line"], issue["pattern"]) for issue in output["issues"]}
+        self.assertEqual(found, {
+            (os.path.join("pkg", "a.py"), 1, r"\bfor now\b"),
+            (os.path.join("pkg", "a.py"), 1, "TODO"),
+            (os.path.join("pkg", "b.py"), 2, "simulat(e|ed)"),
+        })
+        self.assertEqual(output["total_files_scanned"], 3)
+
+    def test_issues_are_sorted_by_file_then_line(self):
+        """Test that issues come out ordered by file and line."""
+        self.write("pkg/c.py", "# simulated\n# TODO\n")
+        issues = self.scan()["issues"]
+
+        keys = [(issue["file"], issue["line"]) for issue in issues]
+        self.assertEqual(keys, sorted(keys))
+
+    def test_parallel_scan_matches_serial_scan(self):
+        """Test that scanning with worker processes gives byte-identical output."""
+        for index in range(20):
+            self.write(f"pkg/module_{index}.py", "# TODO for now\n" * (index % 3) + "x = simulate()\n")
+        self.configs.corner_cutting_cache = False
+
+        serial = self.scan()
+        self.configs.corner_cutting_workers = 3
+        parallel = self.scan()
+
+        self.assertEqual(json.dumps(parallel, indent=2), json.dumps(serial, indent=2))
+
+    def test_parallel_scan_from_a_thread_does_not_fork(self):
+        """Test that workers started from a collector thread, as with --jobs, are not forked from it."""
+        for index in range(4):
+            self.write(f"pkg/module_{index}.py", "# TODO for now\n")
+        self.configs.corner_cutting_cache = False
+        serial = self.scan()
+        self.configs.corner_cutting_workers = 2
+
+        with patch.object(corner_cutting_run_command, "ProcessPoolExecutor", wraps=ProcessPoolExecutor) as pool:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                parallel = executor.submit(self.scan).result(timeout=60)
+
+        self.assertEqual(parallel, serial)
+        self.assertNotEqual(pool.call_args.kwargs["mp_context"].get_start_method(), "fork")
+
+    def test_shipped_lazy_words_are_found(self):
+        """Test that the phrases in the shipped pattern file are matched as whole words."""
+        with patch.object(corner_cutting_run_command, "LAZY_WORDS_FILE", self.default_patterns_file):
+            output = self.scan()
+
+        found = {(issue["file"], issue["line"], issue["category"]) for issue in output["issues"]}
+        self.assertIn((os.path.join("pkg", "a.py"), 1, LAZY_WORDS_CATEGORY), found)
+        self.assertIn((os.path.join("pkg", "b.py"), 2, LAZY_WORDS_CATEGORY), found)
+
+
+class TestLoadPatterns(unittest.TestCase):
+    """Test reading the patterns of a pattern file."""
+
+    def test_phrases_become_escaped_word_patterns(self):
+        """Test that each listed phrase becomes a word-bounded pattern."""
+        patterns = load_patterns({"lazy_words_and_phrases": ["for now", "a.b"]})
+
+        self.assertEqual(
+            [info["pattern"] for info in patterns[LAZY_WORDS_CATEGORY]],
+            [r"\bfor\ now\b", r"\ba\.b\b"],
+        )
+
+    def test_regex_patterns_and_phrases_are_combined(self):
+        """Test that a file can list both regex patterns and phrases."""
+        patterns = load_patterns({**PATTERNS, "lazy_words_and_phrases": ["skip"]})
+
+        self.assertEqual(list(patterns), ["Placeholders", "Simulation", LAZY_WORDS_CATEGORY])
+        self.assertEqual(patterns["Placeholders"], PATTERNS["patterns"]["Placeholders"])
+
+
+class TestPatternMatcher(unittest.TestCase):
+    """Test that the compiled matcher agrees with searching each pattern on each line."""
+
+    CONTENT = "\n".join([
+        "def f():",
+        "    pass",
+        "",
+        "    # TODO: handle errors",
+        "x = simulated_value  # For Now",
+        "todo_list = []",
+        "y = 1  # TODO",
+        "    return x",
+    ])
+
+    def assert_same_hits(self, patterns: list[str]):
+        """Assert the matcher finds exactly what re.search on every line finds."""
+        matcher = PatternMatcher({"Category": [{"pattern": p, "description": p} for p in patterns]})
+        expected = [
+            (index, line_index + 1, line.strip())
+            for index, pattern in enumerate(patterns)
+            for line_index, line in enumerate(self.CONTENT.split("\n"))
+            if re.search(pattern, line, re.IGNORECASE)
+        ]
+        self.assertEqual(matcher.scan(self.CONTENT), expected)
+
+    def test_word_patterns(self):
+        """Test plain and word-bounded patterns."""
+        self.assert_same_hits([r"\bfor now\b", r"\btodo\b", r"simulat(e|ed)"])
+
+    def test_anchored_patterns(self):
+        """Test line anchors and patterns that can match across line breaks."""
+        self.assert_same_hits([r"^\s*pass\s*$", r"^$", r"errors\s*", r"\s+#"])
+
+    def test_context_sensitive_patterns(self):
+        """Test lookarounds, string anchors and backreferences."""
+        self.assert_same_hits([r"TODO(?!:)", r"(?<=# )TODO", r"\Ax", r"(t)od\1"])
+
+    def test_inline_global_flags(self):
+        """Test patterns that cannot be joined into one alternation."""
+        self.assert_same_hits([r"(?s)return", r"TODO"])
+
+
+class TestCornerCuttingCache(CornerCuttingTestCase):
+    """Test the per-file scan cache."""
+
+    def test_unchanged_files_come_from_cache(self):
+        """Test that a second scan reuses every file's cached issues."""
+        first = self.scan()
+        second = self.scan()
+
+        self.assertEqual(first["files_rescanned"], 3)
+        self.assertEqual(second["files_from_cache"], 3)
+        self.assertEqual(second["files_rescanned"], 0)
+        self.assertEqual(second["issues"], first["issues"])
+
+    def test_edited_file_is_rescanned(self):
+        """Test that only an edited file is scanned again."""
+        self.scan()
+        self.write("pkg/b.py", "def f():\n    return 1  # TODO\n")
+        output = self.scan()
+
+        self.assertEqual(output["files_rescanned"], 1)
+        self.assertEqual(output["files_from_cache"], 2)
+        b_issues = [issue for issue in output["issues"] if issue["file"].endswith("b.py")]
+        self.assertEqual([issue["pattern"] for issue in b_issues], ["TODO"])
+
+    def test_touched_file_uses_content_hash(self):
+        """Test that a file with a new mtime but the same content is reused when hashing."""
+        self.configs.corner_cutting_hash_contents = True
+        self.scan()
+        path = self.project / "pkg" / "a.py"
+        os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10**9))
+        output = self.scan()
+
+        self.assertEqual(output["files_rescanned"], 0)
+        self.assertEqual(output["files_from_cache"], 3)
+
+    def test_pattern_change_invalidates_cache(self):
+        """Test that changing the pattern file rescans everything."""
+        self.scan()
+        self.patterns_file.write_text(json.dumps({"patterns": {"Placeholders": PATTERNS["patterns"]["Placeholders"]}}))
+        output = self.scan()
+
+        self.assertEqual(output["files_rescanned"], 3)
+        self.assertFalse(any(issue["category"] == "Simulation" for issue in output["issues"]))
+
+    def test_cache_can_be_disabled(self):
+        """Test that no cache is read or written when disabled."""
+        self.configs.corner_cutting_cache = False
+        self.scan()
+        output = self.scan()
+
+        self.assertEqual(output["files_rescanned"], 3)
+        self.assertFalse((self.configs.reports_dir / "corner_cutting_cache.json").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
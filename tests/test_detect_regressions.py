@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for detecting performance regressions against earlier reports.
+"""
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+
+from main import create_results
+from utils.common.detect_regressions import TIMINGS_FILE, detect_regressions, format_regressions, record_timings
+
+
+class TestDetectRegressions(unittest.TestCase):
+    """Test comparing a run's timings with the baselines from past reports."""
+
+    def setUp(self):
+        """Write past unittest reports with slightly noisy timings."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.reports_dir = Path(self.temp_dir.name)
+        for index, noise in enumerate([0.0, 0.02, -0.01, 0.01, -0.02, 0.03]):
+            self.write_report(index, wall_time=2.0 + noise, durations={
+                "tests.t.T.test_a": 0.5 + noise, "tests.t.T.test_b": 0.3 + noise,
+            })
+
+    def write_report(self, index: int, wall_time: float, durations: dict, **summary) -> None:
+        """Write a timestamped unittest report."""
+        report = {
+            "summary": {"name": "unittest", "wall_time": wall_time, **summary},
+            "details": {"test_durations": durations},
+        }
+        with open(self.reports_dir / f"unittest_report_20250101_0000{index:02d}.json", 'w') as f:
+            json.dump(report, f)
+
+    def results(self, wall_time: float, durations: dict):
+        """Return the results of the current run."""
+        results = create_results("unittest")
+        results.wall_time = wall_time
+        results.test_durations = durations
+        return results
+
+    def test_steady_timings_are_not_flagged(self):
+        """Test that timings within the usual noise are not regressions."""
+        results = self.results(2.03, {"tests.t.T.test_a": 0.52, "tests.t.T.test_b": 0.29})
+        self.assertEqual(detect_regressions(results, self.reports_dir), [])
+
+    def test_slower_test_and_collector_are_flagged(self):
+        """Test that a test and a collector that got much slower are flagged, slowest first."""
+        results = self.results(3.0, {"tests.t.T.test_a": 0.5, "tests.t.T.test_b": 1.2, "tests.t.T.test_new": 9.0})
+        regressions = detect_regressions(results, self.reports_dir)
+
+        self.assertEqual([(r["kind"], r["name"]) for r in regressions], [("test", "tests.t.T.test_b"), ("collector", "unittest")])
+        self.assertAlmostEqual(regressions[0]["median"], 0.305)
+        self.assertEqual(regressions[0]["samples"], 6)
+        self.assertIn("## Performance regressions", format_regressions(regressions))
+
+    def test_too_few_samples(self):
+        """Test that timings are not compared against a baseline with too few samples."""
+        results = self.results(9.0, {"tests.t.T.test_a": 5.0})
+        self.assertEqual(detect_regressions(results, self.reports_dir, window=3), [])
+
+    def test_partial_runs_are_left_out_of_the_collector_baseline(self):
+        """Test that the wall times of partial runs do not lower the collector's baseline."""
+        for index in range(6, 12):
+            self.write_report(index, wall_time=0.2, durations={}, partial=True)
+
+        results = self.results(2.05, {})
+        self.assertEqual(detect_regressions(results, self.reports_dir, window=12), [])
+
+    def test_recorded_timings_replace_the_reports(self):
+        """Test that once timings are recorded, the baselines come from them and no report is read."""
+        for noise in [0.0, 0.02, -0.01, 0.01, -0.02]:
+            record_timings(self.results(2.0 + noise, {"tests.t.T.test_a": 0.5 + noise}), self.reports_dir, window=5)
+        lines = (self.reports_dir / TIMINGS_FILE.format(name="unittest")).read_text().splitlines()
+        self.assertEqual(len(lines), 5)
+
+        results = self.results(2.0, {"tests.t.T.test_a": 1.5})
+        with patch("utils.common.detect_regressions.read_report", side_effect=AssertionError("read a report")):
+            regressions = detect_regressions(results, self.reports_dir, window=5)
+        self.assertEqual([(r["name"], r["samples"]) for r in regressions], [("tests.t.T.test_a", 5)])
+
+    def test_timings_of_cached_and_partial_runs(self):
+        """Test that cached runs are not recorded, and partial runs keep only their test durations."""
+        cached = self.results(0.01, {"tests.t.T.test_a": 0.5})
+        cached.cached = True
+        record_timings(cached, self.reports_dir, window=20)
+        partial = self.results(0.2, {"tests.t.T.test_a": 0.5})
+        partial.partial = True
+        record_timings(partial, self.reports_dir, window=20)
+
+        lines = (self.reports_dir / TIMINGS_FILE.format(name="unittest")).read_text().splitlines()
+        # The six reports of setUp seeded the file.
+        self.assertEqual(len(lines), 7)
+        self.assertEqual(json.loads(lines[-1]), {"wall_time": None, "test_durations": {"tests.t.T.test_a": 0.5}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for the shared project file walk.
+"""
+import os
+import re
+import tempfile
+import unittest
+from pathlib import Path
+
+
+import pathspec
+
+
+from utils.common.enumerate_project_files import MAX_EXCLUDE_LENGTH, ProjectTree, clear_enumeration_cache, enumerate_project_files
+
+
+class TestEnumerateProjectFiles(unittest.TestCase):
+    """Test walking a project and pruning excluded directories."""
+
+    def setUp(self):
+        """Create a project with source files and directories that should be pruned."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        for relative_path in ["pkg/a.py", "pkg/sub/b.py", "README.md", "venv/lib/c.py",
+                              ".git/config", "node_modules/d.js", "build/e.py", "pkg/__pycache__/a.pyc"]:
+            path = self.root / relative_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("x = 1\n")
+        clear_enumeration_cache()
+        self.addCleanup(clear_enumeration_cache)
+
+    def tearDown(self):
+        """Remove the temporary project."""
+        self.temp_dir.cleanup()
+
+    def test_prunes_excluded_directories(self):
+        """Test that virtual environments, dot directories and caches are not walked."""
+        tree = enumerate_project_files(self.root)
+
+        self.assertEqual([file.relative_path for file in tree.files], [
+            "README.md",
+            os.path.join("build", "e.py"),
+            os.path.join("pkg", "a.py"),
+            os.path.join("pkg", "sub", "b.py"),
+        ])
+        self.assertEqual(tree.excluded_names, (".git", "__pycache__", "node_modules", "venv"))
+        self.assertEqual(len(tree.files_with_suffix(".py")), 3)
+
+    def test_prunes_gitignored_paths(self):
+        """Test that gitignored directories are pruned and reported for the tools' exclude flags."""
+        spec = pathspec.PathSpec.from_lines("gitwildmatch", ["build/"])
+        tree = enumerate_project_files(self.root, spec)
+
+        self.assertNotIn(os.path.join("build", "e.py"), [file.relative_path for file in tree.files])
+        self.assertEqual(tree.ignored_dirs, ("build",))
+        self.assertIn("./build", tree.flake8_excludes())
+
+        exclude = re.compile(tree.mypy_exclude())
+        self.assertTrue(exclude.search("build/e.py"))
+        self.assertTrue(exclude.search("venv/lib/c.py"))
+        self.assertFalse(exclude.search("pkg/a.py"))
+
+    def test_gitignored_files_are_not_excluded_one_by_one(self):
+        """Test that gitignored files are left out of the walk but not of the tools' exclude flags."""
+        spec = pathspec.PathSpec.from_lines("gitwildmatch", ["*.md", "b.py"])
+        tree = enumerate_project_files(self.root, spec)
+
+        self.assertEqual([file.relative_path for file in tree.files], [os.path.join("build", "e.py"), os.path.join("pkg", "a.py")])
+        self.assertEqual(tree.ignored_dirs, ())
+        self.assertEqual(tree.flake8_excludes(), list(tree.excluded_names))
+
+    def test_too_many_gitignored_directories_are_not_passed(self):
+        """Test that the exclude flags stay short when many directories are gitignored."""
+        ignored_dirs = tuple(f"generated/{index:06d}" for index in range(MAX_EXCLUDE_LENGTH // 10))
+        tree = ProjectTree(root=self.root, files=(), excluded_names=("venv",), ignored_dirs=ignored_dirs)
+
+        self.assertEqual(tree.flake8_excludes(), ["venv"])
+        self.assertEqual(tree.mypy_exclude(), "(^|/)(venv)/")
+
+    def test_walk_is_cached_until_cleared(self):
+        """Test that repeated calls share one walk until the cache is cleared."""
+        first = enumerate_project_files(self.root)
+        (self.root / "pkg" / "new.py").write_text("")
+
+        self.assertIs(enumerate_project_files(self.root), first)
+        clear_enumeration_cache()
+        self.assertEqual(len(enumerate_project_files(self.root).files), len(first.files) + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
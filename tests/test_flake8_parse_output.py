@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for parsing flake8 output in the default and the structured format.
+"""
+import unittest
+from types import SimpleNamespace
+
+
+from utils.reports.flake8.parse_output import FIELD_SEPARATOR, STRUCTURED_FORMAT, Flake8OutputParser, parse_output
+
+
+def structured_line(*fields) -> str:
+    """Join fields the way flake8 prints them with STRUCTURED_FORMAT."""
+    return FIELD_SEPARATOR.join(str(field) for field in fields)
+
+
+class TestStructuredFlake8Output(unittest.TestCase):
+    """Test parsing flake8 output printed with STRUCTURED_FORMAT."""
+
+    def test_format_template_has_five_fields(self):
+        """Test that the --format template prints the fields the parser expects."""
+        fields = {"path": "./a.py", "row": 1, "col": 2, "code": "E1", "text": "message"}
+        self.assertEqual(STRUCTURED_FORMAT % fields, structured_line("./a.py", 1, 2, "E1", "message"))
+
+    def test_windows_paths_and_colons_in_messages(self):
+        """Test that drive letters and colons do not shift the fields."""
+        output = structured_line("C:\\project\\pkg\\a.py", 3, 7, "E231", "missing whitespace after ':'") + "\n"
+        results = SimpleNamespace()
+
+        self.assertFalse(parse_output(output, results))
+        self.assertEqual(results.issues, [{
+            "file": "C:\\project\\pkg\\a.py",
+            "line": "3",
+            "column": "7",
+            "error_code": "E231",
+            "message": "missing whitespace after ':'",
+        }])
+
+    def test_matches_default_format(self):
+        """Test that both formats give the same issues for ordinary paths."""
+        violations = [("./pkg/a.py", 1, 1, "F401", "'os' imported but unused"), ("./pkg/b.py", 20, 80, "E501", "line too long (90 > 79 characters)")]
+        default = SimpleNamespace()
+        structured = SimpleNamespace()
+
+        parse_output("".join(f"{path}:{row}:{col}: {code} {text}\n" for path, row, col, code, text in violations), default)
+        parse_output("".join(structured_line(*violation) + "\n" for violation in violations), structured)
+        self.assertEqual(vars(structured), vars(default))
+
+    def test_other_lines_are_kept(self):
+        """Test that lines which are not violations are still reported, as with the default format."""
+        output = structured_line("./a.py", 1, 1, "E302", "expected 2 blank lines") + "\nThere was a critical error during execution of Flake8\n"
+        results = SimpleNamespace()
+        parse_output(output, results)
+
+        self.assertEqual(results.errors, 2)
+        self.assertEqual(results.issues[1], {"message": "There was a critical error during execution of Flake8"})
+
+    def test_streamed_lines_match_whole_output(self):
+        """Test that feeding structured lines one at a time gives the same issues."""
+        lines = [structured_line(f"./m{index}.py", index, 1, "W291", "trailing whitespace") for index in range(1, 10)]
+        parser = Flake8OutputParser()
+        for line in lines:
+            parser.feed(line)
+
+        streamed = SimpleNamespace()
+        buffered = SimpleNamespace()
+        parse_output(parser, streamed)
+        parse_output("\n".join(lines), buffered)
+        self.assertEqual(vars(streamed), vars(buffered))
+
+    def test_streamed_line_without_row_number_is_kept_whole(self):
+        """Test that a streamed line with a non-numeric row is not split into fields."""
+        line = structured_line("./a.py", "row", 1, "E1", "message")
+        parser = Flake8OutputParser()
+        parser.feed(line)
+        parser.feed("")
+
+        self.assertEqual(parser.issues, [{"message": line}])
+
+    def test_empty_output_passes(self):
+        """Test that no output means no issues."""
+        self.assertTrue(parse_output("", SimpleNamespace()))
+
+
+if __name__ == "__main__":
+    unittest.main()
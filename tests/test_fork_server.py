@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for running unit tests in children of the fork server.
+"""
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+
+from utils.for_tests.run_tests import discover_dependencies, running_threads
+from utils.reports.unittest.fork_server import fork_server_socket, run_in_fork_server, stop_fork_server
+from utils.reports.unittest.run_command import _read_events
+
+
+PASSING_TEST = """
+import decimal
+import unittest
+
+from pkg.module import double
+
+
+class TestDouble(unittest.TestCase):
+    def test_double(self):
+        self.assertEqual(double(decimal.Decimal(2)), 4)
+
+    def test_wrong(self):
+        self.assertEqual(double(1), 3)
+"""
+
+SLOW_TEST = """
+import os
+import time
+import unittest
+
+
+class TestSlow(unittest.TestCase):
+    def test_slow(self):
+        print("pid", os.getpid(), flush=True)
+        time.sleep(60)
+"""
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "The fork server needs os.fork")
+class TestForkServer(unittest.TestCase):
+    """Test running tests through a fork server started in this interpreter's environment."""
+
+    def setUp(self):
+        """Create a project with a passing and a failing test, and an isolated socket directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.root = Path(self.temp_dir.name) / "project"
+        (self.root / "pkg").mkdir(parents=True)
+        (self.root / "pkg" / "__init__.py").write_text("")
+        (self.root / "pkg" / "module.py").write_text("import json\n\n\ndef double(value):\n    return value * 2\n")
+        (self.root / "tests").mkdir()
+        (self.root / "tests" / "__init__.py").write_text("")
+        (self.root / "tests" / "test_module.py").write_text(PASSING_TEST)
+        self.reports_dir = self.root / "test_reports"
+
+        # A runtime directory of its own, so the socket is not shared with a server of another test run.
+        self.runtime_dir = Path(self.temp_dir.name) / "runtime"
+        self.runtime_dir.mkdir(mode=0o700)
+        environment = patch.dict(os.environ, {"TEST_VENV_PATH": self.temp_dir.name, "XDG_RUNTIME_DIR": str(self.runtime_dir)})
+        environment.start()
+        self.addCleanup(environment.stop)
+        self.addCleanup(stop_fork_server, self.root)
+
+    def run_tests(self, events_path=None, test_ids=(), timeout=30.0):
+        """Run the tests in the fork server, with this interpreter as the test environment."""
+        return run_in_fork_server([sys.executable], self.root, self.reports_dir, timeout, events_path, test_ids)
+
+    def test_text_output(self):
+        """Test that a run without events prints what "python -m unittest" would."""
+        result = self.run_tests()
+
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("Ran 2 tests", result.output)
+        self.assertIn("FAILED (failures=1)", result.output)
+        self.assertTrue(fork_server_socket(self.root).exists())
+
+    def test_events_and_test_ids(self):
+        """Test that the event runner writes the events of only the requested tests."""
+        events_path = Path(self.temp_dir.name) / "events.jsonl"
+        result = self.run_tests(str(events_path), ["tests.test_module.TestDouble.test_double"])
+
+        self.assertEqual(result.returncode, 0)
+        events = _read_events(events_path)
+        self.assertEqual(events.planned, ["tests.test_module.TestDouble.test_double"])
+        self.assertTrue(events.run["successful"])
+
+    def test_server_is_reused_and_sees_changed_code(self):
+        """Test that a second run uses the same server and the current version of the project."""
+        self.run_tests()
+        server_log = (self.reports_dir / "unittest_fork_server.log").read_text()
+        (self.root / "pkg" / "module.py").write_text("def double(value):\n    return value + value + 1\n")
+
+        result = self.run_tests(test_ids=["tests.test_module.TestDouble.test_wrong"])
+
+        self.assertEqual(result.returncode, 0, result.output)
+        self.assertEqual((self.reports_dir / "unittest_fork_server.log").read_text(), server_log)
+
+    def test_timeout_stops_the_child(self):
+        """Test that a run that runs out of time is stopped and keeps its output."""
+        (self.root / "tests" / "test_slow.py").write_text(SLOW_TEST)
+
+        result = self.run_tests(test_ids=["tests.test_slow.TestSlow.test_slow"], timeout=2.0)
+
+        self.assertTrue(result.timed_out)
+        pid = int(result.output.split("pid ")[1].split()[0])
+        # The server reaps the child soon after it was killed.
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                break
+            time.sleep(0.05)
+        else:
+            self.fail(f"The timed-out child {pid} is still running")
+
+    def test_socket_is_in_a_private_directory(self):
+        """Test that the socket and its directory can only be used by the current user."""
+        self.run_tests()
+        socket_path = fork_server_socket(self.root)
+
+        self.assertEqual(socket_path.parent.parent, self.runtime_dir)
+        self.assertEqual(socket_path.parent.stat().st_mode & 0o777, 0o700)
+        self.assertEqual(socket_path.stat().st_mode & 0o777, 0o600)
+
+    def test_shared_socket_directory_is_refused(self):
+        """Test that the server is not used if its directory can be accessed by other users."""
+        directory = self.runtime_dir / f"unittest-fork-server-{os.getuid()}"
+        directory.mkdir()
+        directory.chmod(0o755)
+
+        with self.assertRaises(PermissionError):
+            fork_server_socket(self.root)
+        self.assertIsNone(self.run_tests())
+
+    def test_clients_cannot_choose_the_output_files(self):
+        """Test that paths in a request are ignored, so a client cannot make the child overwrite a file."""
+        self.run_tests()
+        victim = Path(self.temp_dir.name) / "victim.txt"
+        victim.write_text("keep me")
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.connect(str(fork_server_socket(self.root)))
+            request = {"project_root": str(self.root), "output_path": str(victim), "events_path": str(victim), "test_ids": []}
+            conn.sendall((json.dumps(request) + "\n").encode())
+            conn.settimeout(30)
+            replies = conn.makefile('r', encoding='utf-8')
+            self.assertIn("pid", json.loads(replies.readline()))
+            reply = json.loads(replies.readline())
+
+        self.assertIn("Ran 2 tests", reply["output"])
+        self.assertIsNone(reply["events"])
+        self.assertEqual(victim.read_text(), "keep me")
+        self.assertEqual(sorted(path.name for path in fork_server_socket(self.root).parent.iterdir()),
+                         [fork_server_socket(self.root).name])
+
+    def test_stop(self):
+        """Test that a stopped server removes its socket and that the next run starts a new one."""
+        self.run_tests()
+        self.assertTrue(stop_fork_server(self.root))
+        self.assertFalse(stop_fork_server(self.root))
+
+        self.assertEqual(self.run_tests().returncode, 1)
+
+
+class TestRunningThreads(unittest.TestCase):
+    """Test counting the threads the fork server checks for before it forks."""
+
+    def test_counts_other_threads(self):
+        """Test that a running thread is counted."""
+        before = running_threads()
+        stop = threading.Event()
+        thread = threading.Thread(target=stop.wait)
+        thread.start()
+        try:
+            self.assertEqual(running_threads(), before + 1)
+        finally:
+            stop.set()
+            thread.join()
+
+
+class TestDiscoverDependencies(unittest.TestCase):
+    """Test finding the modules a project imports from outside itself."""
+
+    def test_excludes_project_modules(self):
+        """Test that standard library imports are found and the project's own packages are not."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / "pkg").mkdir()
+            (root / "pkg" / "__init__.py").write_text("import json\nfrom . import helpers\n")
+            (root / "tests").mkdir()
+            (root / "tests" / "test_a.py").write_text("import unittest\nimport pkg\nfrom decimal import Decimal\n")
+            (root / "venv").mkdir()
+            (root / "venv" / "site.py").write_text("import not_a_real_module_name\n")
+
+            self.assertEqual(discover_dependencies(str(root)), ["json", "unittest", "decimal"])
+
+
+if __name__ == "__main__":
+    unittest.main()
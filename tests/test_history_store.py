@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for the SQLite run history.
+"""
+import tempfile
+import unittest
+from pathlib import Path
+
+
+from configs import Configs
+from main import RunTestsAndSaveTheirResults, create_results
+from reports.collector import Collector
+from utils.common.history_store import HISTORY_FILE, HistoryStore
+from utils.reports.unittest.parse_output import parse_output as unittest_parse_output
+
+
+def _unittest_results(failing: list[str]):
+    """Return the results of a unittest run of two tests, with the given ones failing."""
+    results = create_results("unittest")
+    results.tests = 2
+    results.failures = len(failing)
+    results.status = "fail" if failing else "pass"
+    results.test_durations = {"tests.t.T.test_a": 0.1, "tests.t.T.test_b": 0.2}
+    results.test_statuses = {test_id: "pass" for test_id in results.test_durations}
+    results.test_cases = [
+        {"id": test_id, "name": test_id.rsplit(".", 1)[1], "module": "tests.t", "class": "T",
+         "status": "FAIL", "message": "", "traceback": ""}
+        for test_id in failing
+    ]
+    return results
+
+
+def _flake8_results(issue_count: int):
+    """Return the results of a flake8 run that found issue_count issues in pkg/a.py."""
+    results = create_results("flake8")
+    results.errors = issue_count
+    results.status = "fail" if issue_count else "pass"
+    results.issues = [
+        {"file": "pkg/a.py", "line": str(line), "column": "1", "error_code": "E501", "message": "line too long"}
+        for line in range(1, issue_count + 1)
+    ]
+    return results
+
+
+class TestHistoryStore(unittest.TestCase):
+    """Test recording runs and querying them."""
+
+    def setUp(self):
+        """Open a history in a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.history = HistoryStore(Path(self.temp_dir.name) / HISTORY_FILE)
+        self.addCleanup(self.history.close)
+
+    def test_test_failure_rate(self):
+        """Test that the failure rate only counts the last runs of the test."""
+        for failing in ([], ["tests.t.T.test_a"], ["tests.t.T.test_a"], []):
+            self.history.record(_unittest_results(failing))
+
+        self.assertEqual(self.history.test_failure_rate("tests.t.T.test_a"), 0.5)
+        self.assertEqual(self.history.test_failure_rate("tests.t.T.test_a", last=3), 2 / 3)
+        self.assertEqual(self.history.test_failure_rate("tests.t.T.test_b"), 0.0)
+        self.assertIsNone(self.history.test_failure_rate("tests.t.T.test_missing"))
+
+    def test_subtest_failures_count_for_their_test(self):
+        """Test that a failed subtest is recorded as a failure of the test it belongs to."""
+        self.history.record(_unittest_results(["tests.t.T.test_b (i=1)"]))
+        self.assertEqual(self.history.test_failure_rate("tests.t.T.test_b"), 1.0)
+
+    def recorded_tests(self) -> list[tuple[str, str]]:
+        """Return the id and status of each test recorded for the last run."""
+        return self.history.connection.execute(
+            "SELECT test_id, status FROM tests WHERE run_id = (SELECT MAX(id) FROM runs) ORDER BY test_id"
+        ).fetchall()
+
+    def test_verbose_text_output(self):
+        """Test that the tests of a verbose text run are recorded under their full ids."""
+        results = create_results("unittest")
+        unittest_parse_output(
+            "test_a (tests.t.T.test_a) ... ok\n"
+            "test_b (tests.t.T.test_b) ... FAIL\n"
+            "test_c (tests.t.T.test_c) ... skipped 'not today'\n"
+            "\n" + "=" * 70 + "\nFAIL: test_b (tests.t.T.test_b)\n" + "-" * 70 + "\n"
+            "AssertionError: no\n\n" + "-" * 70 + "\nRan 3 tests in 0.001s\n\nFAILED (failures=1, skipped=1)\n",
+            results,
+        )
+        self.history.record(results)
+
+        self.assertEqual(self.recorded_tests(), [
+            ("tests.t.T.test_a", "pass"), ("tests.t.T.test_b", "FAIL"), ("tests.t.T.test_c", "skipped"),
+        ])
+        self.assertEqual(self.history.test_failure_rate("tests.t.T.test_a"), 0.0)
+
+    def test_text_output_without_test_outcomes(self):
+        """Test that no tests are recorded if the output does not report the outcome of each test."""
+        results = create_results("unittest")
+        unittest_parse_output(
+            ".F\n" + "=" * 70 + "\nFAIL: test_b (tests.t.T.test_b)\n" + "-" * 70 + "\n"
+            "AssertionError: no\n\n" + "-" * 70 + "\nRan 2 tests in 0.001s\n\nFAILED (failures=1)\n",
+            results,
+        )
+        self.history.record(results)
+
+        self.assertEqual(self.recorded_tests(), [])
+        self.assertEqual([run["failures"] for run in self.history.runs("unittest")], [1])
+
+    def test_issue_count_trend_and_file_issues(self):
+        """Test the issue counts of a collector's runs and the issues of a file in the latest run."""
+        for issue_count in (3, 2, 1):
+            self.history.record(_flake8_results(issue_count))
+        self.history.record(_unittest_results([]))
+
+        self.assertEqual([count for _, count in self.history.issue_count_trend("flake8")], [3, 2, 1])
+        self.assertEqual([count for _, count in self.history.issue_count_trend("flake8", last=2)], [2, 1])
+        self.assertEqual(
+            self.history.issues_in_file("pkg/a.py"),
+            [{"collector": "flake8", "line": 1, "code": "E501", "message": "line too long"}],
+        )
+
+    def test_history_persists(self):
+        """Test that runs are kept when the database is opened again."""
+        self.history.record(_flake8_results(1))
+        self.history.close()
+
+        with HistoryStore(Path(self.temp_dir.name) / HISTORY_FILE) as history:
+            self.assertEqual([run["errors"] for run in history.runs("flake8")], [1])
+
+
+class TestRunWithHistory(unittest.TestCase):
+    """Test that the runner appends each collector's results to the history."""
+
+    def test_runs_are_recorded(self):
+        """Test that every run of a collector adds a row."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            project = Path(temp_dir)
+            (project / "tests").mkdir()
+            configs = Configs(
+                test_dir=project / "tests",
+                reports_dir=project / "test_reports",
+                respect_gitignore=False,
+                verbosity=1,
+                history=True,
+            )
+            for _ in range(2):
+                collector = Collector(configs=configs, resources={
+                    "name": "flake8",
+                    "create_results": create_results,
+                    "run_command": lambda configs: None,
+                    "parse_output": lambda output, results: False,
+                    "format_report": lambda results: [],
+                })
+                RunTestsAndSaveTheirResults(configs, {"collectors": [collector]}).run()
+
+            with HistoryStore(configs.reports_dir / HISTORY_FILE) as history:
+                self.assertEqual(len(history.runs("flake8")), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
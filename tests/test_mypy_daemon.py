@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for running the mypy collector through the mypy daemon.
+"""
+import json
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+
+from utils.common.run_with_timeout import CommandResult
+from utils.reports.mypy import run_command as mypy_run_command
+
+
+def _completed(cmd, returncode=0, stdout=""):
+    return subprocess.CompletedProcess(cmd, returncode, stdout=stdout, stderr="")
+
+
+class FakeDmypy:
+    """Stand-in for subprocess.run that answers dmypy commands."""
+
+    def __init__(self, running=False, check_returncode=1):
+        self.running = running
+        self.check_returncode = check_returncode
+        self.calls = []
+
+    def __call__(self, cmd, **kwargs):
+        self.calls.append(cmd[:2])
+        match cmd[:2]:
+            case ["dmypy", "status"]:
+                return _completed(cmd, 0 if self.running else 2)
+            case ["dmypy", "start"] | ["dmypy", "restart"]:
+                self.running = True
+                return _completed(cmd)
+            case ["dmypy", "check"]:
+                return _completed(cmd, self.check_returncode, "mod.py:2: error: Bad [return-value]\n")
+            case ["mypy", "."]:
+                return _completed(cmd, 1, "mod.py:2: error: Plain [return-value]\n")
+            case _:
+                return _completed(cmd)
+
+    def run_with_timeout(self, cmd, cwd=None, timeout=None):
+        """Stand-in for run_with_timeout, answering the same commands."""
+        completed = self(cmd)
+        return CommandResult(completed.returncode, completed.stdout, completed.stderr)
+
+
+class TestMypyDaemon(unittest.TestCase):
+    """Test the dmypy mode of the mypy run_command."""
+
+    def setUp(self):
+        """Set up a temporary reports directory and configs."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.configs = SimpleNamespace(
+            mypy_daemon=True,
+            test_dir=Path(self.temp_dir.name) / "tests",
+            reports_dir=Path(self.temp_dir.name),
+            respect_gitignore=False,
+            gitignore_spec=None,
+        )
+
+    def tearDown(self):
+        """Remove the temporary reports directory."""
+        self.temp_dir.cleanup()
+
+    def _run(self, fake: FakeDmypy) -> str:
+        with patch.object(mypy_run_command.shutil, "which", return_value="/usr/bin/dmypy"), \
+             patch.object(mypy_run_command.subprocess, "run", side_effect=fake), \
+             patch.object(mypy_run_command, "run_with_timeout", side_effect=fake.run_with_timeout):
+            output = mypy_run_command.run_command(self.configs)
+        assert isinstance(output, str)  # Without streaming, partial checks or a timeout
+        return output
+
+    def _recorded_runs(self) -> list:
+        with open(Path(self.temp_dir.name) / "mypy_daemon.json") as f:
+            return json.load(f)["runs"]
+
+    def test_first_run_is_cold_and_second_is_warm(self):
+        """Test that the daemon is started once and reused afterwards."""
+        fake = FakeDmypy()
+        self.assertIn("Bad", self._run(fake))
+        self.assertIn(["dmypy", "start"], fake.calls)
+
+        fake.calls.clear()
+        self._run(fake)
+        self.assertNotIn(["dmypy", "start"], fake.calls)
+        self.assertEqual([run["warm"] for run in self._recorded_runs()], [False, True])
+
+    def test_config_change_restarts_daemon(self):
+        """Test that a changed config hash restarts a running daemon."""
+        with open(Path(self.temp_dir.name) / "mypy_daemon.json", "w") as f:
+            json.dump({"config_hash": "stale", "runs": []}, f)
+
+        fake = FakeDmypy(running=True)
+        self._run(fake)
+        self.assertIn(["dmypy", "restart"], fake.calls)
+        self.assertFalse(self._recorded_runs()[-1]["warm"])
+
+    def test_daemon_crash_falls_back_to_mypy(self):
+        """Test that a daemon error falls back to plain mypy."""
+        fake = FakeDmypy(check_returncode=2)
+        self.assertIn("Plain", self._run(fake))
+        self.assertIn(["dmypy", "kill"], fake.calls)
+
+    def test_missing_dmypy_falls_back_to_mypy(self):
+        """Test that plain mypy is used when dmypy is not installed."""
+        fake = FakeDmypy()
+        with patch.object(mypy_run_command.shutil, "which", return_value=None), \
+             patch.object(mypy_run_command.subprocess, "run", side_effect=fake), \
+             patch.object(mypy_run_command, "run_with_timeout", side_effect=fake.run_with_timeout):
+            self.assertIn("Plain", mypy_run_command.run_command(self.configs))
+        self.assertEqual(fake.calls, [["mypy", "."]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for profiling the phases of collectors with cProfile.
+"""
+import pstats
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+
+from utils.common.profile_phases import PhaseProfiler
+
+
+def _busy(seconds: float) -> None:
+    """Spin for a number of seconds, so the profile has a function to show."""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class TestPhaseProfiler(unittest.TestCase):
+    """Test timing and profiling phases, and writing the profiles."""
+
+    def setUp(self):
+        """Create a temporary reports directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.reports_dir = Path(self.temp_dir.name)
+
+    def test_wrap_times_every_call(self):
+        """Test that wrapped functions return their result and add up their wall time."""
+        profiler = PhaseProfiler()
+        wrapped = profiler.wrap("flake8", "parse_output", lambda value: _busy(0.01) or value)
+
+        self.assertEqual(wrapped(1), 1)
+        self.assertEqual(wrapped(2), 2)
+        self.assertGreaterEqual(profiler.phase_times["flake8"]["parse_output"], 0.02)
+
+    def test_nested_phase_is_timed_within_outer_profile(self):
+        """Test that a phase inside another one is timed and covered by the outer profile."""
+        profiler = PhaseProfiler()
+        with profiler.phase("mypy", "generate_reports"):
+            with profiler.phase("mypy", "format_report"):
+                _busy(0.01)
+
+        times = profiler.phase_times["mypy"]
+        self.assertGreaterEqual(times["format_report"], 0.01)
+        self.assertGreaterEqual(times["generate_reports"], times["format_report"])
+        functions = {function for _, _, function in pstats.Stats(profiler.profiles["mypy"]).stats}
+        self.assertIn("_busy", functions)
+
+    def test_write_pstats_and_summary(self):
+        """Test that each collector gets a loadable .pstats file and a section in the summary."""
+        profiler = PhaseProfiler(top=5)
+        for name in ("flake8", "mypy"):
+            with profiler.phase(name, "run_command"):
+                _busy(0.01)
+
+        paths = profiler.write(self.reports_dir, "20250101_000000")
+
+        self.assertEqual([path.name for path in paths], [
+            "flake8_profile_20250101_000000.pstats",
+            "mypy_profile_20250101_000000.pstats",
+            "profile_summary_20250101_000000.md",
+        ])
+        self.assertGreater(pstats.Stats(str(paths[0])).total_tt, 0)
+        summary = paths[-1].read_text()
+        self.assertIn("## flake8", summary)
+        self.assertIn("## mypy", summary)
+        self.assertIn("`_busy`", summary)
+        self.assertIn("Top 5 functions", summary)
+
+
+if __name__ == "__main__":
+    unittest.main()
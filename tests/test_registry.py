@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for the lazy collector registry and the CLI's startup imports.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+
+from reports.registry import COLLECTOR_PACKAGES, RESOURCE_FUNCTIONS, load_collector_resources
+
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+def _imported_after(code: str, cwd: str) -> list[str]:
+    """Run code in a fresh interpreter and return the collector, gitignore and tracing modules it imported."""
+    script = (
+        f"import sys; sys.path.insert(0, {str(ROOT_DIR)!r}); {code}; import json; "
+        "print(json.dumps(sorted(m for m in sys.modules if m.startswith(('utils.reports.', 'pathspec', 'utils.common.trace_events')))))"
+    )
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, cwd=cwd, check=True)
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+class TestCollectorRegistry(unittest.TestCase):
+    """Test loading collector resources by name."""
+
+    def test_every_collector_has_its_resources(self):
+        """Test that every registered collector provides each resource function."""
+        for name in COLLECTOR_PACKAGES:
+            resources = load_collector_resources(name, create_results=str)
+            self.assertEqual(resources["name"], name)
+            for function in RESOURCE_FUNCTIONS:
+                self.assertTrue(callable(resources[function]), f"{name} has no {function}")
+
+    def test_unknown_collector(self):
+        """Test that an unknown collector name is rejected."""
+        with self.assertRaises(ValueError):
+            load_collector_resources("pylint", create_results=str)
+
+
+class TestStartupImports(unittest.TestCase):
+    """Test that startup only imports what the selected collectors need."""
+
+    def setUp(self):
+        """Run each interpreter in an empty directory to see whether it creates logs/."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def test_importing_main_imports_no_collector(self):
+        """Test that importing main neither imports collector modules, pathspec or tracing nor creates the log directory."""
+        self.assertEqual(_imported_after("import main", self.temp_dir.name), [])
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir.name, "logs")))
+
+    def test_only_the_selected_collector_is_imported(self):
+        """Test that loading the flake8 collector imports only flake8's modules."""
+        imported = _imported_after(
+            "import main; main.load_collector_resources('flake8', main.create_results)", self.temp_dir.name
+        )
+        self.assertTrue(imported)
+        self.assertTrue(all(module.startswith("utils.reports.flake8") for module in imported), imported)
+
+
+if __name__ == "__main__":
+    unittest.main()
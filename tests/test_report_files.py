@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for writing and reading JSON reports in every format and compression.
+"""
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+
+from utils.common.report_files import (
+    PUBLISH_MODES, REPORT_COMPRESSIONS, REPORT_FORMATS, atomic_path, latest_report_path, publish_report,
+    read_report, report_suffix, timestamped_report_paths, write_report,
+)
+from utils.for_tests.view_report import view_report
+
+
+REPORT = {
+    "summary": {"name": "flake8", "errors": 2, "failures": 0, "tests": 0, "status": "fail", "duration": 0, "success_rate": 0},
+    "details": {
+        "test_cases": [],
+        "issues": [
+            {"file": "a.py", "line": "1", "error_code": "E501", "message": "line too long"},
+            {"file": "b.py", "line": "2", "error_code": "W291", "message": "trailing whitespace é"},
+        ],
+        "test_durations": {"tests.t.T.test_a": 0.1},
+    },
+}
+
+
+class TestReportFiles(unittest.TestCase):
+    """Test the report writer and reader."""
+
+    def setUp(self):
+        """Create a temporary reports directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.reports_dir = Path(self.temp_dir.name)
+
+    def test_every_format_round_trips(self):
+        """Test that a report reads back the same in every format and compression."""
+        for report_format in REPORT_FORMATS:
+            for compression in (None, *REPORT_COMPRESSIONS):
+                with self.subTest(report_format=report_format, compression=compression):
+                    path = self.reports_dir / f"report{report_suffix(report_format, compression)}"
+                    write_report(REPORT, path, report_format)
+                    self.assertEqual(read_report(path), REPORT)
+
+    def test_compact_is_plain_json(self):
+        """Test that the compact format is JSON without whitespace between tokens."""
+        path = self.reports_dir / "report.json"
+        write_report(REPORT, path, "compact")
+        self.assertEqual(path.read_text(encoding='utf-8'), json.dumps(REPORT, separators=(',', ':')))
+
+    def test_latest_report_path_is_the_newest_format(self):
+        """Test that the most recently written latest report is found, whatever its format."""
+        self.assertIsNone(latest_report_path(self.reports_dir, "flake8"))
+        older = self.reports_dir / "latest_flake8_report.json"
+        newer = self.reports_dir / "latest_flake8_report.jsonl.gz"
+        write_report(REPORT, older)
+        write_report(REPORT, newer, "jsonl")
+        os.utime(older, ns=(1, 1))
+        self.assertEqual(latest_report_path(self.reports_dir, "flake8"), newer)
+
+    def test_timestamped_reports_are_sorted_by_timestamp(self):
+        """Test that timestamped reports in different formats are ordered by their timestamps."""
+        for name in ("flake8_report_20250102_000000.json", "flake8_report_20250101_000000.jsonl.xz",
+                     "flake8_report_20250103_000000.md", "latest_flake8_report.json"):
+            (self.reports_dir / name).touch()
+        self.assertEqual(
+            [path.name for path in timestamped_report_paths(self.reports_dir, "flake8")],
+            ["flake8_report_20250101_000000.jsonl.xz", "flake8_report_20250102_000000.json"],
+        )
+
+    def test_view_report_reads_compressed_reports(self):
+        """Test that the report viewer shows a compressed JSON Lines report."""
+        path = self.reports_dir / "latest_flake8_report.jsonl.gz"
+        write_report(REPORT, path, "jsonl")
+        with redirect_stdout(io.StringIO()) as output:
+            self.assertTrue(view_report(path))
+        self.assertIn("Errors:               2", output.getvalue())
+
+
+class TestPublishReport(unittest.TestCase):
+    """Test publishing latest reports from timestamped ones."""
+
+    def setUp(self):
+        """Write a timestamped report and an outdated latest report."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.reports_dir = Path(self.temp_dir.name)
+        self.source = self.reports_dir / "flake8_report_20250101_000000.json"
+        self.latest = self.reports_dir / "latest_flake8_report.json"
+        write_report(REPORT, self.source)
+        self.latest.write_text("{}")
+
+    def test_every_mode_replaces_the_latest_report(self):
+        """Test that every mode leaves the latest report with the source's contents and no temporary files."""
+        for mode in PUBLISH_MODES:
+            with self.subTest(mode=mode):
+                publish_report(self.source, self.latest, mode)
+                self.assertEqual(read_report(self.latest), REPORT)
+                self.assertEqual(sorted(path.name for path in self.reports_dir.iterdir()), sorted([self.latest.name, self.source.name]))
+
+    def test_links_do_not_copy_the_report(self):
+        """Test that a hard link shares the source's file and a symbolic link points to it."""
+        publish_report(self.source, self.latest, "hardlink")
+        self.assertTrue(self.latest.samefile(self.source))
+        self.assertFalse(self.latest.is_symlink())
+
+        publish_report(self.source, self.latest, "symlink")
+        self.assertEqual(os.readlink(self.latest), self.source.name)
+
+    def test_failed_write_keeps_the_old_file(self):
+        """Test that a write that fails part way leaves the previous file in place."""
+        with self.assertRaises(RuntimeError):
+            with atomic_path(self.latest) as temp_path:
+                temp_path.write_text('{"half')
+                raise RuntimeError("interrupted")
+
+        self.assertEqual(self.latest.read_text(), "{}")
+        self.assertEqual(len(list(self.reports_dir.iterdir())), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for the whole-collector result cache.
+"""
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Optional
+
+
+from configs import Configs
+from main import RunTestsAndSaveTheirResults, create_results
+from reports.collector import Collector
+from utils.common.enumerate_project_files import clear_enumeration_cache
+from utils.common.result_cache import ResultCache
+
+
+class ResultCacheTestCase(unittest.TestCase):
+    """Base test case with a temporary project whose reports are kept inside it."""
+
+    def setUp(self):
+        """Create a project with one module and a test."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.project = Path(self.temp_dir.name)
+        self.write("pkg/a.py", "A = 1\n")
+        self.write("tests/test_a.py", "")
+        self.configs = Configs(
+            test_dir=self.project / "tests",
+            reports_dir=self.project / "test_reports",
+            respect_gitignore=False,
+            verbosity=1,
+            result_cache=True,
+        )
+        clear_enumeration_cache()
+        self.addCleanup(clear_enumeration_cache)
+
+    def tearDown(self):
+        """Remove the project."""
+        self.temp_dir.cleanup()
+
+    def write(self, relative_path: str, content: str) -> None:
+        """Write a file in the project."""
+        path = self.project / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+    def key(self, name: str = "corner_cutting") -> Optional[str]:
+        """Compute a collector's key from a fresh walk of the project."""
+        clear_enumeration_cache()
+        return ResultCache(self.configs.reports_dir).key(name, self.configs)
+
+
+class TestResultCacheKey(ResultCacheTestCase):
+    """Test what the cache key depends on."""
+
+    def test_key_is_stable(self):
+        """Test that the key does not change if nothing changed."""
+        self.assertEqual(self.key(), self.key())
+
+    def test_key_changes_with_file_contents(self):
+        """Test that changing an input file changes the key."""
+        before = self.key()
+        self.write("pkg/a.py", "A = 2\n")
+        self.assertNotEqual(before, self.key())
+
+    def test_key_ignores_unrelated_files_and_reports(self):
+        """Test that files a collector does not read, and the reports themselves, do not change the key."""
+        before = self.key()
+        self.write("README.md", "# Project\n")
+        self.write("test_reports/latest_corner_cutting_report.json", "{}")
+        self.assertEqual(before, self.key())
+
+    def test_key_ignores_the_log_file(self):
+        """Test that the log written when the tool runs inside the project does not change the key."""
+        cwd = os.getcwd()
+        os.chdir(self.project)
+        self.addCleanup(os.chdir, cwd)
+
+        before = self.key("unittest")
+        self.write("logs/app.log", "2025-01-01 - logger - INFO - a run\n")
+        self.assertEqual(before, self.key("unittest"))
+
+    def test_key_changes_with_settings(self):
+        """Test that settings that change the results change the key."""
+        before = self.key()
+        self.configs.corner_cutting_hash_contents = True
+        self.assertNotEqual(before, self.key())
+
+    def test_key_ignores_instrumentation_settings(self):
+        """Test that profiling and tracing a run do not change the key."""
+        before = self.key()
+        self.configs.profile = True
+        self.configs.trace = True
+        self.assertEqual(before, self.key())
+
+    def test_unknown_collectors_are_not_cached(self):
+        """Test that collectors with unknown inputs have no key."""
+        self.assertIsNone(self.key("custom"))
+
+
+class TestResultCacheLookup(ResultCacheTestCase):
+    """Test restoring results from the latest report."""
+
+    def write_report(self, name: str, report: dict) -> None:
+        """Write a collector's latest JSON report."""
+        with open(self.configs.reports_dir / f"latest_{name}_report.json", 'w') as f:
+            json.dump(report, f)
+
+    def test_hit_returns_latest_report(self):
+        """Test that a report written for the same key is returned."""
+        cache = ResultCache(self.configs.reports_dir)
+        self.write_report("corner_cutting", {"summary": {"status": "pass"}})
+        cache.store("corner_cutting", "key", "pass")
+        cache.save()
+
+        self.assertEqual(ResultCache(self.configs.reports_dir).lookup("corner_cutting", "key"), {"summary": {"status": "pass"}})
+        self.assertIsNone(ResultCache(self.configs.reports_dir).lookup("corner_cutting", "other key"))
+
+    def test_overwritten_report_is_a_miss(self):
+        """Test that a report rewritten after it was cached is not restored."""
+        cache = ResultCache(self.configs.reports_dir)
+        self.write_report("corner_cutting", {"summary": {"status": "pass"}})
+        cache.store("corner_cutting", "key", "pass")
+        self.write_report("corner_cutting", {"summary": {"status": "fail"}})
+
+        self.assertIsNone(cache.lookup("corner_cutting", "key"))
+
+    def test_failed_unittest_runs_are_not_reused(self):
+        """Test that failed test runs are run again, since they may be flaky."""
+        cache = ResultCache(self.configs.reports_dir)
+        self.write_report("unittest", {"summary": {"status": "fail"}})
+        cache.store("unittest", "key", "fail")
+
+        self.assertIsNone(cache.lookup("unittest", "key"))
+
+
+class TestRunWithResultCache(ResultCacheTestCase):
+    """Test that the runner skips collectors whose results are cached."""
+
+    def setUp(self):
+        """Count how often the collector's command runs."""
+        super().setUp()
+        self.runs = 0
+
+    def run_collector(self) -> Collector:
+        """Run a corner_cutting collector that finds one issue."""
+        def run_command(configs):
+            self.runs += 1
+            return None
+
+        def parse_output(output, results):
+            results.errors = 1
+            results.total_files_scanned = 2
+            results.corner_cutting = [{"file": "pkg/a.py", "line": 1, "message": "TODO"}]
+            return False
+
+        collector = Collector(configs=self.configs, resources={
+            "name": "corner_cutting",
+            "create_results": create_results,
+            "run_command": run_command,
+            "parse_output": parse_output,
+            "format_report": lambda results: [f"# {results.name} {results.errors}"],
+        })
+        clear_enumeration_cache()
+        RunTestsAndSaveTheirResults(self.configs, {"collectors": [collector]}).run()
+        return collector
+
+    def test_second_run_restores_results(self):
+        """Test that an unchanged project restores the results instead of running the command."""
+        first = self.run_collector()
+        second = self.run_collector()
+
+        self.assertEqual(self.runs, 1)
+        self.assertTrue(second.results.cached)
+        self.assertEqual(second.results.status, "fail")
+        self.assertEqual(second.results.errors, first.results.errors)
+        self.assertEqual(second.results.total_files_scanned, 2)
+        self.assertEqual(second.results.corner_cutting, first.results.corner_cutting)
+
+    def test_change_or_no_cache_runs_again(self):
+        """Test that a changed file or a disabled cache runs the command again."""
+        self.run_collector()
+        self.write("pkg/a.py", "A = 2\n")
+        self.run_collector()
+        self.configs.result_cache = False
+        self.run_collector()
+
+        self.assertEqual(self.runs, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
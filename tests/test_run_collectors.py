@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for running collectors serially and concurrently in RunTestsAndSaveTheirResults.
+"""
+import json
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from typing import Optional
+from unittest.mock import MagicMock
+
+
+from main import RunTestsAndSaveTheirResults, create_results
+from reports.collector import Collector
+
+
+def _make_collector(name: str, configs, delay: float, barrier: Optional[threading.Barrier] = None) -> Collector:
+    """Create a collector whose run_command sleeps for `delay` seconds."""
+    def run_command(configs):
+        if barrier is not None:
+            # Only passes if every collector is running at the same time.
+            barrier.wait(timeout=5)
+        time.sleep(delay)
+        return name
+
+    def parse_output(output, results):
+        results.errors = 0
+        return True
+
+    resources = {
+        "name": name,
+        "create_results": create_results,
+        "run_command": run_command,
+        "parse_output": parse_output,
+        "format_report": lambda results: [f"# {results.name}"],
+    }
+    return Collector(configs=configs, resources=resources)
+
+
+class TestRunCollectors(unittest.TestCase):
+    """Test serial and concurrent collector execution."""
+
+    def setUp(self):
+        """Set up a temporary reports directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.configs = MagicMock()
+        self.configs.reports_dir = Path(self.temp_dir.name)
+        self.configs.regression_window = 0
+        self.configs.report_format = "pretty"
+        self.configs.report_compression = None
+        self.configs.publish_latest = "hardlink"
+        self.configs.profile = False
+        self.configs.trace = False
+
+    def tearDown(self):
+        """Remove the temporary reports directory."""
+        self.temp_dir.cleanup()
+
+    def _run(self, jobs: int, barrier: Optional[threading.Barrier] = None) -> RunTestsAndSaveTheirResults:
+        self.configs.jobs = jobs
+        collectors = [
+            _make_collector("slow", self.configs, 0.2, barrier),
+            _make_collector("fast", self.configs, 0.0, barrier),
+        ]
+        runner = RunTestsAndSaveTheirResults(self.configs, {"collectors": collectors})
+        self.assertEqual(runner.run(), 0)
+        return runner
+
+    def test_serial_run_records_timings(self):
+        """Test that a serial run records a wall time for every collector."""
+        runner = self._run(jobs=1)
+
+        self.assertEqual(set(runner.timings), {"slow", "fast"})
+        self.assertGreaterEqual(runner.timings["slow"], 0.2)
+        self.assertGreaterEqual(runner.collectors[0].results.wall_time, 0.2)
+
+    def test_concurrent_run_overlaps_collectors(self):
+        """Test that collectors run at the same time when jobs > 1."""
+        runner = self._run(jobs=2, barrier=threading.Barrier(2))
+
+        for collector in runner.collectors:
+            self.assertEqual(collector.results.status, "pass")
+
+    def test_concurrent_run_writes_every_report(self):
+        """Test that a concurrent run still writes reports for each collector."""
+        self._run(jobs=2)
+
+        reports_dir = Path(self.temp_dir.name)
+        for name in ("slow", "fast"):
+            self.assertTrue((reports_dir / f"latest_{name}_report.json").exists())
+            self.assertTrue((reports_dir / f"latest_{name}_report.md").exists())
+
+    def test_collector_that_raises_does_not_stop_the_others(self):
+        """Test that the collectors after one that raises are still reported, and the run fails."""
+        def run_command(configs):
+            raise RuntimeError("tool is missing")
+
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                self.configs.jobs = jobs
+                resources = _make_collector("broken", self.configs, 0.0).resources
+                broken = Collector(configs=self.configs, resources={**resources, "run_command": run_command})
+                collectors = [broken, _make_collector("fast", self.configs, 0.0)]
+                runner = RunTestsAndSaveTheirResults(self.configs, {"collectors": collectors})
+
+                with self.assertLogs("logger", level="ERROR"):
+                    self.assertEqual(runner.run(), 1)
+                self.assertEqual(runner.collectors[1].results.status, "pass")
+                self.assertTrue((Path(self.temp_dir.name) / "latest_fast_report.json").exists())
+                self.assertFalse((Path(self.temp_dir.name) / "latest_broken_report.json").exists())
+
+    def test_profile_writes_pstats_and_summary(self):
+        """Test that --profile writes a .pstats file per collector and a summary, even with jobs > 1."""
+        self.configs.profile = True
+        runner = self._run(jobs=2)
+
+        reports_dir = Path(self.temp_dir.name)
+        for name in ("slow", "fast"):
+            self.assertEqual(len(list(reports_dir.glob(f"{name}_profile_*.pstats"))), 1)
+            self.assertEqual(set(runner.profiler.phase_times[name]), {
+                "run_command", "parse_output", "format_report", "generate_reports",
+            })
+        self.assertGreaterEqual(runner.profiler.phase_times["slow"]["run_command"], 0.2)
+        summary = next(reports_dir.glob("profile_summary_*.md")).read_text()
+        self.assertIn("## slow", summary)
+        self.assertIn("| run_command |", summary)
+
+    def test_no_profile_by_default(self):
+        """Test that nothing is profiled without --profile."""
+        runner = self._run(jobs=1)
+
+        self.assertIsNone(runner.profiler)
+        self.assertEqual(list(Path(self.temp_dir.name).glob("*.pstats")), [])
+
+    def test_trace_has_a_track_per_concurrent_collector(self):
+        """Test that --trace writes every phase of every collector, each thread on its own track."""
+        self.configs.trace = True
+        self._run(jobs=2, barrier=threading.Barrier(2))
+
+        reports_dir = Path(self.temp_dir.name)
+        self.assertEqual(len(list(reports_dir.glob("trace_*.json"))), 1)
+        with open(reports_dir / "latest_trace.json") as f:
+            events = [event for event in json.load(f)["traceEvents"] if event["ph"] == "X"]
+
+        for name in ("slow", "fast"):
+            phases = {event["name"] for event in events if event["args"].get("collector") == name}
+            self.assertTrue({"collector", "run_command", "parse_output", "format_report", "generate_reports"} <= phases)
+        threads = {event["tid"] for event in events if event["name"] == "run_command"}
+        self.assertEqual(len(threads), 2)
+        run_command = next(event for event in events if event["name"] == "run_command" and event["cat"] == "slow")
+        self.assertGreaterEqual(run_command["dur"], 200_000)
+        self.assertEqual(run_command["args"]["bytes"], len("slow"))
+
+
+if __name__ == "__main__":
+    unittest.main()
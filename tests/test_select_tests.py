@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for selecting the unittest tests affected by changed files.
+"""
+import tempfile
+import unittest
+from pathlib import Path
+
+
+from utils.common.enumerate_project_files import clear_enumeration_cache, enumerate_project_files
+from utils.common.timed_out_output import TimedOutOutput
+from utils.reports.unittest.run_command import _record_finished_run
+from utils.reports.unittest.select_tests import plan_impact_run, record_impact_run
+
+
+class TestPlanImpactRun(unittest.TestCase):
+    """Test choosing the test modules to run from the changed files."""
+
+    def setUp(self):
+        """Create a project with two source modules, each with its own test module."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.project = Path(self.temp_dir.name)
+        self.reports_dir = self.project / "test_reports"
+        self.reports_dir.mkdir()
+        self.addCleanup(clear_enumeration_cache)
+
+        self.write("pkg/__init__.py")
+        self.write("pkg/a.py", "A = 1\n")
+        self.write("pkg/b.py", "from pkg.a import A\nB = A\n")
+        self.write("pkg/c.py", "C = 3\n")
+        self.write("tests/__init__.py")
+        self.write("tests/test_b.py", "from pkg import b\n")
+        self.write("tests/test_c.py", "from pkg.c import C\n")
+        self.latest_report = {"details": {"test_cases": [], "test_durations": {
+            "tests.test_b.TestB.test_one": 0.1,
+            "tests.test_c.TestC.test_one": 0.1,
+            "tests.test_c.TestC.test_two": 0.2,
+        }}}
+
+    def tearDown(self):
+        """Remove the project."""
+        self.temp_dir.cleanup()
+
+    def write(self, relative_path: str, content: str = "") -> None:
+        """Write a file in the project."""
+        path = self.project / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+    def plan(self, full_run_every: int = 10, record: bool = True):
+        """Plan a run of the project and, like run_command, record it."""
+        clear_enumeration_cache()
+        selection = plan_impact_run(
+            self.project, enumerate_project_files(self.project), self.reports_dir,
+            self.latest_report, full_run_every=full_run_every,
+        )
+        if record:
+            record_impact_run(self.reports_dir, selection)
+        return selection
+
+    def test_first_run_is_a_full_run(self):
+        """Test that the whole suite is run when there is no previous run."""
+        selection = self.plan()
+        self.assertIsNone(selection.modules)
+        self.assertIn("no previous", selection.reason)
+        self.assertTrue((self.reports_dir / "test_impact.json").exists())
+
+    def test_nothing_changed_skips_every_test(self):
+        """Test that no tests are run when no file changed since the last run."""
+        self.plan()
+        selection = self.plan()
+        self.assertEqual(selection.modules, [])
+        self.assertEqual(selection.skipped, sorted(self.latest_report["details"]["test_durations"]))
+
+    def test_change_selects_modules_importing_it_indirectly(self):
+        """Test that changing a module runs the tests that import it through another module."""
+        self.plan()
+        self.write("pkg/a.py", "A = 100\n")
+        selection = self.plan()
+        self.assertEqual(selection.modules, ["tests.test_b"])
+        self.assertEqual(selection.files, ["tests/test_b.py"])
+        self.assertEqual(selection.changed_files, ["pkg/a.py"])
+        self.assertEqual(selection.skipped, ["tests.test_c.TestC.test_one", "tests.test_c.TestC.test_two"])
+
+    def test_failed_modules_are_run_again(self):
+        """Test that a test module with failures in the last report is run even if nothing changed."""
+        self.plan()
+        self.latest_report["details"]["test_cases"] = [{"module": "tests.test_c", "status": "FAIL"}]
+        self.assertEqual(self.plan().modules, ["tests.test_c"])
+
+    def test_tests_that_failed_to_load_cause_a_full_run(self):
+        """Test that the whole suite is run if a test module could not be imported last time."""
+        self.plan()
+        self.latest_report["details"]["test_cases"] = [{"module": "unittest.loader", "status": "ERROR"}]
+        selection = self.plan()
+        self.assertIsNone(selection.modules)
+        self.assertIn("outside the known test modules", selection.reason)
+
+    def test_fixture_errors_run_their_module_again(self):
+        """Test that errors in setUpClass and setUpModule, which have no module, rerun the module they are in."""
+        self.plan()
+        for test_id in ["setUpClass (tests.test_c.TestC)", "setUpModule (tests.test_c)"]:
+            with self.subTest(test_id=test_id):
+                self.latest_report["details"]["test_cases"] = [{"id": test_id, "module": "", "status": "ERROR"}]
+                self.assertEqual(self.plan().modules, ["tests.test_c"])
+
+    def test_failure_ids_of_both_output_formats(self):
+        """Test that failures are matched to their module from the IDs of the text output and of the events."""
+        self.plan()
+        for test_id in ["test_one (tests.test_b.TestB.test_one)", "test_one (tests.test_b.TestB)", "tests.test_b.TestB.test_one"]:
+            with self.subTest(test_id=test_id):
+                self.latest_report["details"]["test_cases"] = [{"id": test_id, "module": "garbled", "status": "FAIL"}]
+                self.assertEqual(self.plan().modules, ["tests.test_b"])
+
+    def test_test_module_that_failed_to_import_is_run_again(self):
+        """Test that a known test module that could not be imported is run again without a full run."""
+        self.plan()
+        self.latest_report["details"]["test_cases"] = [
+            {"id": "unittest.loader._FailedTest.tests.test_c", "module": "unittest.loader", "status": "ERROR"},
+        ]
+        self.assertEqual(self.plan().modules, ["tests.test_c"])
+
+    def test_deleted_file_causes_a_full_run(self):
+        """Test that the whole suite is run if a Python file was deleted."""
+        self.plan()
+        (self.project / "pkg" / "c.py").unlink()
+        self.assertIn("deleted", self.plan().reason)
+
+    def test_periodic_full_run(self):
+        """Test that the whole suite is run once every full_run_every runs."""
+        runs = [self.plan(full_run_every=3).modules is None for _ in range(7)]
+        self.assertEqual(runs, [True, False, False, True, False, False, True])
+
+    def test_timed_out_run_is_not_recorded(self):
+        """Test that the tests chosen for a run that timed out are chosen again."""
+        self.plan()
+        self.write("pkg/c.py", "C = 30\n")
+        selection = self.plan(record=False)
+        self.assertEqual(selection.modules, ["tests.test_c"])
+
+        # One of two shards timed out.
+        _record_finished_run(self.reports_dir, selection, [TimedOutOutput("", 5.0), "OK"])
+        self.assertEqual(self.plan().modules, ["tests.test_c"])
+        self.assertEqual(self.plan().modules, [])
+
+    def test_unknown_tests_are_skipped_by_module_name(self):
+        """Test that modules with no known test IDs are listed by name."""
+        self.latest_report = {}
+        self.plan()
+        self.assertEqual(self.plan().skipped, ["tests.test_b", "tests.test_c"])
+
+
+if __name__ == "__main__":
+    unittest.main()
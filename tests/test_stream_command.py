@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for streaming tool output into the incremental parsers.
+"""
+import subprocess
+import sys
+import tracemalloc
+import unittest
+from types import SimpleNamespace
+
+
+from utils.common.stream_command import stream_command
+from utils.reports.flake8.parse_output import Flake8OutputParser, parse_output as flake8_parse_output
+from utils.reports.unittest.parse_output import UnittestOutputParser, parse_output as unittest_parse_output
+
+
+UNITTEST_OUTPUT = """.EF.s
+======================================================================
+ERROR: test_b (tests.test_m.T.test_b)
+----------------------------------------------------------------------
+Traceback (most recent call last):
+  File "tests/test_m.py", line 6, in test_b
+KeyError: 'x'
+
+======================================================================
+FAIL: test_c (tests.test_m.T.test_c)
+----------------------------------------------------------------------
+Traceback (most recent call last):
+  File "tests/test_m.py", line 8, in test_c
+AssertionError: 1 != 2
+
+----------------------------------------------------------------------
+Ran 5 tests in 0.001s
+
+FAILED (failures=1, errors=1, skipped=1)
+"""
+
+
+class LineCounter:
+    """Parser that only counts the lines it is fed."""
+
+    def __init__(self):
+        self.lines = 0
+        self.last_line = None
+
+    def feed(self, line):
+        self.lines += 1
+        self.last_line = line
+
+    def progress(self):
+        return {"lines": self.lines}
+
+
+def python_command(code: str) -> list[str]:
+    """Return a command that runs a Python snippet."""
+    return [sys.executable, "-c", code]
+
+
+class TestStreamCommand(unittest.TestCase):
+    """Test running a command and feeding its output line by line."""
+
+    def test_feeds_stdout_and_stderr_lines(self):
+        """Test that both streams are fed, without line endings, and the exit code is returned."""
+        counter = LineCounter()
+        returncode = stream_command(python_command(
+            "import sys; print('a'); print('b', file=sys.stderr); sys.exit(3)"
+        ), counter)
+
+        self.assertEqual(returncode, 3)
+        self.assertEqual(counter.lines, 2)
+        self.assertIn(counter.last_line, ("a", "b"))
+
+    def test_memory_stays_bounded_on_large_outputs(self):
+        """Test that 100k lines of output are not buffered in memory."""
+        counter = LineCounter()
+        tracemalloc.start()
+        try:
+            stream_command(python_command("for i in range(100000): print('./pkg/module.py:1:1: E501 line too long', i)"), counter)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(counter.lines, 100000)
+        self.assertLess(peak, 1024 * 1024)
+
+    def test_timeout_kills_the_command(self):
+        """Test that a command running past its timeout is killed."""
+        with self.assertRaises(subprocess.TimeoutExpired):
+            stream_command(python_command("import time; print('started', flush=True); time.sleep(30)"), LineCounter(), timeout=0.5)
+
+    def test_streamed_flake8_output_matches_buffered_output(self):
+        """Test that streaming into the flake8 parser gives the same results as parsing the whole output."""
+        output = "".join(f"./pkg/m{i}.py:{i}:1: E302 expected 2 blank lines\n" for i in range(1, 50))
+        parser = Flake8OutputParser()
+        stream_command(python_command(f"import sys; sys.stdout.write({output!r})"), parser)
+
+        streamed, buffered = SimpleNamespace(), SimpleNamespace()
+        self.assertFalse(flake8_parse_output(parser, streamed))
+        self.assertFalse(flake8_parse_output(output, buffered))
+        self.assertEqual(vars(streamed), vars(buffered))
+        self.assertEqual(streamed.errors, 49)
+
+
+class TestUnittestOutputParser(unittest.TestCase):
+    """Test parsing unittest output one line at a time."""
+
+    def test_counts_and_failures(self):
+        """Test that the summary counts and each failure section are parsed."""
+        results = SimpleNamespace()
+        self.assertFalse(unittest_parse_output(UNITTEST_OUTPUT, results))
+
+        self.assertEqual((results.tests, results.failures, results.errors, results.skipped), (5, 1, 1, 1))
+        self.assertEqual([case["status"] for case in results.test_cases], ["ERROR", "FAIL"])
+        self.assertEqual([case["message"] for case in results.test_cases], ["KeyError: 'x'", "AssertionError: 1 != 2"])
+        self.assertNotIn("Ran 5 tests", results.test_cases[-1]["traceback"])
+
+    def test_progress_while_feeding(self):
+        """Test that progress is available before the output is complete."""
+        parser = UnittestOutputParser()
+        lines = UNITTEST_OUTPUT.splitlines()
+        for line in lines[:9]:
+            parser.feed(line)
+
+        self.assertEqual(parser.progress(), {"tests_run": 5, "failed_or_errored": 1})
+
+    def test_single_test_run(self):
+        """Test that "Ran 1 test" is counted."""
+        results = SimpleNamespace()
+        self.assertTrue(unittest_parse_output(".\n" + "-" * 70 + "\nRan 1 test in 0.000s\n\nOK\n", results))
+        self.assertEqual(results.tests, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for time budgets and for salvaging the output of runs that timed out.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+
+from main import create_results
+from reports.collector import Collector
+from utils.common.run_with_timeout import run_with_timeout
+from utils.common.stream_command import stream_command
+from utils.common.timed_out_output import TimedOutOutput
+from utils.reports.unittest.parse_output import UnittestEventParser, parse_output as unittest_parse_output
+
+
+# Starts a child that outlives it unless its whole process group is stopped,
+# prints the child's pid, and then hangs with an unfinished line of output.
+SPAWNS_CHILD = """
+import subprocess, sys, time
+child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+print(child.pid, flush=True)
+print("finished line", flush=True)
+sys.stdout.write("cut off")
+sys.stdout.flush()
+time.sleep(60)
+"""
+
+
+def _is_running(pid: int) -> bool:
+    """Return whether a process exists and is not a zombie."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().split(")")[-1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def _stops_soon(pid: int, timeout: float = 5.0) -> bool:
+    """Return whether a signalled process has stopped within timeout seconds."""
+    deadline = time.monotonic() + timeout
+    while _is_running(pid):
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+def _event(test_id: str, status: str = "pass") -> str:
+    """Return the event line the event runner writes for a finished test."""
+    module, class_name, name = test_id.rsplit(".", 2)
+    return json.dumps({
+        "event": "test", "id": test_id, "test_id": test_id, "module": module, "class": class_name,
+        "name": name, "status": status, "duration": 0.1, "message": "", "traceback": "",
+    })
+
+
+class LineCollector:
+    """Parser that keeps every line it is fed."""
+
+    def __init__(self):
+        self.lines = []
+
+    def feed(self, line):
+        self.lines.append(line)
+
+    def progress(self):
+        return {"lines": len(self.lines)}
+
+
+@unittest.skipUnless(os.path.isdir("/proc") and os.name == "posix", "needs /proc and process groups")
+class TestRunWithTimeout(unittest.TestCase):
+    """Test stopping commands that run out of time."""
+
+    def test_finished_command(self):
+        """Test that a command that finishes in time is not marked as timed out."""
+        result = run_with_timeout([sys.executable, "-c", "print('done')"], timeout=10)
+        self.assertFalse(result.timed_out)
+        self.assertEqual((result.returncode, result.output), (0, "done\n"))
+
+    def test_timeout_stops_the_process_group_and_keeps_output(self):
+        """Test that children are stopped too, and complete lines written before the timeout are kept."""
+        start = time.monotonic()
+        result = run_with_timeout([sys.executable, "-c", SPAWNS_CHILD], timeout=1)
+
+        self.assertTrue(result.timed_out)
+        self.assertLess(time.monotonic() - start, 10)
+        child_pid, line = result.stdout.splitlines()
+        self.assertEqual(line, "finished line")
+        self.assertTrue(_stops_soon(int(child_pid)))
+
+    def test_streamed_timeout_stops_the_process_group(self):
+        """Test that a streamed command's children are stopped and its parser keeps the lines."""
+        parser = LineCollector()
+        with self.assertRaises(subprocess.TimeoutExpired):
+            stream_command([sys.executable, "-c", SPAWNS_CHILD], parser, timeout=1)
+
+        self.assertEqual(parser.lines[1], "finished line")
+        self.assertTrue(_stops_soon(int(parser.lines[0])))
+
+
+class TestTimedOutResults(unittest.TestCase):
+    """Test parsing the output of a unittest run that timed out."""
+
+    def events_parser(self) -> UnittestEventParser:
+        """Return a parser fed with a run that stopped during its second test."""
+        parser = UnittestEventParser()
+        parser.feed(json.dumps({"event": "plan", "tests": ["tests.t.T.test_a", "tests.t.T.test_b", "tests.t.T.test_c"]}))
+        parser.feed(_event("tests.t.T.test_a"))
+        return parser
+
+    def test_unfinished_tests_are_listed(self):
+        """Test that the planned tests without events are the unfinished ones."""
+        results = SimpleNamespace()
+        self.assertFalse(unittest_parse_output(TimedOutOutput(self.events_parser(), 5.0), results))
+
+        self.assertTrue(results.timed_out)
+        self.assertEqual(results.timeout, 5.0)
+        self.assertEqual(results.tests, 1)
+        self.assertEqual(results.unfinished_tests, ["tests.t.T.test_b", "tests.t.T.test_c"])
+
+    def test_timed_out_text_output_keeps_the_finished_tests(self):
+        """Test that a text run stopped before its summary is counted from its verbose results."""
+        output = (
+            "test_a (tests.t.T.test_a) ... ok\n"
+            "test_b (tests.t.T.test_b) ... FAIL\n"
+            "test_c (tests.t.T.test_c)\nThe docstring of test_c. ... skipped 'not today'\n"
+            "test_d (tests.t.T.test_d) ... output of test_d\n"
+        )
+        results = SimpleNamespace()
+        self.assertFalse(unittest_parse_output(TimedOutOutput(output, 5.0), results))
+
+        self.assertTrue(results.timed_out)
+        self.assertEqual((results.tests, results.failures, results.errors, results.skipped), (3, 1, 0, 1))
+        self.assertEqual(results.unfinished_tests, ["tests.t.T.test_d"])
+
+    def test_timed_out_dots_output_is_counted(self):
+        """Test that a text run stopped before its summary is counted from its result characters."""
+        results = SimpleNamespace()
+        unittest_parse_output(TimedOutOutput("..F.E\n", 5.0), results)
+
+        self.assertEqual((results.tests, results.failures, results.errors), (5, 1, 1))
+        self.assertEqual(results.unfinished_tests, [])
+
+    def test_timed_out_shard_marks_the_run(self):
+        """Test that one timed-out shard marks the merged results as timed out."""
+        finished = UnittestEventParser()
+        finished.feed(_event("tests.u.U.test_x"))
+        finished.feed(json.dumps({"event": "run", "tests": 1, "successful": True, "duration": 0.1}))
+
+        results = SimpleNamespace()
+        unittest_parse_output([finished, TimedOutOutput(self.events_parser(), 5.0)], results)
+        self.assertTrue(results.timed_out)
+        self.assertEqual(results.tests, 2)
+        self.assertEqual(results.unfinished_tests, ["tests.t.T.test_b", "tests.t.T.test_c"])
+
+    def test_collector_status_is_timed_out(self):
+        """Test that the collector reports a timed_out status and keeps the partial results."""
+        collector = Collector(configs=SimpleNamespace(), resources={
+            "name": "unittest",
+            "create_results": create_results,
+            "run_command": lambda configs: TimedOutOutput(self.events_parser(), 5.0),
+            "parse_output": unittest_parse_output,
+            "format_report": lambda results: [],
+        })
+
+        self.assertFalse(collector.run())
+        self.assertEqual(collector.results.status, "timed_out")
+        report = collector.results.to_dict()
+        self.assertTrue(report["summary"]["timed_out"])
+        self.assertEqual(report["details"]["unfinished_tests"], ["tests.t.T.test_b", "tests.t.T.test_c"])
+
+
+@unittest.skipUnless(os.name == "posix", "the event runner is run through a POSIX shell script")
+class TestEventRunnerPlan(unittest.TestCase):
+    """Test the plan event written by the event runner."""
+
+    def test_plan_lists_every_test_first(self):
+        """Test that the first event lists the tests about to run."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            project = Path(temp_dir)
+            (project / "tests").mkdir()
+            (project / "tests" / "__init__.py").write_text("")
+            (project / "tests" / "test_m.py").write_text(
+                "import unittest\n\nclass T(unittest.TestCase):\n"
+                "    def test_a(self):\n        pass\n\n    def test_b(self):\n        pass\n"
+            )
+            events_path = project / "events.jsonl"
+            event_runner = Path(__file__).parent.parent / "utils" / "for_tests" / "event_runner.py"
+            subprocess.run([sys.executable, str(event_runner), str(events_path), str(project)],
+                           capture_output=True, cwd=project)
+            first = json.loads(events_path.read_text().splitlines()[0])
+
+        self.assertEqual(first, {"event": "plan", "tests": ["tests.test_m.T.test_a", "tests.test_m.T.test_b"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for recording spans and exporting them as Chrome trace events.
+"""
+import json
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+
+from utils.common.partial_output import PartialOutput
+from utils.common.timed_out_output import TimedOutOutput
+from utils.common.trace_events import Tracer, output_size
+
+
+class TestTracer(unittest.TestCase):
+    """Test recording spans and writing the trace."""
+
+    def test_span_records_complete_event(self):
+        """Test that a span becomes a complete event with the arguments added in the block."""
+        tracer = Tracer()
+        with tracer.span("run_command", collector="flake8") as span:
+            span["bytes"] = 42
+
+        event, = tracer.events
+        self.assertEqual(event["ph"], "X")
+        self.assertEqual(event["name"], "run_command")
+        self.assertEqual(event["cat"], "flake8")
+        self.assertEqual(event["pid"], os.getpid())
+        self.assertEqual(event["args"], {"collector": "flake8", "bytes": 42})
+        self.assertGreaterEqual(event["dur"], 0)
+
+    def test_span_records_errors(self):
+        """Test that a span that raised is still recorded, with the exception's type."""
+        tracer = Tracer()
+        with self.assertRaises(ValueError):
+            with tracer.span("parse_output", collector="mypy"):
+                raise ValueError("bad output")
+
+        self.assertEqual(tracer.events[0]["args"]["error"], "ValueError")
+
+    def test_threads_are_named_tracks(self):
+        """Test that spans from other threads get their thread's id and a thread name event."""
+        tracer = Tracer()
+        with tracer.span("compute_cache_keys"):
+            pass
+
+        def record():
+            with tracer.span("collector", collector="unittest"):
+                pass
+        worker = threading.Thread(target=record, name="worker")
+        worker.start()
+        worker.join()
+
+        trace = tracer.to_dict()
+        names = {event["args"]["name"] for event in trace["traceEvents"] if event["name"] == "thread_name"}
+        self.assertIn("worker", names)
+        spans = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+        self.assertEqual(len({event["tid"] for event in spans}), 2)
+        self.assertEqual(spans, sorted(spans, key=lambda event: event["ts"]))
+
+    def test_write(self):
+        """Test that the trace is written as a JSON object with traceEvents."""
+        tracer = Tracer()
+        with tracer.span("generate_reports", collector="flake8"):
+            pass
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "trace.json"
+            tracer.write(path)
+            with open(path) as f:
+                trace = json.load(f)
+
+        self.assertEqual(trace["displayTimeUnit"], "ms")
+        self.assertEqual([event["name"] for event in trace["traceEvents"] if event["ph"] == "X"], ["generate_reports"])
+
+
+class TestOutputSize(unittest.TestCase):
+    """Test measuring tool output."""
+
+    def test_sizes(self):
+        """Test text, bytes, wrapped and non-text outputs."""
+        self.assertEqual(output_size("é\n"), 3)
+        self.assertEqual(output_size(b"abc"), 3)
+        self.assertEqual(output_size(PartialOutput(TimedOutOutput("abcd", 1.0), "HEAD", [])), 4)
+        self.assertIsNone(output_size({"issues": []}))
+
+
+if __name__ == "__main__":
+    unittest.main()
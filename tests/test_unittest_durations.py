@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for per-test durations and the slowest tests sections of the unittest report.
+"""
+import json
+import unittest
+
+
+from utils.common.results import Results
+from utils.reports.unittest.format_report import SLOWEST_COUNT, format_report
+from utils.reports.unittest.parse_output import UnittestEventParser, parse_output
+
+
+def event(test_id: str, duration: float, status: str = "pass", **fields) -> str:
+    """Return an event line as written by the event runner."""
+    module, cls, name = test_id.rsplit('.', 2)
+    return json.dumps({
+        "event": "test", "id": test_id, "test_id": test_id, "module": module, "class": cls, "name": name,
+        "status": status, "duration": duration, "message": "", "traceback": "", **fields,
+    })
+
+
+def events_parser(*lines: str) -> UnittestEventParser:
+    """Return a parser that was fed the given event lines."""
+    parser = UnittestEventParser()
+    for line in lines:
+        parser.feed(line)
+    return parser
+
+
+class TestDurations(unittest.TestCase):
+    """Test recording per-test durations."""
+
+    def test_durations_from_events(self):
+        """Test that each test's duration and the run's duration are recorded."""
+        results = Results(name="unittest")
+        parse_output(events_parser(
+            event("tests.test_a.A.test_1", 0.5),
+            event("tests.test_a.A.test_2", 1.5),
+            json.dumps({"event": "run", "tests": 2, "successful": True, "duration": 2.1}),
+        ), results)
+
+        self.assertEqual(results.test_durations, {"tests.test_a.A.test_1": 0.5, "tests.test_a.A.test_2": 1.5})
+        self.assertEqual(results.duration, 2.1)
+
+    def test_subtests_are_timed_as_their_test(self):
+        """Test that failing subtests record the duration of the test they belong to."""
+        results = Results(name="unittest")
+        parse_output(events_parser(
+            event("tests.test_a.A.test_1", 0.3, "FAIL", id="tests.test_a.A.test_1 (i=1)"),
+            event("tests.test_a.A.test_1", 0.3, "FAIL", id="tests.test_a.A.test_1 (i=2)"),
+        ), results)
+
+        self.assertEqual(results.test_durations, {"tests.test_a.A.test_1": 0.3})
+
+    def test_errors_outside_tests_are_not_timed(self):
+        """Test that a setUpClass error does not show up as a test duration."""
+        results = Results(name="unittest")
+        parse_output(events_parser(json.dumps({
+            "event": "test", "id": "setUpClass (tests.test_a.A)", "module": "", "class": "", "name": "setUpClass (tests.test_a.A)",
+            "status": "ERROR", "duration": 0.0, "message": "RuntimeError", "traceback": "Traceback",
+        })), results)
+
+        self.assertEqual(results.test_durations, {})
+        self.assertEqual(results.errors, 1)
+
+    def test_text_output_sets_suite_duration(self):
+        """Test that the suite duration is read from "Ran N tests in X s"."""
+        results = Results(name="unittest")
+        parse_output("..\n" + "-" * 70 + "\nRan 2 tests in 1.250s\n\nOK\n", results)
+
+        self.assertEqual(results.duration, 1.25)
+        self.assertEqual(results.test_durations, {})
+
+    def test_shard_durations_are_merged(self):
+        """Test that shards' durations are combined and the slowest shard is the suite's duration."""
+        results = Results(name="unittest")
+        parse_output([
+            events_parser(event("tests.test_a.A.test_1", 1.0), json.dumps({"event": "run", "tests": 1, "successful": True, "duration": 1.1})),
+            events_parser(event("tests.test_b.B.test_1", 3.0), json.dumps({"event": "run", "tests": 1, "successful": True, "duration": 3.2})),
+        ], results)
+
+        self.assertEqual(set(results.test_durations), {"tests.test_a.A.test_1", "tests.test_b.B.test_1"})
+        self.assertEqual(results.duration, 3.2)
+
+
+class TestSlowestTestsReport(unittest.TestCase):
+    """Test the slowest tests sections of the markdown report."""
+
+    def report(self, test_durations: dict) -> list:
+        """Format a report for a passing run with the given durations."""
+        results = Results(name="unittest", tests=len(test_durations), test_durations=test_durations)
+        return format_report(results)
+
+    def test_lists_slowest_tests_and_classes(self):
+        """Test that tests and classes are listed slowest first."""
+        content = self.report({
+            "tests.test_a.A.test_1": 0.1,
+            "tests.test_a.A.test_2": 0.2,
+            "tests.test_b.B.test_1": 0.25,
+        })
+
+        self.assertIn("\n## Slowest 3 tests\n", content)
+        tests = [line for line in content if line.startswith("| tests.") and line.count("|") == 3]
+        self.assertEqual(tests[0], "| tests.test_b.B.test_1 | 0.250 |")
+
+        classes = [line for line in content if line.startswith("| tests.") and line.count("|") == 4]
+        self.assertEqual(classes, ["| tests.test_a.A | 2 | 0.300 |", "| tests.test_b.B | 1 | 0.250 |"])
+
+    def test_limits_number_of_tests(self):
+        """Test that only the slowest SLOWEST_COUNT tests are listed."""
+        content = self.report({f"tests.test_a.A.test_{index}": index / 10 for index in range(SLOWEST_COUNT + 5)})
+        self.assertIn(f"\n## Slowest {SLOWEST_COUNT} tests\n", content)
+
+    def test_no_section_without_durations(self):
+        """Test that the sections are left out when no timings were recorded."""
+        self.assertFalse(any("Slowest" in line for line in self.report({})))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for running unittest tests with the event runner and parsing their events.
+"""
+import json
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+
+from utils.reports.unittest import run_command as unittest_run_command
+from utils.reports.unittest.parse_output import UnittestEventParser, parse_output
+
+
+EVENT_RUNNER = Path(__file__).parent.parent / "utils" / "for_tests" / "event_runner.py"
+
+TEST_MODULE = textwrap.dedent('''
+    import unittest
+
+
+    class Outcomes(unittest.TestCase):
+        def test_pass(self):
+            print("=" * 70)
+            print("FAIL: this is only output")
+
+        def test_fail(self):
+            self.assertEqual(1, 2)
+
+        def test_error(self):
+            raise KeyError("missing")
+
+        @unittest.skip("not today")
+        def test_skip(self):
+            pass
+
+        @unittest.expectedFailure
+        def test_expected_failure(self):
+            self.assertTrue(False)
+
+        def test_subtests(self):
+            for i in range(3):
+                with self.subTest(i=i):
+                    self.assertLess(i, 2)
+
+
+    class BrokenSetUp(unittest.TestCase):
+        @classmethod
+        def setUpClass(cls):
+            raise RuntimeError("no database")
+
+        def test_never_runs(self):
+            pass
+''')
+
+
+class TestEventRunner(unittest.TestCase):
+    """Test the events written by the event runner."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Run the event runner on a small project once."""
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        project = Path(cls.temp_dir.name)
+        (project / "tests").mkdir()
+        (project / "tests" / "__init__.py").write_text("")
+        (project / "tests" / "test_outcomes.py").write_text(TEST_MODULE)
+
+        events_path = project / "events.jsonl"
+        cls.process = subprocess.run(
+            [sys.executable, str(EVENT_RUNNER), str(events_path), str(project)],
+            capture_output=True, text=True, cwd=project,
+        )
+        cls.event_lines = events_path.read_text().splitlines()
+        cls.events = [json.loads(line) for line in cls.event_lines]
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the project."""
+        cls.temp_dir.cleanup()
+
+    def test_one_event_per_outcome(self):
+        """Test that every outcome, including failing subtests and class errors, has an event."""
+        statuses = sorted(event["status"] for event in self.events if event["event"] == "test")
+        self.assertEqual(statuses, sorted(["pass", "FAIL", "ERROR", "skipped", "expected_failure", "FAIL", "ERROR"]))
+        self.assertEqual(self.events[-1]["event"], "run")
+
+    def test_events_carry_details(self):
+        """Test that test events carry the id, duration, message and traceback."""
+        fail = next(event for event in self.events if event.get("name") == "test_fail")
+        self.assertEqual(fail["id"], "tests.test_outcomes.Outcomes.test_fail")
+        self.assertEqual(fail["class"], "Outcomes")
+        self.assertEqual(fail["message"], "AssertionError: 1 != 2")
+        self.assertIn("Traceback", fail["traceback"])
+        self.assertGreaterEqual(fail["duration"], 0)
+
+        skip = next(event for event in self.events if event.get("status") == "skipped")
+        self.assertEqual(skip["message"], "not today")
+
+    def test_counts_match_text_output(self):
+        """Test that the events give the same counts as parsing the text output."""
+        from_events = SimpleNamespace()
+        from_text = SimpleNamespace()
+        parser = UnittestEventParser()
+        for line in self.event_lines:
+            parser.feed(line)
+
+        self.assertFalse(parse_output(parser, from_events))
+        self.assertFalse(parse_output(self.process.stderr, from_text))
+        for field in ("tests", "errors", "failures", "skipped", "expected_failures", "unexpected_successes"):
+            self.assertEqual(getattr(from_events, field), getattr(from_text, field), field)
+        self.assertEqual((from_events.tests, from_events.failures, from_events.errors), (6, 2, 2))
+
+    def test_separators_in_test_output_are_ignored(self):
+        """Test that a test printing unittest's separators does not add a failure."""
+        results = SimpleNamespace()
+        parser = UnittestEventParser()
+        for line in self.event_lines:
+            parser.feed(line)
+        parse_output(parser, results)
+
+        self.assertNotIn("this is only output", [case["id"] for case in results.test_cases])
+        self.assertEqual(len(results.test_cases), 4)
+
+
+class TestReadEvents(unittest.TestCase):
+    """Test reading an events file written by an interrupted run."""
+
+    def test_truncated_file_counts_finished_tests(self):
+        """Test that a cut-off last line is dropped and the tests before it are counted."""
+        event = {"event": "test", "id": "tests.t.T.test_a", "module": "tests.t", "class": "T", "name": "test_a",
+                 "status": "FAIL", "duration": 0.1, "message": "AssertionError", "traceback": "Traceback"}
+        with tempfile.TemporaryDirectory() as temp_dir:
+            events_path = Path(temp_dir) / "events.jsonl"
+            events_path.write_text(json.dumps(event) + "\n" + '{"event": "te')
+            parser = unittest_run_command._read_events(events_path)
+
+        results = SimpleNamespace()
+        self.assertFalse(parse_output(parser, results))
+        self.assertEqual((results.tests, results.failures), (1, 1))
+
+    def test_empty_file_returns_none(self):
+        """Test that no events means the text output should be parsed instead."""
+        with tempfile.NamedTemporaryFile(suffix=".jsonl") as events_file:
+            self.assertIsNone(unittest_run_command._read_events(Path(events_file.name)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for sharding the unittest suite and merging the shard outputs.
+"""
+from pathlib import Path
+import unittest
+from unittest.mock import MagicMock, patch
+
+
+from utils.common.results import Results
+from utils.reports.unittest import run_command
+from utils.reports.unittest.parse_output import parse_output
+from utils.reports.unittest.shard_tests import shard_tests
+
+
+FAILED_SHARD_OUTPUT = """..F.
+======================================================================
+FAIL: test_b (tests.test_m2.T2.test_b)
+----------------------------------------------------------------------
+Traceback (most recent call last):
+  File "tests/test_m2.py", line 4, in test_b
+AssertionError: 1 != 2
+
+----------------------------------------------------------------------
+Ran 4 tests in 0.001s
+
+FAILED (failures=1, skipped=1)
+"""
+
+PASSED_SHARD_OUTPUT = """....
+----------------------------------------------------------------------
+Ran 4 tests in 0.001s
+
+OK (skipped=1)
+"""
+
+
+class TestShardTests(unittest.TestCase):
+    """Test splitting test IDs into shards."""
+
+    def setUp(self):
+        """Set up test IDs for three classes of different sizes."""
+        self.test_ids = [
+            "tests.test_a.A.test_1", "tests.test_a.A.test_2", "tests.test_a.A.test_3",
+            "tests.test_b.B.test_1", "tests.test_b.B.test_2",
+            "tests.test_c.C.test_1",
+        ]
+
+    def test_every_test_is_assigned_once(self):
+        """Test that no test is dropped or duplicated."""
+        shards = shard_tests(self.test_ids, 2)
+        flattened = [test_id for shard in shards for test_id in shard]
+        self.assertCountEqual(flattened, self.test_ids)
+
+    def test_classes_are_kept_together(self):
+        """Test that all tests of a class end up in the same shard."""
+        for shard in shard_tests(self.test_ids, 3):
+            classes = {test_id.rsplit('.', 1)[0] for test_id in shard}
+            self.assertEqual(len(classes), 1)
+
+    def test_balances_by_count_without_durations(self):
+        """Test that shards are balanced by test count when no durations are known."""
+        shards = shard_tests(self.test_ids, 2)
+        self.assertEqual(sorted(len(shard) for shard in shards), [3, 3])
+
+    def test_balances_by_duration_when_known(self):
+        """Test that historical durations outweigh test counts."""
+        durations = {test_id: 0.1 for test_id in self.test_ids}
+        durations["tests.test_c.C.test_1"] = 10.0
+        shards = shard_tests(self.test_ids, 2, durations)
+        self.assertIn(["tests.test_c.C.test_1"], shards)
+
+    def test_never_returns_empty_shards(self):
+        """Test that asking for more shards than classes drops the empty ones."""
+        self.assertEqual(len(shard_tests(self.test_ids, 10)), 3)
+
+    def test_rejects_invalid_shard_count(self):
+        """Test that a shard count below one raises a ValueError."""
+        with self.assertRaises(ValueError):
+            shard_tests(self.test_ids, 0)
+
+    def test_no_tests_make_no_shards(self):
+        """Test that an empty list of test IDs is split into no shards."""
+        self.assertEqual(shard_tests([], 2), [])
+        self.assertEqual(shard_tests([], 2, {"tests.test_a.A.test_1": 1.0}), [])
+
+    def test_modules_without_tests_run_nothing(self):
+        """Test that sharding the tests of modules that have none starts no process."""
+        configs = MagicMock(unittest_shards=2, reports_dir="/nonexistent")
+        with patch.object(run_command, "_list_test_ids", return_value=self.test_ids), \
+                patch.object(run_command, "_run_tests") as run_tests:
+            output = run_command._run_shards(["bash"], Path("/project"), configs, ["tests.test_z"])
+
+        run_tests.assert_not_called()
+        results = Results("unittest")
+        parse_output(output, results)
+        self.assertEqual(results.tests, 0)
+
+
+class TestMergeShardOutputs(unittest.TestCase):
+    """Test merging the outputs of several shards into one Results object."""
+
+    def test_totals_are_summed(self):
+        """Test that counts from every shard are added together."""
+        results = Results(name="unittest")
+        success = parse_output([FAILED_SHARD_OUTPUT, PASSED_SHARD_OUTPUT], results)
+
+        self.assertFalse(success)
+        self.assertEqual(results.tests, 8)
+        self.assertEqual(results.failures, 1)
+        self.assertEqual(results.errors, 0)
+        self.assertEqual(results.skipped, 2)
+        self.assertAlmostEqual(results.success_rate, 87.5)
+        self.assertEqual(len(results.test_cases), 1)
+        self.assertEqual(results.test_cases[0]["status"], "FAIL")
+
+    def test_all_shards_passing(self):
+        """Test that a merged run passes when every shard passes."""
+        results = Results(name="unittest")
+        self.assertTrue(parse_output([PASSED_SHARD_OUTPUT, PASSED_SHARD_OUTPUT], results))
+        self.assertEqual(results.tests, 8)
+        self.assertEqual(results.success_rate, 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for watching a project's files and choosing the collectors to rerun.
+"""
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+
+from utils.common.watch_project import ProjectWatcher, collectors_for_changes
+
+
+ALL_COLLECTORS = ["unittest", "mypy", "flake8", "corner_cutting"]
+
+
+class TestProjectWatcher(unittest.TestCase):
+    """Test polling a project for changed files."""
+
+    def setUp(self):
+        """Create a project with a module, a test and a reports directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.root = Path(self.temp_dir.name)
+        self.write("pkg/module.py", "x = 1\n")
+        self.write("tests/test_module.py", "import unittest\n")
+        self.write("test_reports/latest_flake8_report.json", "{}")
+        self.watcher = ProjectWatcher(self.root, ignored_dirs=[self.root / "test_reports"])
+
+    def write(self, relative_path: str, content: str) -> None:
+        """Write a file, with an mtime that differs from any earlier write."""
+        path = self.root / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+        mtime_ns = getattr(self, "_mtime_ns", 1_000_000_000_000_000_000) + 1_000_000_000
+        self._mtime_ns = mtime_ns
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def test_nothing_changed(self):
+        """Test that polling an unchanged project finds nothing."""
+        self.assertEqual(self.watcher.poll(), set())
+
+    def test_added_modified_and_removed_files(self):
+        """Test that added, modified and removed files are all reported, once."""
+        self.write("pkg/new.py", "y = 2\n")
+        self.write("pkg/module.py", "x = 2\n")
+        (self.root / "tests" / "test_module.py").unlink()
+
+        self.assertEqual(self.watcher.poll(), {
+            os.path.join("pkg", "new.py"), os.path.join("pkg", "module.py"), os.path.join("tests", "test_module.py"),
+        })
+        self.assertEqual(self.watcher.poll(), set())
+
+    def test_ignored_dirs_and_pruned_dirs(self):
+        """Test that files in the reports directory and in pruned directories are not reported."""
+        self.write("test_reports/latest_flake8_report.json", '{"summary": {}}')
+        self.write(".mypy_cache/3.11/module.json", "{}")
+        self.write("pkg/__pycache__/module.cpython-311.pyc", "")
+
+        self.assertEqual(self.watcher.poll(), set())
+
+    def test_wait_for_changes_debounces_a_burst(self):
+        """Test that changes made while waiting for the burst to end are returned together."""
+        writes = [("pkg/module.py", "x = 3\n"), ("pkg/other.py", "z = 1\n")]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            # The first poll finds no change, the next two a change each.
+            if 1 < len(sleeps) <= 1 + len(writes):
+                self.write(*writes[len(sleeps) - 2])
+
+        changed = self.watcher.wait_for_changes(interval=0.01, debounce=0.05, sleep=sleep)
+
+        self.assertEqual(changed, {os.path.join("pkg", "module.py"), os.path.join("pkg", "other.py")})
+
+
+class TestCollectorsForChanges(unittest.TestCase):
+    """Test choosing the collectors affected by changed files."""
+
+    def test_documentation_runs_nothing(self):
+        """Test that a markdown change reruns no collector."""
+        self.assertEqual(collectors_for_changes(["README.md"], "tests", ALL_COLLECTORS), [])
+
+    def test_test_file_runs_only_unittest(self):
+        """Test that a change in the tests directory only reruns unittest."""
+        path = os.path.join("tests", "test_module.py")
+        self.assertEqual(collectors_for_changes([path], "tests", ALL_COLLECTORS), ["unittest"])
+
+    def test_source_file_runs_every_selected_collector(self):
+        """Test that a source change reruns every selected collector, in order."""
+        path = os.path.join("pkg", "module.py")
+        self.assertEqual(collectors_for_changes([path], "tests", ALL_COLLECTORS), ALL_COLLECTORS)
+        self.assertEqual(collectors_for_changes([path], "tests", ["flake8", "mypy"]), ["flake8", "mypy"])
+
+    def test_config_files_run_their_tools(self):
+        """Test that tool configuration files rerun the tools that read them."""
+        self.assertEqual(collectors_for_changes([".flake8"], "tests", ALL_COLLECTORS), ["flake8"])
+        self.assertEqual(collectors_for_changes(["setup.cfg"], "tests", ALL_COLLECTORS), ["mypy", "flake8"])
+        self.assertEqual(collectors_for_changes(["mypy.ini"], "tests", ["unittest"]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
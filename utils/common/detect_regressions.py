@@ -0,0 +1,199 @@
+import json
+import os
+from pathlib import Path
+from statistics import median
+from typing import Any, Optional
+
+
+from utils.common.report_files import read_report, timestamped_report_paths
+
+
+# Name of the file in the reports directory that keeps a collector's timings of its last runs,
+# one JSON line per run, so the baselines are built without reading whole reports.
+TIMINGS_FILE = "{name}_timings.jsonl"
+
+# Scales the median absolute deviation to the standard deviation of normally distributed timings.
+MAD_SCALE = 1.4826
+
+# Fewest past timings a baseline needs before a timing is compared against it.
+MIN_SAMPLES = 5
+
+# A timing is only flagged if it is at least this much slower than its baseline, relatively and in seconds.
+MIN_SLOWDOWN = 0.2
+MIN_SECONDS = 0.1
+
+
+def detect_regressions(results: Any, reports_dir: Path, window: int = 20, threshold: float = 3.0) -> list[dict[str, Any]]:
+    """
+    Find the timings of a run that are significantly slower than in earlier runs.
+
+    The baseline of each timing is the median and median absolute deviation (MAD) of
+    the same timing in the collector's last window runs, as saved by record_timings.
+    Until record_timings has run once, the timestamped JSON reports are read instead. A
+    timing regressed if it exceeds the median by more than threshold scaled MADs, and
+    by at least MIN_SLOWDOWN of the median and MIN_SECONDS. The collector's wall time
+    is compared, and for unittest every test's duration as well.
+
+    Args:
+        results: Results object of the run, before its report is written
+        reports_dir: Directory the collector's reports are written to
+        window: Number of past runs to build the baselines from
+        threshold: Number of scaled MADs a timing may exceed its median by
+
+    Returns:
+        list[dict]: The regressed timings, slowest first relative to their baseline. Each has
+            the "kind" ("collector" or "test") and "name" of the timing, its "duration", the
+            baseline's "median", "mad" and "samples", and the "slowdown" factor
+    """
+    if window <= 0 or getattr(results, "cached", False):
+        return []
+
+    timings = _past_timings(results.name, reports_dir, window)
+    regressions = []
+
+    # Wall times of runs that were partial or timed out are not comparable.
+    if not (getattr(results, "partial", False) or getattr(results, "timed_out", False)):
+        wall_times = [timing["wall_time"] for timing in timings if timing["wall_time"]]
+        regression = _compare("collector", results.name, results.wall_time, wall_times, threshold)
+        if regression:
+            regressions.append(regression)
+
+    durations: dict[str, list[float]] = {}
+    for timing in timings:
+        for test_id, duration in timing["test_durations"].items():
+            durations.setdefault(test_id, []).append(duration)
+    for test_id, duration in getattr(results, "test_durations", {}).items():
+        regression = _compare("test", test_id, duration, durations.get(test_id, []), threshold)
+        if regression:
+            regressions.append(regression)
+
+    return sorted(regressions, key=lambda regression: regression["slowdown"], reverse=True)
+
+
+def record_timings(results: Any, reports_dir: Path, window: int = 20) -> None:
+    """
+    Append a run's timings to the collector's timings file, keeping its last window runs.
+
+    Runs restored from the result cache are not timings of their own and are left out.
+    The file is replaced atomically, so a run reading it never sees half of it.
+
+    Args:
+        results: Results object of the run
+        reports_dir: Directory the collector's reports are written to
+        window: Number of runs to keep, as passed to detect_regressions
+    """
+    if window <= 0 or getattr(results, "cached", False):
+        return
+
+    comparable = not (getattr(results, "partial", False) or getattr(results, "timed_out", False))
+    timings = _past_timings(results.name, reports_dir, window - 1)
+    timings.append({
+        "wall_time": results.wall_time if comparable else None,
+        "test_durations": dict(getattr(results, "test_durations", {})),
+    })
+
+    path = reports_dir / TIMINGS_FILE.format(name=results.name)
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        for timing in timings:
+            f.write(json.dumps(timing, separators=(',', ':')) + "\n")
+    os.replace(temp_path, path)
+
+
+def format_regressions(regressions: list[dict[str, Any]]) -> list[str]:
+    """
+    Format performance regressions as a markdown section.
+
+    Args:
+        regressions: The regressions from detect_regressions
+
+    Returns:
+        list[str]: Lines of the section, or none if nothing regressed
+    """
+    if not regressions:
+        return []
+
+    content = [
+        "",
+        "## Performance regressions",
+        "",
+        "| Kind | Name | Duration | Baseline median | Baseline MAD | Slowdown |",
+        "| --- | --- | --- | --- | --- | --- |",
+    ]
+    for regression in regressions:
+        content.append(
+            f"| {regression['kind']} | {regression['name']} | {regression['duration']:.3f}s "
+            f"| {regression['median']:.3f}s | {regression['mad']:.3f}s | {regression['slowdown']:.2f}x |"
+        )
+    return content
+
+
+def _compare(kind: str, name: str, duration: float, samples: list[float], threshold: float) -> Optional[dict[str, Any]]:
+    """
+    Return a regression if duration is significantly slower than the samples, otherwise None.
+    """
+    if len(samples) < MIN_SAMPLES or not duration:
+        return None
+
+    baseline = median(samples)
+    mad = median(abs(sample - baseline) for sample in samples)
+    if (duration <= baseline + threshold * MAD_SCALE * mad
+            or duration < baseline * (1 + MIN_SLOWDOWN)
+            or duration - baseline < MIN_SECONDS):
+        return None
+
+    return {
+        "kind": kind,
+        "name": name,
+        "duration": round(duration, 3),
+        "median": round(baseline, 3),
+        "mad": round(mad, 3),
+        "samples": len(samples),
+        # A baseline of 0 seconds would make any slowdown infinite.
+        "slowdown": round(duration / max(baseline, 0.001), 2),
+    }
+
+
+def _past_timings(name: str, reports_dir: Path, window: int) -> list[dict[str, Any]]:
+    """
+    Return the wall time and test durations of the collector's last window runs.
+
+    The wall time of a run that was partial or timed out is None.
+    """
+    if window <= 0:
+        return []
+    try:
+        with open(reports_dir / TIMINGS_FILE.format(name=name), 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+    except FileNotFoundError:
+        return _past_reports(name, reports_dir, window)
+
+    timings = []
+    for line in lines[-window:]:
+        try:
+            timings.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return timings
+
+
+def _past_reports(name: str, reports_dir: Path, window: int) -> list[dict[str, Any]]:
+    """
+    Return the timings of the collector's last window timestamped reports, for runs from
+    before the timings file was kept.
+    """
+    timings = []
+    for path in timestamped_report_paths(reports_dir, name)[-window:]:
+        try:
+            report = read_report(path)
+        except (OSError, EOFError, ValueError):
+            continue
+        summary = report.get("summary", {})
+        if summary.get("cached"):
+            continue
+        comparable = not (summary.get("partial") or summary.get("timed_out"))
+        timings.append({
+            "wall_time": summary.get("wall_time") if comparable else None,
+            "test_durations": report.get("details", {}).get("test_durations") or {},
+        })
+    return timings
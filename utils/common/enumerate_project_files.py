@@ -0,0 +1,158 @@
+from dataclasses import dataclass
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+
+# Directories that are never descended into, besides any directory whose name starts with a dot.
+EXCLUDED_DIR_NAMES = frozenset({"venv", "node_modules", "__pycache__"})
+
+# Longest exclude value passed to flake8 or mypy. Linux limits each argument to 128 KiB.
+MAX_EXCLUDE_LENGTH = 32 * 1024
+
+
+@dataclass(frozen=True)
+class ProjectFile:
+    """A file found in the project, with the stat results from the walk."""
+    path: Path
+    relative_path: str
+    mtime_ns: int
+    size: int
+
+
+@dataclass(frozen=True)
+class ProjectTree:
+    """
+    The result of walking a project once.
+
+    Attributes:
+        root: Absolute path of the project directory
+        files: Every file that was not excluded, sorted by relative path
+        excluded_names: Names of directories that were pruned because of their name
+        ignored_dirs: Relative paths of the directories that were pruned by gitignore.
+            Gitignored files are only left out of files.
+    """
+    root: Path
+    files: tuple[ProjectFile, ...]
+    excluded_names: tuple[str, ...]
+    ignored_dirs: tuple[str, ...]
+
+    def files_with_suffix(self, *suffixes: str) -> list[ProjectFile]:
+        """Return the files whose names end with any of the given suffixes."""
+        return [file for file in self.files if file.relative_path.endswith(suffixes)]
+
+    def flake8_excludes(self) -> list[str]:
+        """
+        Return the pruned directories in the form flake8's --extend-exclude expects.
+
+        Names match a directory anywhere in the tree. Gitignored directories are prefixed
+        with "./" so flake8 treats them as paths relative to the project root. They are
+        left out if there are too many to pass as one argument, since the issues in
+        gitignored files are dropped when the output is parsed anyway.
+        """
+        excludes = list(self.excluded_names) + [f"./{path}" for path in self.ignored_dirs]
+        if len(','.join(excludes)) > MAX_EXCLUDE_LENGTH:
+            return list(self.excluded_names)
+        return excludes
+
+    def mypy_exclude(self) -> Optional[str]:
+        """
+        Return a regular expression for mypy's --exclude matching every pruned directory.
+
+        As for flake8, the gitignored directories are left out if there are too many.
+        """
+        alternatives = []
+        if self.excluded_names:
+            alternatives.append(f"(^|/)({'|'.join(re.escape(name) for name in self.excluded_names)})/")
+        if self.ignored_dirs:
+            ignored = f"^(\\./)?({'|'.join(re.escape(path) for path in self.ignored_dirs)})/"
+            if len(ignored) <= MAX_EXCLUDE_LENGTH:
+                alternatives.append(ignored)
+        return '|'.join(alternatives) or None
+
+
+_cache: dict[tuple[Path, int], ProjectTree] = {}
+_cache_lock = threading.Lock()
+
+
+def enumerate_project_files(project_dir: Path, gitignore_spec: Any = None) -> ProjectTree:
+    """
+    Walk a project once and return every file that is not excluded, with its stat results.
+
+    Directories named in EXCLUDED_DIR_NAMES, directories whose name starts with a dot
+    and, if a gitignore spec is given, gitignored directories are pruned before they
+    are descended into. The result is cached, so every collector in a run shares the
+    same walk. Call clear_enumeration_cache() to walk again.
+
+    Args:
+        project_dir: The project directory to walk
+        gitignore_spec: Optional PathSpec with gitignore patterns, matched against paths relative to project_dir
+
+    Returns:
+        ProjectTree: The files found and the paths that were pruned
+    """
+    root = Path(project_dir).resolve()
+    key = (root, id(gitignore_spec))
+
+    with _cache_lock:
+        if key not in _cache:
+            _cache[key] = _walk(root, gitignore_spec)
+        return _cache[key]
+
+
+def clear_enumeration_cache() -> None:
+    """
+    Forget all cached walks, e.g. at the start of a new run.
+    """
+    with _cache_lock:
+        _cache.clear()
+
+
+def _walk(root: Path, gitignore_spec: Any) -> ProjectTree:
+    """
+    Walk the project with os.scandir, pruning excluded directories in place.
+    """
+    files: list[ProjectFile] = []
+    excluded_names: set[str] = set()
+    ignored_dirs: list[str] = []
+
+    stack = [(str(root), "")]
+    while stack:
+        directory, relative_dir = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue
+
+        subdirectories = []
+        for entry in entries:
+            relative_path = os.path.join(relative_dir, entry.name) if relative_dir else entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name.startswith('.') or entry.name in EXCLUDED_DIR_NAMES:
+                        excluded_names.add(entry.name)
+                    elif gitignore_spec is not None and gitignore_spec.match_file(relative_path.replace(os.sep, '/') + '/'):
+                        ignored_dirs.append(relative_path)
+                    else:
+                        subdirectories.append((entry.path, relative_path))
+                elif entry.is_file():
+                    if gitignore_spec is not None and gitignore_spec.match_file(relative_path.replace(os.sep, '/')):
+                        continue
+                    stat = entry.stat()
+                    files.append(ProjectFile(Path(entry.path), relative_path, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                continue
+
+        # Push in reverse so directories are visited in name order.
+        stack.extend(reversed(subdirectories))
+
+    files.sort(key=lambda file: file.relative_path)
+    return ProjectTree(
+        root=root,
+        files=tuple(files),
+        excluded_names=tuple(sorted(excluded_names)),
+        ignored_dirs=tuple(sorted(ignored_dirs)),
+    )
@@ -0,0 +1,38 @@
+import subprocess
+from pathlib import Path
+
+
+def get_changed_files(project_dir: Path, ref: str) -> list[str]:
+    """
+    Return the files in a project that changed relative to a git ref.
+
+    This includes committed, staged and unstaged changes since the ref, and untracked
+    files that are not gitignored. Deleted files are left out.
+
+    Args:
+        project_dir: The project directory, which must be inside a git work tree
+        ref: The git ref to compare against, e.g. "HEAD" or "origin/main"
+
+    Returns:
+        list[str]: Sorted paths relative to project_dir, with "/" separators
+
+    Raises:
+        RuntimeError: If git fails, e.g. because the ref does not exist
+    """
+    commands = [
+        ["git", "diff", "--name-only", "--relative", ref, "--"],
+        ["git", "diff", "--name-only", "--relative", "--cached", ref, "--"],
+        ["git", "ls-files", "--others", "--exclude-standard"],
+    ]
+
+    changed: set[str] = set()
+    for cmd in commands:
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, cwd=project_dir)
+        except OSError as e:
+            raise RuntimeError(f"Error running git: {e}") from e
+        if result.returncode != 0:
+            raise RuntimeError(f"'{' '.join(cmd)}' failed: {result.stderr.strip()}")
+        changed.update(line for line in result.stdout.splitlines() if line)
+
+    return sorted(path for path in changed if (project_dir / path).is_file())
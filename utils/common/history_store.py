@@ -0,0 +1,245 @@
+from pathlib import Path
+import sqlite3
+from typing import Any, Optional
+
+
+from utils.reports.unittest.select_tests import _DESCRIBED_ID_PATTERN
+
+# Name of the database in the reports directory that every run is appended to.
+HISTORY_FILE = "history.sqlite3"
+
+# Bump this when the schema changes. Older databases are upgraded by dropping their tables.
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    collector TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    status TEXT NOT NULL,
+    errors INTEGER NOT NULL,
+    failures INTEGER NOT NULL,
+    tests INTEGER NOT NULL,
+    issues INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    wall_time REAL NOT NULL,
+    partial INTEGER NOT NULL,
+    cached INTEGER NOT NULL,
+    timed_out INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_collector ON runs (collector, id);
+
+CREATE TABLE IF NOT EXISTS issues (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    collector TEXT NOT NULL,
+    file TEXT,
+    line INTEGER,
+    code TEXT,
+    message TEXT
+);
+CREATE INDEX IF NOT EXISTS issues_by_run ON issues (run_id);
+CREATE INDEX IF NOT EXISTS issues_by_file ON issues (file, run_id);
+
+CREATE TABLE IF NOT EXISTS tests (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    test_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    duration REAL
+);
+CREATE INDEX IF NOT EXISTS tests_by_run ON tests (run_id);
+CREATE INDEX IF NOT EXISTS tests_by_test ON tests (test_id, run_id);
+"""
+
+
+class HistoryStore:
+    """
+    SQLite database of every collector run, with its summary, issues and tests.
+
+    Each run is one row in "runs". Lint, type and corner-cutting issues are rows in
+    "issues", and every test of a unittest run is a row in "tests". The tables are
+    indexed by run, collector, file and test id, so the query methods below read only
+    the rows they need, however long the history gets.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Open the database, creating it if needed.
+
+        Args:
+            path: Path to the SQLite file, e.g. reports_dir / HISTORY_FILE
+        """
+        self.path = Path(path)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        # Readers can query the history while a run appends to it.
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self._create_schema()
+
+    def __enter__(self) -> "HistoryStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the database."""
+        self.connection.close()
+
+    def record(self, results: Any) -> int:
+        """
+        Append a collector's results to the history.
+
+        Args:
+            results: Results object of a finished collector
+
+        Returns:
+            int: The id of the new run
+        """
+        issues = _issue_rows(results)
+        tests = _test_rows(results)
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO runs (collector, timestamp, status, errors, failures, tests, issues, duration, wall_time,"
+                " partial, cached, timed_out) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    results.name, results.timestamp, results.status, results.errors, results.failures, results.tests,
+                    len(issues), results.duration or 0, results.wall_time or 0, bool(getattr(results, "partial", False)),
+                    bool(getattr(results, "cached", False)), bool(getattr(results, "timed_out", False)),
+                ),
+            )
+            run_id = cursor.lastrowid
+            assert run_id is not None  # Set by every INSERT
+            self.connection.executemany(
+                "INSERT INTO issues (run_id, collector, file, line, code, message) VALUES (?, ?, ?, ?, ?, ?)",
+                [(run_id, results.name, *issue) for issue in issues],
+            )
+            self.connection.executemany(
+                "INSERT INTO tests (run_id, test_id, status, duration) VALUES (?, ?, ?, ?)",
+                [(run_id, *test) for test in tests],
+            )
+        return run_id
+
+    def runs(self, collector: str, last: int = 20) -> list[dict[str, Any]]:
+        """
+        Return the summaries of a collector's last runs, oldest first.
+
+        Args:
+            collector: Name of the collector
+            last: Number of runs to return
+
+        Returns:
+            list[dict]: One dict per run, with the columns of the "runs" table
+        """
+        cursor = self.connection.execute(
+            "SELECT * FROM runs WHERE collector = ? ORDER BY id DESC LIMIT ?", (collector, last)
+        )
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in reversed(cursor.fetchall())]
+
+    def issue_count_trend(self, collector: str, last: int = 20) -> list[tuple[str, int]]:
+        """
+        Return the number of issues a collector found in each of its last runs, oldest first.
+
+        Args:
+            collector: Name of the collector, e.g. "flake8"
+            last: Number of runs to return
+
+        Returns:
+            list[tuple[str, int]]: The timestamp and issue count of each run
+        """
+        rows = self.connection.execute(
+            "SELECT timestamp, issues FROM runs WHERE collector = ? ORDER BY id DESC LIMIT ?", (collector, last)
+        ).fetchall()
+        return rows[::-1]
+
+    def test_failure_rate(self, test_id: str, last: int = 200) -> Optional[float]:
+        """
+        Return how often a test failed or errored in the last runs that finished it.
+
+        Args:
+            test_id: Id of the test, e.g. "tests.test_a.TestA.test_a"
+            last: Number of runs to look back over
+
+        Returns:
+            Optional[float]: The failure rate between 0 and 1, or None if the test never ran
+        """
+        total, failed = self.connection.execute(
+            "SELECT COUNT(*), SUM(status IN ('FAIL', 'ERROR')) FROM"
+            " (SELECT status FROM tests WHERE test_id = ? AND status != 'unfinished' ORDER BY run_id DESC LIMIT ?)",
+            (test_id, last),
+        ).fetchone()
+        return failed / total if total else None
+
+    def issues_in_file(self, file: str, limit: int = 100) -> list[dict[str, Any]]:
+        """
+        Return the issues found in a file by the latest run of each collector.
+
+        Args:
+            file: Path of the file, as the collectors report it
+            limit: Maximum number of issues to return
+
+        Returns:
+            list[dict]: The collector, line, code and message of each issue
+        """
+        rows = self.connection.execute(
+            "SELECT collector, line, code, message FROM issues WHERE file = ? AND run_id IN"
+            " (SELECT MAX(id) FROM runs GROUP BY collector)"
+            " ORDER BY collector, line LIMIT ?",
+            (file, limit),
+        ).fetchall()
+        return [dict(zip(("collector", "line", "code", "message"), row)) for row in rows]
+
+    def _create_schema(self) -> None:
+        """
+        Create the tables and indexes, replacing those of an older schema version.
+        """
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        with self.connection:
+            if version not in (0, SCHEMA_VERSION):
+                for table in ("tests", "issues", "runs"):
+                    self.connection.execute(f"DROP TABLE IF EXISTS {table}")
+            self.connection.executescript(_SCHEMA)
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+def _issue_rows(results: Any) -> list[tuple[Any, ...]]:
+    """
+    Return the file, line, code and message of each issue in a collector's results.
+    """
+    issues = getattr(results, "corner_cutting", None) if results.name == "corner_cutting" else results.issues
+    rows = []
+    for issue in issues or []:
+        line = issue.get("line")
+        rows.append((
+            issue.get("file"),
+            int(line) if str(line).isdigit() else None,
+            issue.get("error_code") or issue.get("category"),
+            issue.get("message"),
+        ))
+    return rows
+
+
+def _test_rows(results: Any) -> list[tuple[str, str, Optional[float]]]:
+    """
+    Return the id, status and duration of each test in a unittest run.
+
+    No rows are returned if the run did not report the outcome of each test, e.g. the
+    text output without -v, since its failures alone would look like the only tests that
+    ran. Subtests are recorded under the test they belong to.
+    """
+    statuses = dict(getattr(results, "test_statuses", {})) if results.name == "unittest" else {}
+    if not statuses:
+        return []
+
+    for case in results.test_cases:
+        # The text output describes a test as "test_y (tests.test_x.TestX.test_y)".
+        described = _DESCRIBED_ID_PATTERN.fullmatch(case["id"])
+        # A subtest's id is its test's id followed by its parameters.
+        test_id = described.group(1) if described else case["id"].split(" ", 1)[0]
+        if statuses.get(test_id) != "ERROR":
+            statuses[test_id] = case["status"]
+    for test_id in getattr(results, "unfinished_tests", []):
+        statuses.setdefault(test_id, "unfinished")
+
+    durations = getattr(results, "test_durations", {})
+    return [(test_id, status, durations.get(test_id)) for test_id, status in statuses.items()]
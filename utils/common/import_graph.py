@@ -0,0 +1,181 @@
+from dataclasses import dataclass
+import ast
+import json
+import os
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+
+from utils.common.enumerate_project_files import ProjectTree
+
+
+# Bump this when the shape of the cached imports changes, so old caches are discarded.
+CACHE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class ImportGraph:
+    """
+    The imports between a project's Python files.
+
+    Attributes:
+        imports: Relative path of each Python file, with "/" separators, mapped to
+            the relative paths of the project files it imports
+    """
+    imports: dict[str, frozenset[str]]
+
+    def dependents(self, paths: Iterable[str]) -> set[str]:
+        """
+        Return the given files and every file that imports any of them, directly or indirectly.
+        """
+        importers: dict[str, set[str]] = {}
+        for path, imported in self.imports.items():
+            for dependency in imported:
+                importers.setdefault(dependency, set()).add(path)
+        return _reachable(paths, importers)
+
+    def dependencies(self, paths: Iterable[str]) -> set[str]:
+        """
+        Return the given files and every project file they import, directly or indirectly.
+        """
+        return _reachable(paths, self.imports)
+
+
+def build_import_graph(tree: ProjectTree, cache_path: Optional[Path] = None) -> ImportGraph:
+    """
+    Build the import graph of the Python files found by a project walk.
+
+    Each file's imports are read with ast. If a cache path is given, the imports of
+    files whose mtime and size are unchanged are reused from it, and the cache is
+    updated for the next run.
+
+    Args:
+        tree: The project walk, from enumerate_project_files
+        cache_path: Optional path to the JSON file to cache each file's imports in
+
+    Returns:
+        ImportGraph: The imports between the project's files
+    """
+    files = tree.files_with_suffix(".py")
+    cached = _load_cache(cache_path) if cache_path else {}
+
+    entries: dict[str, dict[str, Any]] = {}
+    for project_file in files:
+        relative_path = Path(project_file.relative_path).as_posix()
+        entry = cached.get(relative_path)
+        if entry is None or entry["mtime_ns"] != project_file.mtime_ns or entry["size"] != project_file.size:
+            entry = {
+                "mtime_ns": project_file.mtime_ns,
+                "size": project_file.size,
+                "imports": _read_imports(project_file.path, relative_path),
+            }
+        entries[relative_path] = entry
+
+    if cache_path and entries != cached:
+        _save_cache(cache_path, entries)
+
+    modules: dict[str, str] = {}
+    for relative_path in entries:
+        for name in _module_names(relative_path):
+            modules.setdefault(name, relative_path)
+
+    imports = {}
+    for relative_path, entry in entries.items():
+        imported = set()
+        for name in entry["imports"]:
+            # Importing a.b.c also runs a and a.b, and "from a import b" may import a.b.
+            parts = name.split('.')
+            for end in range(1, len(parts) + 1):
+                target = modules.get('.'.join(parts[:end]))
+                if target is not None and target != relative_path:
+                    imported.add(target)
+        imports[relative_path] = frozenset(imported)
+
+    return ImportGraph(imports)
+
+
+def _reachable(start: Iterable[str], edges: dict[str, Any]) -> set[str]:
+    """
+    Return the nodes reachable from the start nodes, including the start nodes.
+    """
+    seen = set(start)
+    stack = list(seen)
+    while stack:
+        for neighbour in edges.get(stack.pop(), ()):
+            if neighbour not in seen:
+                seen.add(neighbour)
+                stack.append(neighbour)
+    return seen
+
+
+def _module_names(relative_path: str) -> list[str]:
+    """
+    Return the dotted names a file can be imported as, e.g. "pkg.mod" for "pkg/mod.py".
+
+    Files in a top-level "src" directory can also be imported without the "src." prefix.
+    """
+    parts = relative_path[:-len(".py")].split('/')
+    if parts[-1] == "__init__":
+        parts.pop()
+    if not parts:
+        return []
+
+    names = ['.'.join(parts)]
+    if parts[0] == "src" and len(parts) > 1:
+        names.append('.'.join(parts[1:]))
+    return names
+
+
+def _read_imports(path: Path, relative_path: str) -> list[str]:
+    """
+    Return the absolute dotted names imported by a file, or no names if it cannot be parsed.
+    """
+    try:
+        tree = ast.parse(path.read_bytes(), filename=str(path))
+    except (OSError, SyntaxError, ValueError):
+        return []
+
+    # The package relative imports are resolved against
+    package = relative_path[:-len(".py")].split('/')[:-1]
+
+    names: set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                if node.level - 1 > len(package):
+                    continue
+                base = package[:len(package) - (node.level - 1)]
+                module = '.'.join(base + ([node.module] if node.module else []))
+            else:
+                module = node.module or ""
+            if not module:
+                continue
+            names.add(module)
+            names.update(f"{module}.{alias.name}" for alias in node.names if alias.name != "*")
+    return sorted(names)
+
+
+def _load_cache(cache_path: Path) -> dict[str, dict[str, Any]]:
+    """
+    Load the cached imports of each file, or nothing if the cache is missing or outdated.
+    """
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if cache.get("version") != CACHE_VERSION:
+        return {}
+    return cache.get("files", {})
+
+
+def _save_cache(cache_path: Path, files: dict[str, dict[str, Any]]) -> None:
+    """
+    Save the imports of each file, replacing the cache file atomically.
+    """
+    temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({"version": CACHE_VERSION, "files": files}, f)
+    os.replace(temp_path, cache_path)
@@ -1,11 +1,13 @@
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 
-import pathspec
+# pathspec is imported when patterns are loaded, so runs that do not respect .gitignore never import it.
+if TYPE_CHECKING:
+    import pathspec
 
 
-def load_gitignore_patterns_if_needed(respect_gitignore: bool, reports_dir: Path) -> Optional[pathspec.PathSpec]:
+def load_gitignore_patterns_if_needed(respect_gitignore: bool, reports_dir: Path) -> Optional["pathspec.PathSpec"]:
     """
     Load patterns from a .gitignore file if respect_gitignore is True.
 
@@ -32,6 +34,7 @@ def load_gitignore_patterns_if_needed(respect_gitignore: bool, reports_dir: Path
         with open(gitignore_path, 'r') as f:
             patterns = f.read().splitlines()
 
+        import pathspec
         gitignore_spec = pathspec.PathSpec.from_lines('gitwildmatch', patterns)
 
         if gitignore_spec:
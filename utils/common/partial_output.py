@@ -0,0 +1,43 @@
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass
+class PartialOutput:
+    """
+    The output of a tool that only checked the files changed since a git ref,
+    or only ran the tests affected by changed files.
+
+    Attributes:
+        output: The tool's output, in whatever form its parse_output accepts
+        changed_since: The git ref the changes were found against, or "" if they were
+            found against the last run
+        files: Relative paths of the files the tool checked
+        skipped: IDs of the tests left out because the changes did not affect them
+    """
+    output: Any
+    changed_since: str
+    files: list[str]
+    skipped: list[str] = field(default_factory=list)
+
+
+def unwrap_partial_output(output: Any, results: Any) -> Any:
+    """
+    Record on results whether the run was partial and return the tool's output.
+
+    Args:
+        output: The output from run_command, which may be a PartialOutput
+        results: Results object to update
+
+    Returns:
+        Any: The tool's output
+    """
+    if isinstance(output, PartialOutput):
+        results.partial = True
+        results.changed_since = output.changed_since
+        results.checked_files = list(output.files)
+        results.skipped_unaffected = list(output.skipped)
+        return output.output
+
+    results.partial = False
+    return output
@@ -0,0 +1,128 @@
+import cProfile
+from contextlib import contextmanager
+import functools
+from pathlib import Path
+import pstats
+import time
+from typing import Any, Callable, Iterator
+
+
+# Phases of every collector that are profiled. format_report is called by
+# generate_reports, so its time is also part of generate_reports.
+PROFILED_PHASES = ("run_command", "parse_output", "format_report", "generate_reports")
+
+# Number of functions listed per collector in the summary.
+SUMMARY_TOP = 20
+
+
+class PhaseProfiler:
+    """
+    cProfile profiler of each phase of every collector.
+
+    Each collector has one profile, enabled only while one of its phases runs, so its
+    .pstats file holds the phases and nothing of the runner in between. The wall time
+    of each phase is recorded as well, so the summary shows which phase a run was slow in.
+
+    cProfile can only profile one thread at a time, so the collectors must run one after another.
+    """
+
+    def __init__(self, top: int = SUMMARY_TOP) -> None:
+        self.top = top
+        self.profiles: dict[str, cProfile.Profile] = {}
+        self.phase_times: dict[str, dict[str, float]] = {}
+        self._active = False
+
+    @contextmanager
+    def phase(self, collector: str, phase: str) -> Iterator[None]:
+        """
+        Profile a phase of a collector and add its wall time to the collector's phase times.
+
+        A phase started inside another one is only timed, since the outer phase's profile
+        already covers it.
+
+        Args:
+            collector: Name of the collector
+            phase: Name of the phase, one of PROFILED_PHASES
+        """
+        profile = self.profiles.setdefault(collector, cProfile.Profile())
+        times = self.phase_times.setdefault(collector, {})
+        nested = self._active
+        start = time.perf_counter()
+        if not nested:
+            self._active = True
+            profile.enable()
+        try:
+            yield
+        finally:
+            if not nested:
+                profile.disable()
+                self._active = False
+            times[phase] = times.get(phase, 0.0) + time.perf_counter() - start
+
+    def wrap(self, collector: str, phase: str, function: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Return function wrapped so every call is profiled as a phase of a collector.
+        """
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with self.phase(collector, phase):
+                return function(*args, **kwargs)
+        return wrapper
+
+    def instrument(self, collector: Any) -> None:
+        """
+        Profile the run_command, parse_output and format_report resources of a collector.
+
+        Args:
+            collector: The Collector, before it runs
+        """
+        for phase in ("run_command", "parse_output", "format_report"):
+            function = getattr(collector, f"_{phase}", None)
+            if function:
+                setattr(collector, f"_{phase}", self.wrap(collector.name, phase, function))
+
+    def write(self, reports_dir: Path, timestamp: str) -> list[Path]:
+        """
+        Write a .pstats file per collector and a summary of all of them to the reports directory.
+
+        Args:
+            reports_dir: Directory the reports are written to
+            timestamp: Timestamp of the run, as in the report file names
+
+        Returns:
+            list[Path]: The paths written, the summary last
+        """
+        paths = []
+        summary = [f"# Profile of the run at {timestamp}", ""]
+        for collector, profile in self.profiles.items():
+            path = Path(reports_dir) / f"{collector}_profile_{timestamp}.pstats"
+            profile.dump_stats(path)
+            paths.append(path)
+            summary += self._format_collector(collector, profile, path)
+
+        summary_path = Path(reports_dir) / f"profile_summary_{timestamp}.md"
+        summary_path.write_text('\n'.join(summary))
+        paths.append(summary_path)
+        return paths
+
+    def _format_collector(self, collector: str, profile: cProfile.Profile, path: Path) -> list[str]:
+        """
+        Format the phase times and the top cumulative functions of a collector as markdown.
+        """
+        times = self.phase_times.get(collector, {})
+        lines = [f"## {collector}", "", f"Full profile: `{path.name}` (open with `python -m pstats {path.name}`)", ""]
+        lines += ["| Phase | Seconds |", "| --- | ---: |"]
+        for phase in PROFILED_PHASES:
+            if phase in times:
+                lines.append(f"| {phase} | {times[phase]:.3f} |")
+
+        lines += ["", f"Top {self.top} functions by cumulative time:", ""]
+        lines += ["| Function | Calls | Own seconds | Cumulative seconds |", "| --- | ---: | ---: | ---: |"]
+        # pstats keeps (primitive calls, calls, own time, cumulative time, callers) per function.
+        stats = pstats.Stats(profile).stats  # type: ignore[attr-defined]
+        top = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:self.top]
+        for (file, line, function), (_, calls, own, cumulative, _) in top:
+            location = f"{Path(file).name}:{line}" if file != "~" else "built-in"
+            lines.append(f"| `{function}` ({location}) | {calls} | {own:.3f} | {cumulative:.3f} |")
+        lines.append("")
+        return lines
@@ -0,0 +1,275 @@
+from contextlib import contextmanager
+import json
+import os
+from pathlib import Path
+from typing import IO, Any, Iterator, Optional, cast
+
+
+# How JSON reports can be written. "pretty" is indented JSON, "compact" is JSON without
+# whitespace, and "jsonl" is JSON Lines with the summary first and one line per detail record.
+REPORT_FORMATS = ("pretty", "compact", "jsonl")
+
+# How JSON reports can be compressed, besides not at all.
+REPORT_COMPRESSIONS = ("gzip", "xz")
+
+# File suffixes of JSON reports in every format and compression.
+_FORMAT_SUFFIXES = {"pretty": ".json", "compact": ".json", "jsonl": ".jsonl"}
+_COMPRESSION_SUFFIXES = {"gzip": ".gz", "xz": ".xz"}
+JSON_REPORT_SUFFIXES = tuple(
+    f"{format_suffix}{compression_suffix}"
+    for compression_suffix in (*_COMPRESSION_SUFFIXES.values(), "")
+    for format_suffix in (".jsonl", ".json")
+)
+
+# How the latest_<name>_report files are published from the timestamped reports.
+# Each one is linked or copied to a temporary file that is then renamed over the latest file.
+PUBLISH_MODES = ("hardlink", "symlink", "copy")
+
+# Faster than the default levels, and still most of the size reduction on reports.
+GZIP_LEVEL = 6
+XZ_PRESET = 3
+
+# Number of detail records serialized into each write.
+_BATCH_SIZE = 1000
+
+# json.dumps with separators builds a new encoder on every call, so one is shared.
+_encode = json.JSONEncoder(separators=(',', ':')).encode
+
+
+def report_suffix(report_format: str = "pretty", compression: Optional[str] = None) -> str:
+    """
+    Return the file suffix of JSON reports written in a format and compression.
+
+    Args:
+        report_format: One of REPORT_FORMATS
+        compression: One of REPORT_COMPRESSIONS, or None for no compression
+
+    Returns:
+        str: The suffix, e.g. ".json" or ".jsonl.gz"
+    """
+    if report_format not in REPORT_FORMATS:
+        raise ValueError(f"Unsupported report format: {report_format}")
+    if compression is not None and compression not in REPORT_COMPRESSIONS:
+        raise ValueError(f"Unsupported report compression: {compression}")
+    return _FORMAT_SUFFIXES[report_format] + (_COMPRESSION_SUFFIXES[compression] if compression else "")
+
+
+def write_report(report: dict[str, Any], path: Path, report_format: str = "pretty") -> None:
+    """
+    Write a JSON report, compressed if the path ends in .gz or .xz.
+
+    The report is written to a temporary file that is renamed to path once it is
+    complete, so readers never see a partly written report. The compact and JSON Lines formats are written record by record, each record
+    serialized on its own, so the whole report is never held in memory as a string.
+
+    Args:
+        report: The report, as returned by Results.to_dict
+        path: Path to write to
+        report_format: One of REPORT_FORMATS
+    """
+    with atomic_path(Path(path)) as temp_path, _open(temp_path, 'w', compression_of=Path(path)) as f:
+        match report_format:
+            case "pretty":
+                json.dump(report, f, indent=2)
+            case "compact":
+                _write_compact(report, f)
+            case "jsonl":
+                _write_lines(report, f)
+            case _:
+                raise ValueError(f"Unsupported report format: {report_format}")
+
+
+def read_report(path: Path) -> dict[str, Any]:
+    """
+    Read a JSON report written in any format and compression.
+
+    Args:
+        path: Path to the report
+
+    Returns:
+        dict: The report, as returned by Results.to_dict
+    """
+    path = Path(path)
+    with _open(path, 'r') as f:
+        if not _strip_compression(path.name).endswith(".jsonl"):
+            return json.load(f)
+
+        report: dict[str, Any] = {}
+        details: dict[str, Any] = {}
+        for index, line in enumerate(f):
+            record = json.loads(line)
+            if index == 0:
+                report.update(record)
+            elif "record" in record:
+                details.setdefault(record["section"], []).append(record["record"])
+            else:
+                details[record["section"]] = record["value"]
+        report["details"] = details
+        return report
+
+
+def publish_report(source: Path, latest: Path, mode: str = "hardlink") -> None:
+    """
+    Atomically replace a latest report with a finished report, without writing it again.
+
+    A hard link or a symbolic link to source, or a copy of it, is created next to latest
+    and renamed over it, so readers of latest see either the old or the new report.
+    Hard and symbolic links fall back to a copy where the file system does not support them.
+
+    Args:
+        source: The finished report, e.g. a timestamped report
+        latest: The latest report to replace
+        mode: One of PUBLISH_MODES
+    """
+    if mode not in PUBLISH_MODES:
+        raise ValueError(f"Unsupported publish mode: {mode}")
+
+    # shutil imports every compression module, so it is only imported when publishing.
+    import shutil
+    with atomic_path(latest) as temp_path:
+        try:
+            match mode:
+                case "hardlink":
+                    os.link(source, temp_path)
+                case "symlink":
+                    # Relative, so the reports directory can be moved.
+                    os.symlink(os.path.relpath(source, latest.parent), temp_path)
+                case _:
+                    shutil.copyfile(source, temp_path)
+        except (OSError, NotImplementedError):
+            temp_path.unlink(missing_ok=True)
+            shutil.copyfile(source, temp_path)
+
+
+@contextmanager
+def atomic_path(path: Path) -> Iterator[Path]:
+    """
+    Yield a temporary path to write a file to, and rename it to path once the block finishes.
+
+    If the block raises, the temporary file is removed and path is left as it was.
+
+    Args:
+        path: The file to write
+
+    Yields:
+        Path: The temporary file, in the same directory as path
+    """
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    temp_path.unlink(missing_ok=True)
+    try:
+        yield temp_path
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
+def latest_report_path(reports_dir: Path, name: str) -> Optional[Path]:
+    """
+    Return the path of a collector's latest JSON report, whatever its format.
+
+    Args:
+        reports_dir: Directory the reports are written to
+        name: Name of the collector
+
+    Returns:
+        Optional[Path]: The most recently written latest_<name>_report file, or None if there is none
+    """
+    paths = []
+    for suffix in JSON_REPORT_SUFFIXES:
+        path = Path(reports_dir) / f"latest_{name}_report{suffix}"
+        try:
+            paths.append((path.stat().st_mtime_ns, path))
+        except OSError:
+            continue
+    return max(paths)[1] if paths else None
+
+
+def timestamped_report_paths(reports_dir: Path, name: str) -> list[Path]:
+    """
+    Return the paths of a collector's timestamped JSON reports, whatever their format, oldest first.
+
+    Args:
+        reports_dir: Directory the reports are written to
+        name: Name of the collector
+
+    Returns:
+        list[Path]: The <name>_report_<timestamp> JSON files
+    """
+    prefix = f"{name}_report_"
+    paths = [
+        path for path in Path(reports_dir).glob(f"{prefix}*")
+        if path.name.endswith(JSON_REPORT_SUFFIXES)
+    ]
+    # The timestamps in the names sort in the order the reports were written.
+    return sorted(paths, key=lambda path: path.name[len(prefix):].split(".", 1)[0])
+
+
+def _write_compact(report: dict[str, Any], f: IO[str]) -> None:
+    """
+    Write a report as JSON without whitespace, a batch of detail records at a time.
+    """
+    f.write("{")
+    for index, (key, value) in enumerate(report.items()):
+        f.write(f"{',' if index else ''}{_encode(key)}:")
+        if not isinstance(value, dict):
+            f.write(_encode(value))
+            continue
+        f.write("{")
+        for section_index, (section, records) in enumerate(value.items()):
+            f.write(f"{',' if section_index else ''}{_encode(section)}:")
+            if isinstance(records, list):
+                f.write("[")
+                for start in range(0, len(records), _BATCH_SIZE):
+                    # One encoder call per batch, without the batch's brackets.
+                    f.write(f"{',' if start else ''}{_encode(records[start:start + _BATCH_SIZE])[1:-1]}")
+                f.write("]")
+            else:
+                f.write(_encode(records))
+        f.write("}")
+    f.write("}")
+
+
+def _write_lines(report: dict[str, Any], f: IO[str]) -> None:
+    """
+    Write a report as JSON Lines.
+
+    The first line is the report without its details. Each record of a detail list is
+    then a line of its own, and every other detail a line with its whole value.
+    """
+    f.write(_encode({key: value for key, value in report.items() if key != "details"}) + "\n")
+    for section, value in report.get("details", {}).items():
+        if isinstance(value, list) and value:
+            for start in range(0, len(value), _BATCH_SIZE):
+                f.write("".join(
+                    _encode({"section": section, "record": record}) + "\n" for record in value[start:start + _BATCH_SIZE]
+                ))
+        else:
+            f.write(_encode({"section": section, "value": value}) + "\n")
+
+
+def _open(path: Path, mode: str, compression_of: Optional[Path] = None) -> IO[str]:
+    """
+    Open a report as text, compressed or decompressed according to its suffix,
+    or to the suffix of compression_of if given.
+    """
+    # The compression modules are imported here, since most runs write uncompressed reports.
+    match (compression_of or path).suffix:
+        case ".gz":
+            import gzip
+            return cast(IO[str], gzip.open(path, f"{mode}t", encoding='utf-8', compresslevel=GZIP_LEVEL))
+        case ".xz":
+            import lzma
+            return cast(IO[str], lzma.open(path, f"{mode}t", encoding='utf-8', preset=XZ_PRESET if mode == 'w' else None))
+        case _:
+            return open(path, mode, encoding='utf-8')
+
+
+def _strip_compression(name: str) -> str:
+    """
+    Remove a compression suffix from a file name.
+    """
+    for suffix in _COMPRESSION_SUFFIXES.values():
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
@@ -0,0 +1,271 @@
+from dataclasses import fields
+import glob
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Any, Optional
+
+
+from logger import get_logs_dir
+from utils.common.enumerate_project_files import ProjectFile, ProjectTree, enumerate_project_files
+from utils.common.report_files import latest_report_path, read_report
+
+
+# Name of the file in the reports directory that holds the cache keys and file hashes.
+CACHE_FILE = "result_cache.json"
+
+# Bump this when the shape of the cache or of the reports changes, so old entries are discarded.
+CACHE_VERSION = 1
+
+# Settings that change how a collector runs but not what it finds.
+_IGNORED_SETTINGS = frozenset({
+    "gitignore_spec", "jobs", "stream", "result_cache", "unittest_timeout", "mypy_timeout", "flake8_timeout", "history",
+    "regression_window", "regression_threshold", "report_format", "report_compression",
+    "publish_latest", "profile", "trace", "unittest_fork_server",
+})
+
+# Collectors whose failed runs are never reused, since a rerun of the same tree may pass.
+_RERUN_ON_FAILURE = frozenset({"unittest"})
+
+# Configuration files each tool reads, besides the Python files it checks.
+_CONFIG_FILES = {
+    "mypy": ("mypy.ini", ".mypy.ini", "pyproject.toml", "setup.cfg"),
+    "flake8": (".flake8", "setup.cfg", "tox.ini"),
+}
+
+
+class ResultCache:
+    """
+    Cache of whole collector results, keyed by everything the results depend on.
+
+    The key of a collector combines the content hashes of its input files, the version
+    of its tool and the run's settings. The results themselves are not copied: the
+    cache records the key and the SHA-256 of the latest_<name>_report JSON file
+    written for it, and a hit restores the results from that report.
+    """
+
+    def __init__(self, reports_dir: Path):
+        """
+        Load the cache from the reports directory.
+
+        Args:
+            reports_dir: Directory the reports and the cache file are kept in
+        """
+        self.reports_dir = Path(reports_dir)
+        self.cache_path = self.reports_dir / CACHE_FILE
+        cache = self._load()
+        self.collectors: dict[str, dict[str, str]] = cache.get("collectors", {})
+        self.hashes: dict[str, list] = cache.get("hashes", {})
+        self._used_hashes: dict[str, list] = {}
+
+    def key(self, name: str, configs: Any) -> Optional[str]:
+        """
+        Compute the cache key of a collector's results for the current project state.
+
+        Args:
+            name: Name of the collector
+            configs: Configuration dataclass of the run
+
+        Returns:
+            Optional[str]: The key, or None if the collector's results cannot be cached,
+                e.g. because its tool is not installed
+        """
+        project_dir = Path(configs.test_dir).parent.resolve()
+        tree = enumerate_project_files(project_dir, configs.gitignore_spec if configs.respect_gitignore else None)
+
+        inputs = _collector_inputs(name, configs, tree)
+        if inputs is None:
+            return None
+        files, tool_version = inputs
+
+        # Files written by the run itself, such as these reports and the log, must not change the key.
+        for written_dir in (self.reports_dir, Path(get_logs_dir())):
+            written_prefix = _relative_prefix(written_dir, tree.root)
+            if written_prefix:
+                files = [project_file for project_file in files if not project_file.relative_path.startswith(written_prefix)]
+
+        settings = {
+            field.name: getattr(configs, field.name) for field in fields(configs)
+            if field.name not in _IGNORED_SETTINGS
+        }
+        if getattr(configs, "changed_since", None):
+            # The ref may point to another commit than when the results were cached.
+            settings["changed_since_commit"] = _git_output(project_dir, "rev-parse", configs.changed_since)
+
+        key_data = {
+            "version": CACHE_VERSION,
+            "name": name,
+            "tool_version": tool_version,
+            "settings": settings,
+            "files": [[project_file.relative_path, self._file_hash(project_file)] for project_file in files],
+        }
+        return hashlib.sha256(json.dumps(key_data, sort_keys=True, default=str).encode()).hexdigest()
+
+    def lookup(self, name: str, key: Optional[str]) -> Optional[dict[str, Any]]:
+        """
+        Return the saved report of a collector if it was written for the same key.
+
+        Args:
+            name: Name of the collector
+            key: Cache key from key()
+
+        Returns:
+            Optional[dict]: The contents of the latest_<name>_report JSON file, or None on a miss
+        """
+        entry = self.collectors.get(name)
+        if key is None or entry is None or entry["key"] != key:
+            return None
+
+        path = latest_report_path(self.reports_dir, name)
+        if path is None:
+            return None
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        # The report may have been overwritten by a run that did not use the cache.
+        if not data or hashlib.sha256(data).hexdigest() != entry["report_sha256"]:
+            return None
+        return read_report(path)
+
+    def store(self, name: str, key: Optional[str], status: str) -> None:
+        """
+        Record that the latest report of a collector was written for a key.
+
+        Args:
+            name: Name of the collector
+            key: Cache key from key(), computed before the collector ran
+            status: Status of the collector's results. Results of runs that timed out are not cached.
+        """
+        if key is None or status == "timed_out" or (name in _RERUN_ON_FAILURE and status != "pass"):
+            self.collectors.pop(name, None)
+            return
+
+        path = latest_report_path(self.reports_dir, name)
+        if path is None:
+            self.collectors.pop(name, None)
+            return
+        data = path.read_bytes()
+        self.collectors[name] = {"key": key, "report_sha256": hashlib.sha256(data).hexdigest()}
+
+    def save(self) -> None:
+        """
+        Save the cache, replacing the cache file atomically.
+
+        Only the hashes of files used by this run are kept.
+        """
+        temp_path = self.cache_path.with_name(f"{self.cache_path.name}.{os.getpid()}.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": CACHE_VERSION, "collectors": self.collectors, "hashes": self._used_hashes}, f)
+        os.replace(temp_path, self.cache_path)
+
+    def _file_hash(self, project_file: ProjectFile) -> str:
+        """
+        Return the SHA-256 of a file, reusing the cached hash while its mtime and size are unchanged.
+        """
+        entry = self.hashes.get(project_file.relative_path)
+        if entry is None or entry[0] != project_file.mtime_ns or entry[1] != project_file.size:
+            try:
+                digest = hashlib.sha256(project_file.path.read_bytes()).hexdigest()
+            except OSError:
+                # Unreadable now, so never equal to a hash from another run.
+                digest = f"unreadable:{project_file.mtime_ns}"
+            entry = [project_file.mtime_ns, project_file.size, digest]
+            self.hashes[project_file.relative_path] = entry
+        self._used_hashes[project_file.relative_path] = entry
+        return entry[2]
+
+    def _load(self) -> dict[str, Any]:
+        """
+        Load the cache file, or nothing if it is missing or outdated.
+        """
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        return cache if cache.get("version") == CACHE_VERSION else {}
+
+
+def _collector_inputs(name: str, configs: Any, tree: ProjectTree) -> Optional[tuple[list[ProjectFile], str]]:
+    """
+    Return the project files a collector's results depend on and the version of its tool.
+    """
+    gitignore = [project_file for project_file in tree.files if project_file.relative_path == ".gitignore"]
+
+    match name:
+        case "unittest":
+            # Tests may read any file in the project, so every file is an input.
+            return list(tree.files), _test_venv_version()
+        case "mypy" | "flake8":
+            version = _tool_version(name)
+            if version is None:
+                return None
+            config_files = [
+                project_file for project_file in tree.files if project_file.relative_path in _CONFIG_FILES[name]
+            ]
+            return tree.files_with_suffix(".py", ".pyi") + config_files + gitignore, version
+        case "corner_cutting":
+            from utils.reports.corner_cutting.run_command import LAZY_WORDS_FILE
+            try:
+                version = hashlib.sha256(LAZY_WORDS_FILE.read_bytes()).hexdigest()
+            except OSError:
+                return None
+            return tree.files_with_suffix(".py") + gitignore, version
+        case _:
+            return None
+
+
+def _tool_version(tool: str) -> Optional[str]:
+    """
+    Return the output of "<tool> --version", or None if the tool cannot be run.
+    """
+    if shutil.which(tool) is None:
+        return None
+    try:
+        result = subprocess.run([tool, "--version"], capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def _test_venv_version() -> str:
+    """
+    Describe the test virtual environment by its path and when its packages last changed.
+
+    Installing or removing a package changes the mtime of the site-packages directory.
+    """
+    # The same default as reports/services/_unittest.sh
+    venv_path = os.environ.get("TEST_VENV_PATH", os.path.join(os.getcwd(), "venv"))
+    stamps = []
+    for path in [os.path.join(venv_path, "pyvenv.cfg"), *sorted(glob.glob(os.path.join(venv_path, "lib", "python*", "site-packages")))]:
+        try:
+            stamps.append(f"{path}:{os.stat(path).st_mtime_ns}")
+        except OSError:
+            stamps.append(f"{path}:missing")
+    return ";".join(stamps)
+
+
+def _relative_prefix(path: Path, root: Path) -> Optional[str]:
+    """
+    Return path relative to root with a trailing separator, or None if it is outside root.
+    """
+    try:
+        relative = Path(path).resolve().relative_to(root)
+    except ValueError:
+        return None
+    return f"{relative}{os.sep}" if relative.parts else None
+
+
+def _git_output(project_dir: Path, *args: str) -> str:
+    """
+    Return the output of a git command, or an empty string if it fails.
+    """
+    try:
+        result = subprocess.run(["git", *args], capture_output=True, text=True, cwd=project_dir)
+    except OSError:
+        return ""
+    return result.stdout.strip() if result.returncode == 0 else ""
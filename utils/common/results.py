@@ -13,6 +13,16 @@ class Results:
     issues: list[dict[str, Any]] = field(default_factory=list)
     timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
 
+    # partial run attributes
+    partial: bool = False
+    changed_since: str = ""
+    checked_files: list[str] = field(default_factory=list)
+    skipped_unaffected: list[str] = field(default_factory=list)
+
+    # timeout attributes
+    timed_out: bool = False
+    unfinished_tests: list[str] = field(default_factory=list)
+
     # testing attributes
     tests: int = 0
     failures: int = 0
@@ -22,10 +32,13 @@ class Results:
     success_rate: float = 0.0
     duration: float = 0.0
     test_cases: list[dict[str, Any]] = field(default_factory=list)
+    test_durations: dict[str, float] = field(default_factory=dict)
 
     # corner cutting attributes
     corner_cutting: list[dict[str, Any]] = field(default_factory=list)
     total_files_scanned: int = 0
+    files_from_cache: int = 0
+    files_rescanned: int = 0
     total_potential_instances: int = 0
 
     def to_dict(self) -> dict[str, Any]:
@@ -35,6 +48,8 @@ class Results:
                     "summary": {
                         f"{self.name}_errors": self.errors,
                         f"{self.name}_status": self.status,
+                        "partial": self.partial,
+                        "timed_out": self.timed_out,
                         "timestamp": self.timestamp,
                     },
                     f"{self.name}_issues": self.issues
@@ -50,14 +65,21 @@ class Results:
                         "unexpected_successes": self.unexpected_successes,
                         "success_rate": self.success_rate,
                         "duration": self.duration,
+                        "partial": self.partial,
+                        "timed_out": self.timed_out,
                         "timestamp": self.timestamp,
                     },
-                    "test_cases": [] # {"id": "", "name": "", "module": "", "class": "", "status": "", "message": "", "traceback": ""}
+                    "test_cases": [], # {"id": "", "name": "", "module": "", "class": "", "status": "", "message": "", "traceback": ""}
+                    "test_durations": self.test_durations,
+                    "skipped_unaffected": self.skipped_unaffected,
+                    "unfinished_tests": self.unfinished_tests,
                 }
             case "corner_cutting":
                 return {
                     "summary": {
                         "total_files_scanned": self.total_files_scanned,
+                        "files_from_cache": self.files_from_cache,
+                        "files_rescanned": self.files_rescanned,
                         "total_potential_instances": self.total_potential_instances,
                         "timestamp": self.timestamp,
                     },
@@ -0,0 +1,100 @@
+from dataclasses import dataclass
+import os
+import signal
+import subprocess
+from pathlib import Path
+from typing import Optional
+
+
+# Seconds a timed-out command gets to exit after SIGTERM before its process group is killed.
+GRACE_PERIOD = 5.0
+
+
+@dataclass
+class CommandResult:
+    """
+    The outcome of a command run by run_with_timeout.
+
+    Attributes:
+        returncode: The command's exit code, negative if it was killed by a signal
+        stdout: Everything the command wrote to stdout
+        stderr: Everything the command wrote to stderr
+        timed_out: Whether the command was stopped because it ran out of time
+    """
+    returncode: int
+    stdout: str
+    stderr: str
+    timed_out: bool = False
+
+    @property
+    def output(self) -> str:
+        """Return stdout followed by stderr."""
+        return self.stdout + self.stderr
+
+
+def run_with_timeout(cmd: list[str], cwd: Optional[Path] = None, timeout: Optional[float] = None) -> CommandResult:
+    """
+    Run a command, stopping its whole process group if it runs for longer than timeout.
+
+    The command gets its own process group, so a timeout also stops the processes it
+    started, such as the Python process behind a shell script. Whatever the command
+    wrote before it was stopped is kept, up to the last complete line of each stream.
+
+    Args:
+        cmd: The command to run
+        cwd: Optional working directory for the command
+        timeout: Optional number of seconds the command may run for
+
+    Returns:
+        CommandResult: The exit code and output of the command, and whether it timed out
+    """
+    process = subprocess.Popen(
+        cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        text=True, start_new_session=True,
+    )
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        terminate_process_group(process)
+        stdout, stderr = process.communicate()
+        # The last line of each stream may have been cut off by the signal.
+        return CommandResult(process.returncode, _complete_lines(stdout), _complete_lines(stderr), timed_out=True)
+    except BaseException:
+        # e.g. KeyboardInterrupt. Do not leave the command running.
+        terminate_process_group(process, grace_period=0)
+        raise
+    return CommandResult(process.returncode, stdout, stderr)
+
+
+def terminate_process_group(process: subprocess.Popen, grace_period: float = GRACE_PERIOD) -> None:
+    """
+    Stop a process started with start_new_session=True and every process in its group.
+
+    The group is sent SIGTERM, and SIGKILL once the process has exited or grace_period
+    seconds have passed, so children that outlive the process are stopped too.
+
+    Args:
+        process: The process leading the group
+        grace_period: Seconds to wait for the process to exit after SIGTERM
+    """
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        try:
+            os.killpg(process.pid, sig)
+        except (ProcessLookupError, PermissionError):
+            # The whole group has already exited.
+            break
+        if sig == signal.SIGTERM:
+            try:
+                process.wait(timeout=grace_period)
+            except subprocess.TimeoutExpired:
+                pass
+    process.wait()
+
+
+def _complete_lines(text: Optional[str]) -> str:
+    """
+    Drop a trailing line that has no line ending.
+    """
+    if not text:
+        return ""
+    return text[:text.rfind('\n') + 1]
@@ -0,0 +1,100 @@
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Protocol
+
+
+from logger import logger
+from utils.common.run_with_timeout import terminate_process_group
+
+
+class LineParser(Protocol):
+    """An incremental output parser that is fed one line at a time."""
+
+    def feed(self, line: str) -> None: ...
+
+    def progress(self) -> dict[str, int]: ...
+
+
+def stream_command(cmd: list[str],
+                   parser: LineParser,
+                   cwd: Optional[Path] = None,
+                   timeout: Optional[float] = None,
+                   label: Optional[str] = None,
+                   progress_interval: float = 1.0
+                   ) -> int:
+    """
+    Run a command and feed its output to a parser line by line while it runs.
+
+    stderr is merged into stdout, so the parser sees the lines in the order the
+    tool wrote them. Nothing but the current line is held in memory here, and the
+    parser's progress counts are logged every progress_interval seconds.
+
+    The command runs in its own process group, and a timeout stops the whole group.
+    The parser keeps every line it was fed before that.
+
+    Args:
+        cmd: The command to run
+        parser: Incremental parser to feed each line of output to, without the line ending
+        cwd: Optional working directory for the command
+        timeout: Optional number of seconds after which the command is killed
+        label: Name to prefix progress log messages with. Defaults to the command name.
+        progress_interval: Minimum number of seconds between progress log messages
+
+    Returns:
+        int: The command's exit code
+
+    Raises:
+        subprocess.TimeoutExpired: If the command ran for longer than timeout
+    """
+    label = label or Path(cmd[0]).name
+    process = subprocess.Popen(
+        cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        text=True, bufsize=1, start_new_session=True,
+    )
+    stdout = process.stdout
+    assert stdout is not None  # stdout=PIPE
+
+    timed_out = threading.Event()
+
+    def _kill() -> None:
+        timed_out.set()
+        terminate_process_group(process)
+
+    timer = threading.Timer(timeout, _kill) if timeout is not None else None
+    if timer is not None:
+        timer.daemon = True
+        timer.start()
+
+    try:
+        last_report = time.monotonic()
+        for line in stdout:
+            parser.feed(line.rstrip('\r\n'))
+
+            now = time.monotonic()
+            if now - last_report >= progress_interval:
+                logger.info(f"{label}: {_format_progress(parser.progress())}")
+                last_report = now
+
+        returncode = process.wait()
+    finally:
+        if timer is not None:
+            timer.cancel()
+        if process.poll() is None:
+            terminate_process_group(process, grace_period=0)
+        stdout.close()
+
+    # Only the timer sets timed_out, and it only runs with a timeout.
+    if timeout is not None and timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, timeout)
+
+    logger.debug(f"{label} finished: {_format_progress(parser.progress())}")
+    return returncode
+
+
+def _format_progress(progress: dict[str, int]) -> str:
+    """
+    Format progress counts as "name=count" pairs.
+    """
+    return ", ".join(f"{name}={count}" for name, count in progress.items())
@@ -0,0 +1,35 @@
+from dataclasses import dataclass
+from typing import Any, Optional
+
+
+@dataclass
+class TimedOutOutput:
+    """
+    The output a tool wrote before it was stopped for running out of time.
+
+    Attributes:
+        output: The tool's output up to that point, in whatever form its parse_output accepts
+        timeout: The number of seconds the tool was allowed to run for
+    """
+    output: Any
+    timeout: Optional[float]
+
+
+def unwrap_timed_out_output(output: Any, results: Any) -> Any:
+    """
+    Record on results whether the tool timed out and return its output.
+
+    Args:
+        output: The output from run_command, which may be a TimedOutOutput
+        results: Results object to update
+
+    Returns:
+        Any: The tool's output
+    """
+    if isinstance(output, TimedOutOutput):
+        results.timed_out = True
+        results.timeout = output.timeout
+        return output.output
+
+    results.timed_out = False
+    return output
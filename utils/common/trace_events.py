@@ -0,0 +1,122 @@
+from contextlib import contextmanager
+import json
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any, Iterator, Optional
+
+from utils.common.report_files import atomic_path
+
+
+# Name of the trace in the reports directory, without its timestamp.
+TRACE_FILE_PREFIX = "trace"
+
+
+class Tracer:
+    """
+    Recorder of the spans of a run, exported in the Chrome trace event format.
+
+    Every span is a complete ("X") event with its start, duration, process and thread,
+    and arguments such as the collector's name and the bytes or issues it handled.
+    Each thread is its own track in a trace viewer, so collectors that run concurrently
+    show up side by side and serial ones one after another.
+    The trace opens in chrome://tracing, Perfetto or any other viewer of the format.
+
+    Only spans of this process are recorded. Time spent in the processes it starts, such
+    as the tools, the test shards and the corner-cutting workers, is one opaque span of
+    the phase that waited on them, usually run_command.
+    """
+
+    def __init__(self) -> None:
+        self.pid = os.getpid()
+        self.events: list[dict[str, Any]] = []
+        self._threads: dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, collector: Optional[str] = None, **args: Any) -> Iterator[dict[str, Any]]:
+        """
+        Record a span around the block.
+
+        Args:
+            name: Name of the span, e.g. the phase
+            collector: Name of the collector the span belongs to, or None for the runner
+            **args: Arguments to record with the span
+
+        Yields:
+            dict: The span's arguments, which the block can add counts to
+        """
+        if collector is not None:
+            args["collector"] = collector
+        start = time.perf_counter_ns()
+        try:
+            yield args
+        except BaseException as e:
+            args["error"] = type(e).__name__
+            raise
+        finally:
+            duration = time.perf_counter_ns() - start
+            thread = threading.current_thread()
+            tid = thread.native_id or 0
+            event = {
+                "name": name,
+                "cat": collector or "runner",
+                "ph": "X",
+                "ts": start / 1000,
+                "dur": duration / 1000,
+                "pid": self.pid,
+                "tid": tid,
+                "args": args,
+            }
+            with self._lock:
+                self.events.append(event)
+                self._threads.setdefault(tid, thread.name)
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Return the trace as a Chrome trace event JSON object.
+
+        Returns:
+            dict: The trace, with the process and thread names first and then the spans in start order
+        """
+        metadata = [{"name": "process_name", "ph": "M", "pid": self.pid, "tid": 0, "args": {"name": "main.py"}}]
+        metadata += [
+            {"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}}
+            for tid, name in self._threads.items()
+        ]
+        return {
+            "traceEvents": metadata + sorted(self.events, key=lambda event: event["ts"]),
+            "displayTimeUnit": "ms",
+        }
+
+    def write(self, path: Path) -> None:
+        """
+        Write the trace to a JSON file.
+
+        Args:
+            path: Path to write to
+        """
+        with atomic_path(Path(path)) as temp_path:
+            with open(temp_path, 'w') as f:
+                json.dump(self.to_dict(), f)
+
+
+def output_size(output: Any) -> Optional[int]:
+    """
+    Return the size in bytes of a tool's output, or None if it is not text.
+
+    Args:
+        output: The output from run_command, which may be wrapped in a PartialOutput or TimedOutOutput
+
+    Returns:
+        Optional[int]: The number of bytes of the output as UTF-8
+    """
+    # PartialOutput and TimedOutOutput both keep the tool's output in .output
+    while hasattr(output, "output"):
+        output = output.output
+    if isinstance(output, str):
+        return len(output.encode('utf-8', errors='replace'))
+    if isinstance(output, bytes):
+        return len(output)
+    return None
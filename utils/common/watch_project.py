@@ -0,0 +1,130 @@
+import os
+from pathlib import Path
+import time
+from typing import Any, Callable, Iterable
+
+from utils.common.enumerate_project_files import clear_enumeration_cache, enumerate_project_files
+
+
+# Seconds the project must stay unchanged before a burst of changes is acted on,
+# e.g. an editor saving several files or a git checkout.
+WATCH_DEBOUNCE = 0.3
+
+# Collectors that check the Python files outside the tests directory.
+_SOURCE_COLLECTORS = ("unittest", "mypy", "flake8", "corner_cutting")
+
+# Configuration files at the project root, and the collectors that read them.
+_CONFIG_FILE_COLLECTORS = {
+    "mypy.ini": ("mypy",),
+    ".mypy.ini": ("mypy",),
+    "pyproject.toml": ("mypy", "flake8"),
+    "setup.cfg": ("mypy", "flake8"),
+    ".flake8": ("flake8",),
+    "tox.ini": ("flake8",),
+}
+
+
+class ProjectWatcher:
+    """
+    Poller of a project's files, which reports the paths added, removed or modified
+    since the last poll.
+
+    Each poll is a walk of the project that compares every file's mtime and size with
+    the previous walk. The same directories as in a run are pruned (virtual environments,
+    dot directories, gitignored paths, ...), and so are the directories the runs write to,
+    such as the reports directory.
+    """
+
+    def __init__(self, project_dir: Path, gitignore_spec: Any = None, ignored_dirs: Iterable[Path] = ()) -> None:
+        """
+        Take the first snapshot of the project.
+
+        Args:
+            project_dir: The project directory to watch
+            gitignore_spec: Optional PathSpec with gitignore patterns
+            ignored_dirs: Directories whose files are never reported, e.g. the reports directory
+        """
+        self.project_dir = Path(project_dir).resolve()
+        self.gitignore_spec = gitignore_spec
+        self._ignored_prefixes = tuple(
+            os.path.relpath(Path(directory).resolve(), self.project_dir) + os.sep for directory in ignored_dirs
+        )
+        self.snapshot = self._take_snapshot()
+
+    def poll(self) -> set[str]:
+        """
+        Walk the project again and return what changed since the last poll.
+
+        Returns:
+            set[str]: Relative paths of the files added, removed or modified
+        """
+        snapshot = self._take_snapshot()
+        changed = {path for path in snapshot.keys() | self.snapshot.keys() if snapshot.get(path) != self.snapshot.get(path)}
+        self.snapshot = snapshot
+        return changed
+
+    def wait_for_changes(self, interval: float = 0.5, debounce: float = WATCH_DEBOUNCE,
+                         sleep: Callable[[float], None] = time.sleep) -> set[str]:
+        """
+        Poll until something changes, then until nothing has changed for debounce seconds.
+
+        Args:
+            interval: Seconds between polls
+            debounce: Seconds without changes that end a burst of changes
+            sleep: Function to wait with, replaceable in tests
+
+        Returns:
+            set[str]: Relative paths of every file changed during the burst
+        """
+        changed: set[str] = set()
+        while not changed:
+            sleep(interval)
+            changed = self.poll()
+
+        quiet_since = time.monotonic()
+        while time.monotonic() - quiet_since < debounce:
+            sleep(min(interval, debounce))
+            more = self.poll()
+            if more:
+                changed |= more
+                quiet_since = time.monotonic()
+        return changed
+
+    def _take_snapshot(self) -> dict[str, tuple[int, int]]:
+        """
+        Return the mtime and size of every watched file, by relative path.
+        """
+        # The walk is cached for the collectors of a run, so a poll must not reuse it.
+        clear_enumeration_cache()
+        tree = enumerate_project_files(self.project_dir, self.gitignore_spec)
+        return {
+            project_file.relative_path: (project_file.mtime_ns, project_file.size)
+            for project_file in tree.files
+            if not project_file.relative_path.startswith(self._ignored_prefixes)
+        }
+
+
+def collectors_for_changes(paths: Iterable[str], test_dir: str, names: Iterable[str]) -> list[str]:
+    """
+    Return the collectors whose results can change because of the changed files.
+
+    A Python file in the tests directory only affects unittest, any other Python file
+    affects every collector, and a tool's configuration file affects that tool.
+    Other files, such as documentation, affect none.
+
+    Args:
+        paths: Relative paths of the changed files
+        test_dir: Path of the tests directory, relative to the project directory
+        names: The collectors selected for the run, in the order they run
+
+    Returns:
+        list[str]: The selected collectors to rerun, in the order they run
+    """
+    test_prefix = test_dir.rstrip("/" + os.sep) + os.sep
+    relevant: set[str] = set()
+    for path in paths:
+        if path.endswith(".py"):
+            relevant.update(("unittest",) if path.startswith(test_prefix) else _SOURCE_COLLECTORS)
+        else:
+            relevant.update(_CONFIG_FILE_COLLECTORS.get(path, ()))
+    return [name for name in names if name in relevant]
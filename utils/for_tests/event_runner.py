@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Run unittest tests and write one JSON event per test outcome to a file.
+
+Used by the unittest collector in place of "python -m unittest discover". The usual
+text output is still printed to stderr. This script runs inside the tested project's
+virtual environment, so it only uses the standard library.
+
+Usage:
+    python event_runner.py EVENTS_FILE START_DIR [TEST_ID ...]
+
+Each line of EVENTS_FILE is a JSON object. Test events have "event": "test" and carry
+the "id", "module", "class" and "name" of the test, its "status" (one of "pass", "FAIL",
+"ERROR", "skipped", "expected_failure" and "unexpected_success"), its "duration" in
+seconds, a "message" and a "traceback". For a subtest, "id" is the subtest's and
+"test_id" the id of the test it belongs to; otherwise both are the same. A final event with "event": "run" carries the
+number of "tests" run, whether the run was "successful" and its total "duration".
+The first event, with "event": "plan", lists the ids of all "tests" about to run, so
+the tests that never finished can be told if the run is stopped.
+"""
+import json
+import os
+import sys
+import time
+import unittest
+
+
+class EventResult(unittest.TextTestResult):
+    """
+    A TextTestResult that also writes an event for each outcome to a file.
+
+    Outcomes are written when their test stops, so each carries the test's duration.
+    Outcomes reported outside a test, e.g. an error in setUpClass, are written at once.
+    """
+
+    events_file = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._current = None
+        self._started = 0.0
+        self._pending = []
+
+    def startTest(self, test):
+        super().startTest(test)
+        self._current = test
+        self._started = time.perf_counter()
+        self._pending = []
+
+    def stopTest(self, test):
+        duration = time.perf_counter() - self._started
+        for event in self._pending:
+            event["duration"] = round(duration, 6)
+            self._write(event)
+        self._current = None
+        self._pending = []
+        super().stopTest(test)
+
+    def addSuccess(self, test):
+        super().addSuccess(test)
+        self._record(test, "pass")
+
+    def addFailure(self, test, err):
+        super().addFailure(test, err)
+        self._record(test, "FAIL", self.failures[-1][1])
+
+    def addError(self, test, err):
+        super().addError(test, err)
+        self._record(test, "ERROR", self.errors[-1][1])
+
+    def addSkip(self, test, reason):
+        super().addSkip(test, reason)
+        self._record(test, "skipped", message=reason)
+
+    def addExpectedFailure(self, test, err):
+        super().addExpectedFailure(test, err)
+        self._record(test, "expected_failure", self.expectedFailures[-1][1])
+
+    def addUnexpectedSuccess(self, test):
+        super().addUnexpectedSuccess(test)
+        self._record(test, "unexpected_success")
+
+    def addSubTest(self, test, subtest, err):
+        super().addSubTest(test, subtest, err)
+        if err is not None:
+            if issubclass(err[0], test.failureException):
+                self._record(subtest, "FAIL", self.failures[-1][1])
+            else:
+                self._record(subtest, "ERROR", self.errors[-1][1])
+
+    def _record(self, test, status, traceback="", message=None):
+        """
+        Queue an event for the current test, or write it at once if no test is running.
+        """
+        case = getattr(test, "test_case", test)
+        is_test_case = isinstance(case, unittest.TestCase)
+        event = {
+            "event": "test",
+            "id": test.id(),
+            "test_id": case.id(),
+            "module": type(case).__module__ if is_test_case else "",
+            "class": type(case).__qualname__ if is_test_case else "",
+            "name": getattr(case, "_testMethodName", test.id()),
+            "status": status,
+            "duration": 0.0,
+            "message": message if message is not None else _last_line(traceback),
+            "traceback": traceback,
+        }
+        if self._current is None:
+            self._write(event)
+        else:
+            self._pending.append(event)
+
+    def _write(self, event):
+        self.events_file.write(json.dumps(event) + "\n")
+        self.events_file.flush()
+
+
+def _iter_tests(suite):
+    """
+    Yield the tests in a suite and its nested suites, in the order they run.
+    """
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            yield from _iter_tests(test)
+        else:
+            yield test
+
+
+def _last_line(traceback):
+    """
+    Return the last non-empty line of a traceback, which holds the exception message.
+    """
+    lines = [line for line in traceback.strip().splitlines() if line.strip()]
+    return lines[-1] if lines else ""
+
+
+def main(argv):
+    """
+    Run the tests and write their events. Returns the exit code.
+    """
+    if len(argv) < 2:
+        print(__doc__, file=sys.stderr)
+        return 2
+
+    events_path, start_dir, test_ids = argv[0], argv[1], argv[2:]
+
+    # Python put this script's directory first on sys.path. Use the project directory
+    # instead, as "python -m unittest" does with the working directory.
+    sys.path[0] = os.path.abspath(start_dir)
+
+    loader = unittest.defaultTestLoader
+    if test_ids:
+        suite = loader.loadTestsFromNames(test_ids)
+    else:
+        suite = loader.discover(start_dir, pattern="test_*.py")
+
+    with open(events_path, "w", encoding="utf-8") as events_file:
+        EventResult.events_file = events_file
+        events_file.write(json.dumps({"event": "plan", "tests": [test.id() for test in _iter_tests(suite)]}) + "\n")
+        events_file.flush()
+        started = time.perf_counter()
+        # Show warnings the way "python -m unittest" does unless -W was given.
+        runner = unittest.TextTestRunner(resultclass=EventResult, warnings=None if sys.warnoptions else "default")
+        result = runner.run(suite)
+        events_file.write(json.dumps({
+            "event": "run",
+            "tests": result.testsRun,
+            "successful": result.wasSuccessful(),
+            "duration": round(time.perf_counter() - started, 6),
+        }) + "\n")
+
+    return 0 if result.wasSuccessful() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -2,17 +2,44 @@
 # -*- coding: utf-8 -*-
 """
 Script to run all tests for Test Generator and generate reports.
+
+With --serve, it instead runs a fork server for the unittest collector: a long-lived
+process in the test virtual environment that imports the project's dependencies once
+and forks a child for each test run. See ForkServer.
+
+Usage:
+    python run_tests.py [-q]
+    python run_tests.py --serve SOCKET_PATH PROJECT_ROOT [--preload MODULE ...] [--idle-timeout SECONDS]
 """
+import argparse
+import ast
 import datetime
+import gc
+import importlib
+import importlib.util
 import json
 import os
 from pathlib import Path
+import selectors
+import socket
+import stat
+import struct
 import sys
+import tempfile
+import threading
 import time
-from typing import Dict, Tuple, Any, List, cast
+from traceback import print_exc
+from typing import Dict, Tuple, Any, List, Optional, Sequence, cast
 import unittest
 
 
+# Seconds a fork server waits without any run before it exits.
+FORK_SERVER_IDLE_TIMEOUT = 30 * 60
+
+# Directories that are not searched for the project's imports.
+_SKIPPED_DIR_NAMES = frozenset({"venv", "node_modules", "__pycache__"})
+
+
 class TestResultCollector:
     """Collects and formats test results for reporting."""
 
@@ -305,7 +332,434 @@ class RunTests:
         return result.wasSuccessful(), collector.results
 
 
+class ForkServer:
+    """
+    Fork server that runs each test run in a child forked from a warm parent.
+
+    The parent runs in the test virtual environment. It imports the modules the project
+    imports from outside itself (its third-party dependencies and the standard library)
+    once, and freezes them with gc.freeze() so the children share their memory
+    copy-on-write instead of each one importing them again. The project's own modules are
+    never imported by the parent, so every child sees the current version of the code.
+
+    Clients connect to a Unix socket and send one JSON line per run:
+    {"project_root": ..., "events": true or false, "test_ids": [...]}.
+    The server forks a child that runs the tests with the event runner if events is set,
+    or as "python -m unittest" would otherwise. It replies {"pid": ...} once the child
+    started and {"returncode": ..., "output": ..., "events": ...} once it exited.
+    {"command": "stop"} stops the server.
+
+    The socket must be in a directory only the server's user can access, and on Linux
+    connections from other users are also refused by their SO_PEERCRED uid. The files
+    the child writes its output and events to are created by the server in that
+    directory, so no client can make the server write anywhere else.
+
+    The server is single-threaded, and it only forks while no other thread is running,
+    so forking never copies a lock held by another thread. It exits when a preloaded
+    module changed on disk, so a later run starts a fresh server instead of running the
+    tests against stale dependencies, and after idle_timeout seconds without runs.
+    """
+
+    def __init__(self, socket_path: str, project_root: str, preload: Sequence[str] = (),
+                 idle_timeout: float = FORK_SERVER_IDLE_TIMEOUT):
+        """
+        Initialize the server.
+
+        Args:
+            socket_path: Path of the Unix socket to listen on
+            project_root: Directory of the project whose tests are run
+            preload: Modules to import besides the ones found in the project
+            idle_timeout: Seconds without runs after which the server exits
+        """
+        self.socket_path = socket_path
+        self.project_root = os.path.abspath(project_root)
+        self.preload = list(preload)
+        self.idle_timeout = idle_timeout
+        self.preloaded: List[str] = []
+        # Connection, output file and events file of each running child
+        self.running: Dict[int, Tuple[socket.socket, str, Optional[str]]] = {}
+        self._module_mtimes: Dict[str, float] = {}
+        self._listener: Optional[socket.socket] = None
+        self._event_runner: Any = None
+
+    def preload_dependencies(self) -> List[str]:
+        """
+        Import the project's dependencies and freeze them for the children.
+
+        Returns:
+            List[str]: The modules imported
+        """
+        # Garbage collection in the parent would touch every object the children share.
+        gc.disable()
+        self._event_runner = _load_event_runner()
+        for name in self.preload + discover_dependencies(self.project_root):
+            if name in self.preloaded:
+                continue
+            try:
+                importlib.import_module(name)
+            except BaseException as e:
+                # The tests will fail to import it too, in the child, with a proper error.
+                print(f"Not preloading {name}: {type(e).__name__}: {e}", file=sys.stderr)
+                continue
+            self.preloaded.append(name)
+
+        for module in list(sys.modules.values()):
+            path = getattr(module, "__file__", None)
+            if path:
+                try:
+                    self._module_mtimes[path] = os.stat(path).st_mtime
+                except OSError:
+                    pass
+        gc.collect()
+        gc.freeze()
+        return self.preloaded
+
+    def serve_forever(self) -> None:
+        """
+        Accept runs until stopped, idle for too long or a preloaded module changed.
+        """
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listener.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        self._listener.listen()
+        selector = selectors.DefaultSelector()
+        selector.register(self._listener, selectors.EVENT_READ)
+        print(f"Fork server for {self.project_root} listening on {self.socket_path} "
+              f"with {len(self.preloaded)} preloaded modules", flush=True)
+
+        last_activity = time.monotonic()
+        try:
+            while True:
+                if selector.select(timeout=0.05):
+                    conn, _ = self._listener.accept()
+                    last_activity = time.monotonic()
+                    if not self._handle(conn):
+                        break
+                if self._reap():
+                    last_activity = time.monotonic()
+                if not self.running and time.monotonic() - last_activity > self.idle_timeout:
+                    break
+        finally:
+            selector.close()
+            self._listener.close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            for conn, output_path, events_path in self.running.values():
+                conn.close()
+                _remove_files(output_path, events_path)
+
+    def _handle(self, conn: socket.socket) -> bool:
+        """
+        Read a request and start its run. Returns False if the server must stop.
+        """
+        if _peer_uid(conn) not in (None, os.getuid()):
+            conn.close()
+            return True
+        try:
+            conn.settimeout(5)
+            request = json.loads(conn.makefile('r', encoding='utf-8').readline())
+            conn.settimeout(None)
+        except (OSError, ValueError):
+            conn.close()
+            return True
+
+        if request.get("command") == "stop":
+            _reply(conn, {"stopped": True})
+            conn.close()
+            return False
+        if os.path.abspath(request.get("project_root", "")) != self.project_root:
+            _reply(conn, {"error": f"This fork server runs the tests of {self.project_root}"})
+            conn.close()
+            return True
+        if self._stale():
+            _reply(conn, {"error": "stale", "restart": True})
+            conn.close()
+            return False
+        if running_threads() > 1:
+            # e.g. started by a preloaded module. A forked child would inherit its locks but not the thread.
+            _reply(conn, {"error": "The fork server has other threads running and cannot fork safely"})
+            conn.close()
+            return False
+
+        run_dir = os.path.dirname(os.path.abspath(self.socket_path))
+        output_fd, output_path = tempfile.mkstemp(prefix="output_", suffix=".txt", dir=run_dir)
+        events_path = None
+        if request.get("events"):
+            events_fd, events_path = tempfile.mkstemp(prefix="events_", suffix=".jsonl", dir=run_dir)
+            os.close(events_fd)
+
+        # Whatever the parent buffered would otherwise be written again by the child.
+        sys.stdout.flush()
+        sys.stderr.flush()
+        gc.collect()
+        gc.freeze()
+        pid = os.fork()
+        if pid == 0:
+            returncode = 1
+            try:
+                returncode = self._run_child(request, conn, output_fd, events_path)
+            except SystemExit as e:
+                returncode = e.code if isinstance(e.code, int) else 1
+            except BaseException:
+                print_exc()
+            finally:
+                try:
+                    sys.stdout.flush()
+                    sys.stderr.flush()
+                finally:
+                    os._exit(returncode)
+
+        os.close(output_fd)
+        self.running[pid] = (conn, output_path, events_path)
+        _reply(conn, {"pid": pid})
+        return True
+
+    def _run_child(self, request: Dict[str, Any], conn: socket.socket, output_fd: int, events_path: Optional[str]) -> int:
+        """
+        Run the requested tests in the forked child. Returns the exit code.
+        """
+        # Its own session, so the client can stop the run and anything it started with one killpg.
+        os.setsid()
+        if self._listener is not None:
+            self._listener.close()
+        for other, _, _ in self.running.values():
+            other.close()
+        conn.close()
+
+        os.dup2(output_fd, 1)
+        os.dup2(output_fd, 2)
+        os.close(output_fd)
+        os.chdir(self.project_root)
+        gc.enable()
+
+        test_ids = list(request.get("test_ids") or [])
+        if events_path is not None:
+            return self._event_runner.main([events_path, self.project_root, *test_ids])
+
+        # As "python -m unittest discover -s PROJECT_ROOT -p test_*.py", or "python -m unittest TEST_ID ...".
+        loader = ProjectPathDiscoverer(self.project_root)
+        if test_ids:
+            sys.path.insert(0, self.project_root)
+            suite = loader.loadTestsFromNames(test_ids)
+        else:
+            suite = loader.discover(self.project_root, pattern="test_*.py")
+        result = unittest.TextTestRunner(warnings=None if sys.warnoptions else "default").run(suite)
+        return 0 if result.wasSuccessful() else 1
+
+    def _reap(self) -> bool:
+        """
+        Reply to the clients of the children that exited. Returns whether any did.
+        """
+        reaped = False
+        while self.running:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            reaped = True
+            if pid not in self.running:
+                continue
+            conn, output_path, events_path = self.running.pop(pid)
+            try:
+                reply = {
+                    "returncode": os.waitstatus_to_exitcode(status),
+                    "output": _read_text(output_path),
+                    "events": _read_text(events_path) if events_path is not None else None,
+                }
+            finally:
+                _remove_files(output_path, events_path)
+            try:
+                _reply(conn, reply)
+            finally:
+                conn.close()
+        return reaped
+
+    def _stale(self) -> bool:
+        """
+        Return whether any module imported by the parent changed on disk since it was imported.
+        """
+        for path, mtime in self._module_mtimes.items():
+            try:
+                if os.stat(path).st_mtime != mtime:
+                    return True
+            except OSError:
+                return True
+        return False
+
+
+def discover_dependencies(project_root: str) -> List[str]:
+    """
+    Return the top-level modules the project's Python files import from outside the project.
+
+    Args:
+        project_root: Directory of the project
+
+    Returns:
+        List[str]: Module names, in the order they are first imported
+    """
+    project_root = os.path.abspath(project_root)
+    names: Dict[str, None] = {}
+    for directory, dir_names, file_names in os.walk(project_root):
+        dir_names[:] = sorted(
+            name for name in dir_names if not name.startswith('.') and name not in _SKIPPED_DIR_NAMES
+        )
+        for file_name in sorted(file_names):
+            if not file_name.endswith(".py"):
+                continue
+            try:
+                with open(os.path.join(directory, file_name), 'rb') as f:
+                    tree = ast.parse(f.read())
+            except (OSError, SyntaxError, ValueError):
+                continue
+            for node in ast.walk(tree):
+                if isinstance(node, ast.Import):
+                    for alias in node.names:
+                        names.setdefault(alias.name.split('.')[0], None)
+                elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                    names.setdefault(node.module.split('.')[0], None)
+
+    dependencies = []
+    for name in names:
+        if name == "__main__" or _is_project_module(name, project_root):
+            continue
+        try:
+            spec = importlib.util.find_spec(name)
+        except (ImportError, ValueError):
+            continue
+        if spec is None:
+            continue
+        # e.g. the project itself, installed in the virtual environment in editable mode
+        locations = [spec.origin or "", *(spec.submodule_search_locations or [])]
+        if any(os.path.isabs(location) and location.startswith(project_root + os.sep) for location in locations):
+            continue
+        dependencies.append(name)
+    return dependencies
+
+
+def _is_project_module(name: str, project_root: str) -> bool:
+    """
+    Return whether a top-level module is part of the project rather than a dependency.
+    """
+    module_file = getattr(sys.modules.get(name), "__file__", None)
+    if module_file:
+        return os.path.abspath(module_file).startswith(project_root + os.sep)
+    return os.path.exists(os.path.join(project_root, f"{name}.py")) or os.path.isdir(os.path.join(project_root, name))
+
+
+def running_threads() -> int:
+    """
+    Return the number of threads of this process, including any not started by the threading module.
+    """
+    try:
+        return len(os.listdir("/proc/self/task"))
+    except OSError:
+        return threading.active_count()
+
+
+def is_private_directory(path: str) -> bool:
+    """
+    Return whether a directory exists and only the current user can access it.
+    """
+    try:
+        info = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISDIR(info.st_mode) and info.st_uid == os.getuid() and not info.st_mode & 0o077
+
+
+def _peer_uid(conn: socket.socket) -> Optional[int]:
+    """
+    Return the uid of the process at the other end of a Unix socket, or None where SO_PEERCRED is not available.
+    """
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    # struct ucred: pid, uid and gid
+    credentials = conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    _, uid, _ = struct.unpack("3i", credentials)
+    return uid
+
+
+def _read_text(path: str) -> str:
+    """
+    Read a file a child wrote, or return an empty string if it cannot be read.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+def _remove_files(*paths: Optional[str]) -> None:
+    """
+    Remove the files of a run, ignoring the ones that are already gone.
+    """
+    for path in paths:
+        if path is not None:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+def _load_event_runner() -> Any:
+    """
+    Import event_runner.py from this script's directory, however this module was imported.
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "event_runner.py")
+    spec = importlib.util.spec_from_file_location("event_runner", path)
+    module = importlib.util.module_from_spec(spec)  # type: ignore[arg-type]
+    spec.loader.exec_module(module)  # type: ignore[union-attr]
+    return module
+
+
+def _reply(conn: socket.socket, message: Dict[str, Any]) -> None:
+    """
+    Send a JSON line to a client, ignoring clients that went away.
+    """
+    try:
+        conn.sendall((json.dumps(message) + "\n").encode('utf-8'))
+    except OSError:
+        pass
+
+
+def serve(argv: List[str]) -> int:
+    """
+    Run a fork server from the command line. Returns the exit code.
+    """
+    parser = argparse.ArgumentParser(prog="run_tests.py --serve", description="Fork server for the unittest collector.")
+    parser.add_argument("socket_path")
+    parser.add_argument("project_root")
+    parser.add_argument("--preload", nargs="*", default=[], help="Modules to import besides the project's own imports")
+    parser.add_argument("--idle-timeout", type=float, default=FORK_SERVER_IDLE_TIMEOUT,
+                        help="Seconds without runs after which the server exits")
+    args = parser.parse_args(argv)
+
+    socket_dir = os.path.dirname(os.path.abspath(args.socket_path))
+    if not is_private_directory(socket_dir):
+        print(f"Not serving: {socket_dir} must be a directory that only the current user can access", file=sys.stderr)
+        return 1
+
+    server = ForkServer(args.socket_path, args.project_root, args.preload, args.idle_timeout)
+    started = time.perf_counter()
+    preloaded = server.preload_dependencies()
+    print(f"Preloaded {len(preloaded)} modules in {time.perf_counter() - started:.2f} seconds: {', '.join(preloaded)}", flush=True)
+    if running_threads() > 1:
+        print(f"Not serving: {running_threads() - 1} other threads are running after the preload, "
+              f"and forking could deadlock the children", file=sys.stderr)
+        return 1
+    server.serve_forever()
+    return 0
+
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--serve":
+        sys.exit(serve(sys.argv[2:]))
+
     # Set verbosity from command line arguments
     verbosity = 2
     if len(sys.argv) > 1 and sys.argv[1] == "-q":
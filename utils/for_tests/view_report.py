@@ -10,6 +10,13 @@ import sys
 from typing import Any, Dict, List, Optional, Union
 
 
+# Add the repository root to the path when run as a script
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+
+from utils.common.report_files import JSON_REPORT_SUFFIXES, read_report
+
+
 def print_color(text: str, color: Optional[str] = None) -> None:
     """
     Print colored text to the console.
@@ -55,14 +62,16 @@ def view_report(report_path: Union[str, Path], format_type: str = "summary") ->
         return False
 
     # Check file extension
-    if report_path.suffix == ".json":
-        # Parse JSON report
+    if report_path.name.endswith(JSON_REPORT_SUFFIXES):
+        # Parse JSON report, in any of the formats and compressions it can be written in
         try:
-            with open(report_path, 'r', encoding='utf-8') as f:
-                report: Dict[str, Any] = json.load(f)
+            report: Dict[str, Any] = read_report(report_path)
         except json.JSONDecodeError as e:
             print_color(f"Error: Invalid JSON in report file: {e}", "red")
             return False
+        except (OSError, EOFError, ValueError) as e:
+            print_color(f"Error: Could not read report file: {e}", "red")
+            return False
 
         # Display report
         _display_json_report(report, format_type)
@@ -85,7 +94,8 @@ def _display_json_report(report: Dict[str, Any], format_type: str) -> None:
         format_type: Format type (summary, details, full)
     """
     summary: Dict[str, Any] = report["summary"]
-    test_cases: List[Dict[str, Any]] = report["test_cases"]
+    # Collector reports keep their test cases under "details".
+    test_cases: List[Dict[str, Any]] = report.get("test_cases", report.get("details", {}).get("test_cases", []))
 
     # Print summary header
     print_color("\n=== Test Generator - Test Report ===\n", "bold")
@@ -96,9 +106,9 @@ def _display_json_report(report: Dict[str, Any], format_type: str) -> None:
     print(f"Passed:               {summary['tests'] - summary['failures'] - summary['errors']}")
     print(f"Failures:             {summary['failures']}")
     print(f"Errors:               {summary['errors']}")
-    print(f"Skipped:              {summary['skipped']}")
-    print(f"Expected Failures:    {summary['expected_failures']}")
-    print(f"Unexpected Successes: {summary['unexpected_successes']}")
+    print(f"Skipped:              {summary.get('skipped', 0)}")
+    print(f"Expected Failures:    {summary.get('expected_failures', 0)}")
+    print(f"Unexpected Successes: {summary.get('unexpected_successes', 0)}")
 
     success_rate: float = summary['success_rate']
     color: str = "green" if success_rate == 100 else "yellow" if success_rate >= 80 else "red"
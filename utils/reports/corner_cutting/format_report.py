@@ -24,7 +24,7 @@ def format_report(results: Any) -> List[str]:
         "# Code Corner-Cutting Analysis Report\n",
         f"Generated on: {timestamp}\n",
         "## Summary\n",
-        f"- **Files Scanned**: {results.total_files_scanned}",
+        f"- **Files Scanned**: {results.total_files_scanned} ({results.files_from_cache} from cache, {results.files_rescanned} rescanned)",
         f"- **Potential Corner-Cutting Instances**: {results.total_potential_instances}",
         "",
     ]
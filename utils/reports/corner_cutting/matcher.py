@@ -0,0 +1,188 @@
+"""
+Compiled matcher that finds every corner-cutting pattern in a file in one pass.
+"""
+import re
+from typing import Any, Dict, List, NamedTuple
+
+
+# Constructs whose result can change when a line is searched as part of the whole file
+# instead of on its own: lookarounds, string anchors and backreferences.
+_CONTEXT_SENSITIVE = re.compile(r'\(\?<?[=!]|\\[AZz]|\\[1-9]|\(\?P=')
+
+# Leading anchors that the regex compiler can factor out of an alternation,
+# as long as every branch of that alternation starts with the same one.
+_LEADING_ANCHOR = re.compile(r'^(?:\\[bB]|\^)')
+
+# Category of the patterns built from a plain list of lazy words and phrases.
+LAZY_WORDS_CATEGORY = "Lazy Words and Phrases"
+
+
+class PatternInfo(NamedTuple):
+    """A pattern from the pattern file, in the order the report lists it."""
+    category: str
+    pattern: str
+    description: str
+
+
+def load_patterns(lazy_words_data: Dict[str, Any]) -> Dict[str, List[Dict[str, str]]]:
+    """
+    Return the patterns of a pattern file, by category.
+
+    A file may list regex patterns by category under "patterns", and plain words and
+    phrases under "lazy_words_and_phrases". Each phrase is matched as a whole word,
+    case-insensitively like every other pattern.
+
+    Args:
+        lazy_words_data: The parsed pattern file
+
+    Returns:
+        Dict[str, List[Dict[str, str]]]: Mapping of category to its list of {"pattern", "description"} dictionaries
+    """
+    patterns: Dict[str, List[Dict[str, str]]] = {
+        category: list(category_patterns)
+        for category, category_patterns in lazy_words_data.get('patterns', {}).items()
+    }
+    phrases = lazy_words_data.get('lazy_words_and_phrases', [])
+    if phrases:
+        patterns.setdefault(LAZY_WORDS_CATEGORY, []).extend(
+            {"pattern": rf"\b{re.escape(phrase)}\b", "description": f"Uses '{phrase}'"}
+            for phrase in phrases
+        )
+    return patterns
+
+
+class PatternMatcher:
+    """
+    Matches a set of corner-cutting patterns against file contents.
+
+    Every pattern is compiled once. Patterns that behave the same on a line and on
+    the whole file are also joined into one case-insensitive alternation, which is
+    run over the whole file to find the few lines that can match anything. Only
+    those lines are then checked against the individual patterns, so most files
+    are scanned by a single regex search in C.
+
+    The hits are exactly those of running re.search(pattern, line, re.IGNORECASE)
+    for every pattern and line, and are returned in the same order.
+    """
+
+    def __init__(self, patterns: Dict[str, List[Dict[str, str]]]):
+        """
+        Compile the patterns.
+
+        Args:
+            patterns: Mapping of category to its list of {"pattern", "description"} dictionaries
+        """
+        self.patterns: List[PatternInfo] = [
+            PatternInfo(category, pattern_info['pattern'], pattern_info['description'])
+            for category, category_patterns in patterns.items()
+            for pattern_info in category_patterns
+        ]
+        self._compiled = [re.compile(info.pattern, re.IGNORECASE) for info in self.patterns]
+
+        self._filtered: List[int] = []
+        self._unfiltered: List[int] = []
+        for index, info in enumerate(self.patterns):
+            if _CONTEXT_SENSITIVE.search(info.pattern):
+                self._unfiltered.append(index)
+            else:
+                self._filtered.append(index)
+
+        self._prefilter = None
+        if self._filtered:
+            try:
+                self._prefilter = re.compile(
+                    self._build_alternation([self.patterns[index].pattern for index in self._filtered]),
+                    re.IGNORECASE | re.MULTILINE
+                )
+            except re.error:
+                # e.g. inline global flags, which are only allowed at the start of a pattern.
+                self._unfiltered = list(range(len(self.patterns)))
+                self._filtered = []
+
+    @staticmethod
+    def _build_alternation(patterns: List[str]) -> str:
+        """
+        Join patterns into one alternation, nesting those with the same leading anchor.
+
+        The regex compiler only pulls a shared prefix such as \\b out of an alternation
+        when every branch has it, so e.g. one unanchored pattern among many \\b-prefixed
+        ones would otherwise make the whole alternation several times slower.
+        """
+        groups: Dict[str, List[str]] = {}
+        for pattern in patterns:
+            anchor = _LEADING_ANCHOR.match(pattern)
+            groups.setdefault(anchor.group() if anchor else '', []).append(f'(?:{pattern})')
+        return '|'.join(f"(?:{'|'.join(branches)})" for branches in groups.values())
+
+    def scan(self, content: str) -> List[tuple[int, int, str]]:
+        """
+        Find every pattern in the content of a file.
+
+        Args:
+            content: The file's text, with "\\n" line endings
+
+        Returns:
+            List[tuple[int, int, str]]: (pattern index, line number, stripped line) for
+                each matching pattern and line, ordered by pattern and then by line
+        """
+        lines = content.split('\n')
+        hits = []
+
+        if self._prefilter is not None:
+            for line_index in self._candidate_lines(content):
+                line = lines[line_index]
+                for index in self._filtered:
+                    if self._compiled[index].search(line):
+                        hits.append((index, line_index + 1, line.strip()))
+
+        if self._unfiltered:
+            for line_index, line in enumerate(lines):
+                for index in self._unfiltered:
+                    if self._compiled[index].search(line):
+                        hits.append((index, line_index + 1, line.strip()))
+
+        hits.sort()
+        return hits
+
+    def _candidate_lines(self, content: str) -> List[int]:
+        """
+        Return the indexes of the lines the prefilter matches, in order.
+
+        A prefilter match may run over a line break, so every line it touches is a
+        candidate. This keeps lines whose own match starts inside it from being missed.
+        """
+        candidates: List[int] = []
+        if self._prefilter is None:
+            return candidates
+        line_index = 0
+        position = 0
+        for match in self._prefilter.finditer(content):
+            line_index += content.count('\n', position, match.start())
+            end_line = line_index + content.count('\n', match.start(), match.end())
+            first = max(line_index, candidates[-1] + 1) if candidates else line_index
+            candidates.extend(range(first, end_line + 1))
+            line_index = end_line
+            position = match.end()
+        return candidates
+
+    def to_issue(self, hit: tuple[int, int, str], relative_path: str) -> Dict[str, Any]:
+        """
+        Build the report entry for a hit returned by scan().
+
+        Args:
+            hit: (pattern index, line number, stripped line)
+            relative_path: The file's path relative to the project root
+
+        Returns:
+            Dict: The issue, with its file, line, category, pattern, message and snippet
+        """
+        index, line_number, snippet = hit
+        info = self.patterns[index]
+        return {
+            "file": relative_path,
+            "line": line_number,
+            "category": info.category,
+            "pattern": info.pattern,
+            "message": info.description,
+            "snippet": snippet
+        }
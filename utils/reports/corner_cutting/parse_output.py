@@ -17,6 +17,8 @@ def parse_output(output: Dict[str, Any], results: Any) -> bool:
     """
     # Update results with scan statistics
     results.total_files_scanned = output.get("total_files_scanned", 0)
+    results.files_from_cache = output.get("files_from_cache", 0)
+    results.files_rescanned = output.get("files_rescanned", results.total_files_scanned)
     results.total_potential_instances = len(output.get("issues", []))
     
     # Add all issues found to results
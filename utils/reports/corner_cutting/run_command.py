@@ -1,93 +1,208 @@
 """
 Utility function to scan for corner-cutting indicators in code.
 """
+from concurrent.futures import ProcessPoolExecutor
 import json
-import os
-import re
+import multiprocessing
 from pathlib import Path
-from typing import Any, Dict, List, Set
+from typing import Any, Dict, List, Optional
 
 
-def run_command(configs: Dict[str, Any]) -> Dict[str, Any]:
+from configs import Configs
+from utils.common.enumerate_project_files import ProjectFile, enumerate_project_files
+from utils.reports.corner_cutting.matcher import PatternMatcher, load_patterns
+from utils.reports.corner_cutting.scan_cache import get_cached_issues, hash_bytes, load_scan_cache, save_scan_cache
+
+
+# Lazy words and phrases to search for
+LAZY_WORDS_FILE = Path(__file__).parent.parent.parent.parent / "reports" / "services" / "lazy_words_and_phrases.json"
+
+
+def run_command(configs: Configs) -> Dict[str, Any]:
     """
     Scan codebase for corner-cutting indicators.
     
+    Unless configs.corner_cutting_cache is False, the issues found in each file are
+    cached in the reports directory and reused while the file's mtime and size
+    (or, with configs.corner_cutting_hash_contents, its content) are unchanged.
+    The whole cache is discarded when the pattern file changes.
+    
     Args:
-        configs: Configuration dictionary
+        configs: Configuration dataclass
         
     Returns:
         Dict: A dictionary with scan results containing:
             - total_files_scanned: The number of files scanned
+            - files_from_cache: The number of files whose issues came from the cache
+            - files_rescanned: The number of files that were read and scanned
             - issues: List of detected issues
     """
     # Get lazy words and phrases from JSON file
-    lazy_words_file = Path(__file__).parent.parent.parent.parent / "reports" / "services" / "lazy_words_and_phrases.json"
+    lazy_words_file = LAZY_WORDS_FILE
     
     if not lazy_words_file.exists():
         raise FileNotFoundError(f"Lazy words file not found at {lazy_words_file}")
     
-    with open(lazy_words_file, 'r') as f:
-        lazy_words_data = json.load(f)
+    lazy_words_bytes = lazy_words_file.read_bytes()
+    lazy_words_data = json.loads(lazy_words_bytes)
     
-    # Extract patterns to search for
-    patterns = lazy_words_data.get('patterns', {})
+    # Extract patterns to search for and compile them once
+    patterns = load_patterns(lazy_words_data)
+    matcher = PatternMatcher(patterns)
     
     # Get project root directory
     project_dir = Path(configs.test_dir).parent.resolve()
     
+    # Load the per-file cache
+    use_cache = getattr(configs, "corner_cutting_cache", True)
+    hash_contents = getattr(configs, "corner_cutting_hash_contents", False)
+    cache_path = Path(configs.reports_dir) / "corner_cutting_cache.json"
+    patterns_hash = hash_bytes(lazy_words_bytes)
+    cache = load_scan_cache(cache_path, patterns_hash) if use_cache else {}
+    new_cache: Dict[str, Dict[str, Any]] = {}
+    
     # Prepare result
-    result = {
+    result: Dict[str, Any] = {
         "total_files_scanned": 0,
+        "files_from_cache": 0,
+        "files_rescanned": 0,
         "issues": []
     }
     
-    # Scan files
-    for root, _, files in os.walk(project_dir):
-        root_path = Path(root)
-        
-        # Skip directories like venv, __pycache__, etc.
-        if any(part.startswith('.') or part == 'venv' or part == '__pycache__' for part in root_path.parts):
-            continue
-        
-        for file in files:
-            # Only scan Python files
-            if not file.endswith('.py'):
-                continue
-                
-            file_path = root_path / file
+    # Find the files to scan, reusing cached issues where possible
+    gitignore_spec = configs.gitignore_spec if configs.respect_gitignore else None
+    tree = enumerate_project_files(project_dir, gitignore_spec)
+    
+    to_scan: List[tuple[ProjectFile, Optional[str]]] = []
+    for project_file in tree.files_with_suffix('.py'):
+        try:
+            entry = cache.get(project_file.relative_path)
+            issues = get_cached_issues(entry, project_file.mtime_ns, project_file.size)
+            content_hash = entry.get("sha256") if entry is not None and issues is not None else None
             
-            # Check if file should be ignored
-            if configs.respect_gitignore and configs.gitignore_spec:
-                from utils.common.should_ignore_file import should_ignore_file
-                if should_ignore_file(str(file_path), configs.gitignore_spec):
-                    continue
+            if issues is None and hash_contents:
+                content_hash = hash_bytes(project_file.path.read_bytes())
+                issues = get_cached_issues(entry, project_file.mtime_ns, project_file.size, content_hash)
             
-            # Scan the file
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    
-                result["total_files_scanned"] += 1
+            if issues is None:
+                to_scan.append((project_file, content_hash))
+                continue
                 
-                # Check for each pattern
-                for category, category_patterns in patterns.items():
-                    for pattern_info in category_patterns:
-                        pattern = pattern_info['pattern']
-                        description = pattern_info['description']
-                        
-                        # Search for pattern in the file content
-                        for i, line in enumerate(content.split('\n')):
-                            if re.search(pattern, line, re.IGNORECASE):
-                                result["issues"].append({
-                                    "file": str(file_path.relative_to(project_dir)),
-                                    "line": i + 1,
-                                    "category": category,
-                                    "pattern": pattern,
-                                    "message": description,
-                                    "snippet": line.strip()
-                                })
-            except Exception as e:
-                # Log error but continue scanning
-                print(f"Error scanning {file_path}: {e}")
-    
-    return result
\ No newline at end of file
+            result["files_from_cache"] += 1
+            result["total_files_scanned"] += 1
+            result["issues"].extend(issues)
+            new_cache[project_file.relative_path] = _cache_entry(project_file, content_hash, issues)
+        except Exception as e:
+            # Log error but continue scanning
+            print(f"Error scanning {project_file.path}: {e}")
+    
+    # Scan the files that were not cached
+    workers = getattr(configs, "corner_cutting_workers", 1)
+    paths = [str(project_file.path) for project_file, _ in to_scan]
+    if workers > 1 and len(paths) > 1:
+        scanned = _scan_files_in_parallel(paths, patterns, workers)
+    else:
+        scanned = [_scan_file(path, matcher) for path in paths]
+    
+    for (project_file, content_hash), (hits, error) in zip(to_scan, scanned):
+        if error is not None:
+            # Log error but continue scanning
+            print(f"Error scanning {project_file.path}: {error}")
+            continue
+            
+        issues = [matcher.to_issue(hit, project_file.relative_path) for hit in hits]
+        result["files_rescanned"] += 1
+        result["total_files_scanned"] += 1
+        result["issues"].extend(issues)
+        new_cache[project_file.relative_path] = _cache_entry(project_file, content_hash, issues)
+    
+    # Sort by file, then line, so reports do not depend on walk or worker order.
+    result["issues"].sort(key=lambda issue: (issue["file"], issue["line"]))
+    
+    if use_cache:
+        save_scan_cache(cache_path, patterns_hash, new_cache)
+    
+    return result
+
+
+def _cache_entry(project_file: ProjectFile, content_hash: Optional[str], issues: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build the scan cache entry for a file.
+    """
+    return {
+        "mtime_ns": project_file.mtime_ns,
+        "size": project_file.size,
+        "sha256": content_hash,
+        "issues": issues
+    }
+
+
+def _scan_file(path: str, matcher: PatternMatcher) -> tuple[List[tuple[int, int, str]], Optional[str]]:
+    """
+    Read a file and find every corner-cutting pattern in it.
+    
+    Args:
+        path: Path to the file
+        matcher: Compiled matcher for all the patterns
+        
+    Returns:
+        tuple: The hits as (pattern index, line number, snippet), ordered by line
+            and then by pattern, and an error message if the file could not be scanned
+    """
+    try:
+        # Decode with universal newlines, as open(path, 'r') would.
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+    except Exception as e:
+        return [], str(e)
+    return sorted(matcher.scan(content), key=lambda hit: (hit[1], hit[0])), None
+
+
+# Matcher of each worker process, compiled once by _init_worker.
+_worker_matcher: Optional[PatternMatcher] = None
+
+
+def _init_worker(patterns: Dict[str, List[Dict[str, str]]]) -> None:
+    """
+    Compile the patterns once in a worker process.
+    """
+    global _worker_matcher
+    _worker_matcher = PatternMatcher(patterns)
+
+
+def _scan_chunk(paths: List[str]) -> List[tuple[List[tuple[int, int, str]], Optional[str]]]:
+    """
+    Scan a chunk of files in a worker process.
+    """
+    if _worker_matcher is None:
+        raise RuntimeError("The worker process was started without its patterns")
+    return [_scan_file(path, _worker_matcher) for path in paths]
+
+
+def _scan_files_in_parallel(paths: List[str], patterns: Dict[str, List[Dict[str, str]]], workers: int) -> List[tuple[List[tuple[int, int, str]], Optional[str]]]:
+    """
+    Scan files in a pool of worker processes.
+    
+    Each worker gets chunks of file paths and sends back only the compact hit tuples,
+    which are turned into issues in this process.
+
+    The workers are started by a fork server, or spawned where there is none, instead of
+    forked from this process. With --jobs, other collectors run in threads of this process,
+    and a forked child can deadlock on a lock one of them held, such as a logging handler's.
+    
+    Args:
+        paths: Paths of the files to scan
+        patterns: Mapping of category to its list of pattern dictionaries
+        workers: Number of worker processes
+        
+    Returns:
+        List: The result of _scan_file for each path, in the same order as paths
+    """
+    workers = min(workers, len(paths))
+    chunk_size = max(1, len(paths) // (workers * 4))
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    
+    start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(start_method),
+                             initializer=_init_worker, initargs=(patterns,)) as executor:
+        return [scanned for chunk in executor.map(_scan_chunk, chunks) for scanned in chunk]
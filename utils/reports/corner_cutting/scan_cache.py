@@ -0,0 +1,86 @@
+"""
+Utility functions for the persistent per-file corner-cutting scan cache.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+
+# Bump this when the shape of cached issues or the way patterns are read changes,
+# so old caches are discarded.
+CACHE_VERSION = 2
+
+
+def hash_bytes(data: bytes) -> str:
+    """
+    Return the SHA-256 hex digest of some bytes.
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def load_scan_cache(cache_path: Path, patterns_hash: str) -> dict[str, dict[str, Any]]:
+    """
+    Load the cached scan entries for each file.
+
+    The whole cache is discarded if it was written for a different pattern file
+    or cache version.
+
+    Args:
+        cache_path: Path to the cache file
+        patterns_hash: Hash of the pattern file used for this scan
+
+    Returns:
+        dict: Mapping of relative file path to its cache entry, which holds
+            "mtime_ns", "size", an optional "sha256" and the "issues" found in it
+    """
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+    if cache.get("version") != CACHE_VERSION or cache.get("patterns_hash") != patterns_hash:
+        return {}
+    return cache.get("files", {})
+
+
+def save_scan_cache(cache_path: Path, patterns_hash: str, files: dict[str, dict[str, Any]]) -> None:
+    """
+    Save the scan entries for each file, replacing the cache file atomically.
+
+    Args:
+        cache_path: Path to the cache file
+        patterns_hash: Hash of the pattern file used for this scan
+        files: Mapping of relative file path to its cache entry
+    """
+    temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({"version": CACHE_VERSION, "patterns_hash": patterns_hash, "files": files}, f)
+    os.replace(temp_path, cache_path)
+
+
+def get_cached_issues(entry: Optional[dict[str, Any]], mtime_ns: int, size: int, content_hash: Optional[str] = None) -> Optional[list[dict[str, Any]]]:
+    """
+    Return the cached issues for a file if its cache entry is still valid.
+
+    An entry is valid if the file's mtime and size are unchanged, or, when a
+    content hash is given, if the file's content is unchanged.
+
+    Args:
+        entry: The file's cache entry, if any
+        mtime_ns: Current mtime of the file in nanoseconds
+        size: Current size of the file in bytes
+        content_hash: Optional SHA-256 of the file's current content
+
+    Returns:
+        Optional[list]: The cached issues, or None if the file must be rescanned
+    """
+    if entry is None:
+        return None
+    if entry["mtime_ns"] == mtime_ns and entry["size"] == size:
+        return entry["issues"]
+    if content_hash is not None and entry.get("sha256") == content_hash:
+        return entry["issues"]
+    return None
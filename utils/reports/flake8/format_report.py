@@ -26,6 +26,14 @@ def format_report(results: Any) -> List[str]:
         f"- **Code Style (flake8)**: {results.status.upper()} ({results.errors} issues)\n",
     ]
     
+    # Note that only some files were checked
+    if getattr(results, "partial", False):
+        content.append(f"- **Partial run**: only the {len(results.checked_files)} files changed since `{results.changed_since}` were checked\n")
+    
+    # Note that the tool was stopped before it finished
+    if getattr(results, "timed_out", False):
+        content.append(f"- **Timed out**: flake8 was stopped after {results.timeout} seconds, so the issues below may be incomplete\n")
+    
     # Add flake8 issues
     if results.issues:
         content.append("## Code Style Issues (flake8)\n")
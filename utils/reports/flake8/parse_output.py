@@ -1,81 +1,173 @@
 """
 Utility function to parse flake8 output and update results.
 """
-from typing import Any
+from typing import Any, Optional, TypedDict
 
 
-def parse_output(output: str, results: Any) -> bool:
+from utils.common.partial_output import PartialOutput, unwrap_partial_output
+from utils.common.timed_out_output import TimedOutOutput, unwrap_timed_out_output
+
+
+# Separates the fields of the structured --format template. The ASCII unit separator
+# cannot appear in a path or a message, unlike the ":" of flake8's default format.
+FIELD_SEPARATOR = "\x1f"
+STRUCTURED_FORMAT = FIELD_SEPARATOR.join(["%(path)s", "%(row)d", "%(col)d", "%(code)s", "%(text)s"])
+
+_STRUCTURED_FIELDS = 5
+
+
+class Flake8Issue(TypedDict):
+    """A flake8 violation, as stored in results.issues."""
+    file: str
+    line: str
+    column: str
+    error_code: str
+    message: str
+
+
+class Flake8OutputParser:
     """
-    Parse flake8 output and update results.
-    
-    Args:
-        output: String output from flake8
-        results: Results object to update
-        
-    Returns:
-        bool: True if no issues found, False otherwise
+    Incremental flake8 output parser.
+
+    Lines are fed one at a time, e.g. while flake8 is still running,
+    and finish() writes the parsed issues to a results object.
     """
-    # Reset error count
-    error_count = 0
-    results.issues = []
-    
-    # Parse each line of output
-    for line in output.strip().split('\n'):
-        if not line:
-            continue
-        
-        error_count += 1
-        
-        # Try to parse the error line
-        try:
-            # Format is typically: ./file.py:line:col: code message
-            parts = line.split(':', 3)
-            
-            if len(parts) >= 4:
-                file_path = parts[0]
-                line_num = parts[1]
-                col_num = parts[2]
-                code_message = parts[3].strip().split(' ', 1)
-                
-                results.issues.append({
+
+    def __init__(self):
+        self.issues: list[Flake8Issue | dict[str, str]] = []
+
+    def feed(self, line: str) -> None:
+        """
+        Parse one line of flake8 output, in the structured or the default format.
+        """
+        if FIELD_SEPARATOR in line:
+            fields = line.split(FIELD_SEPARATOR, _STRUCTURED_FIELDS - 1)
+            if len(fields) == _STRUCTURED_FIELDS and fields[1].isdecimal() and fields[2].isdecimal():
+                file_path, line_num, col_num, error_code, message = fields
+                self.issues.append({
                     "file": file_path,
                     "line": line_num,
                     "column": col_num,
-                    "error_code": code_message[0] if len(code_message) > 0 else "",
-                    "message": code_message[1] if len(code_message) > 1 else ""
-                })
-            else:
-                # If we can't parse it, just add the whole line
-                results.issues.append({
-                    "message": line
+                    "error_code": error_code,
+                    "message": message
                 })
-        except Exception:
-            # If any parsing error, just add the whole line
-            results.issues.append({
+                return
+
+        if not line.strip():
+            return
+
+        # Format is typically: ./file.py:line:col: code message
+        parts = line.split(':', 3)
+
+        if len(parts) >= 4:
+            code_message = parts[3].strip().split(' ', 1)
+            self.issues.append({
+                "file": parts[0],
+                "line": parts[1],
+                "column": parts[2],
+                "error_code": code_message[0] if len(code_message) > 0 else "",
+                "message": code_message[1] if len(code_message) > 1 else ""
+            })
+        else:
+            # If we can't parse it, just add the whole line
+            self.issues.append({
                 "message": line
             })
-    
-    # Update result fields
-    results.errors = error_count
-    results.status = "pass" if error_count == 0 else "fail"
-    
-    # Apply gitignore filtering if requested
-    if getattr(results, 'configs', None) and getattr(results.configs, 'respect_gitignore', False) and getattr(results.configs, 'gitignore_spec', None):
-        from utils.common.should_ignore_file import should_ignore_file
-        
-        # Filter out issues in ignored files
-        filtered_issues = []
-        filtered_count = 0
-        
-        for issue in results.issues:
-            file_path = issue.get("file", "")
-            if file_path and should_ignore_file(file_path, results.configs.gitignore_spec):
-                filtered_count += 1
-            else:
-                filtered_issues.append(issue)
-        
-        if filtered_count > 0:
-            results.issues = filtered_issues
-            results.errors -= filtered_count
-    
-    return results.errors == 0
\ No newline at end of file
+
+    def progress(self) -> dict[str, int]:
+        """
+        Return the number of issues found so far.
+        """
+        return {"issues": len(self.issues)}
+
+    def finish(self, results: Any) -> bool:
+        """
+        Update results with the issues found.
+
+        Args:
+            results: Results object to update
+
+        Returns:
+            bool: True if no issues found, False otherwise
+        """
+        results.issues = self.issues
+        results.errors = len(self.issues)
+        results.status = "pass" if results.errors == 0 else "fail"
+
+        # Apply gitignore filtering if requested
+        if getattr(results, 'configs', None) and getattr(results.configs, 'respect_gitignore', False) and getattr(results.configs, 'gitignore_spec', None):
+            from utils.common.should_ignore_file import should_ignore_file
+
+            # Filter out issues in ignored files, checking each file only once
+            filtered_issues = []
+            filtered_count = 0
+            ignored: dict[str, bool] = {}
+
+            for issue in results.issues:
+                file_path = issue.get("file", "")
+                if file_path and file_path not in ignored:
+                    ignored[file_path] = should_ignore_file(file_path, results.configs.gitignore_spec)
+                if file_path and ignored[file_path]:
+                    filtered_count += 1
+                else:
+                    filtered_issues.append(issue)
+
+            if filtered_count > 0:
+                results.issues = filtered_issues
+                results.errors -= filtered_count
+
+        return results.errors == 0
+
+
+def parse_output(output: str | Flake8OutputParser | PartialOutput | TimedOutOutput, results: Any) -> bool:
+    """
+    Parse flake8 output and update results.
+
+    Output in the structured format (see STRUCTURED_FORMAT) is split in one pass
+    over the whole output. Output in flake8's default format, or structured output
+    mixed with other lines, is parsed line by line.
+
+    Args:
+        output: String output from flake8, or a parser that was already fed the output while flake8 ran,
+            optionally wrapped in a PartialOutput if only changed files were linted
+            and in a TimedOutOutput if flake8 was stopped for running out of time
+        results: Results object to update
+
+    Returns:
+        bool: True if no issues found, False otherwise
+    """
+    tool_output: str | Flake8OutputParser = unwrap_timed_out_output(unwrap_partial_output(output, results), results)
+    if isinstance(tool_output, Flake8OutputParser):
+        return tool_output.finish(results)
+
+    parser = Flake8OutputParser()
+    issues = _parse_structured(tool_output) if FIELD_SEPARATOR in tool_output else None
+    if issues is not None:
+        parser.issues.extend(issues)
+    else:
+        for line in tool_output.splitlines():
+            parser.feed(line)
+    return parser.finish(results)
+
+
+def _parse_structured(output: str) -> Optional[list[Flake8Issue]]:
+    """
+    Parse output that consists only of structured lines.
+
+    Every line has exactly five fields, so after turning line breaks into separators
+    the fields of all issues can be split and sliced apart without a per-line loop.
+
+    Returns:
+        Optional[list]: The issues, or None if any line is not a structured line
+    """
+    body = output.strip('\n')
+    fields = body.replace('\n', FIELD_SEPARATOR).split(FIELD_SEPARATOR)
+    if len(fields) != _STRUCTURED_FIELDS * (body.count('\n') + 1):
+        return None
+
+    return [
+        {"file": file_path, "line": line_num, "column": col_num, "error_code": error_code, "message": message}
+        for file_path, line_num, col_num, error_code, message in zip(
+            fields[0::5], fields[1::5], fields[2::5], fields[3::5], fields[4::5]
+        )
+    ]
@@ -2,29 +2,87 @@
 Utility function to run flake8 linting.
 """
 import subprocess
-from typing import Any, Dict
+from pathlib import Path
 
 
-def run_command(configs: Dict[str, Any]) -> str:
+from configs import Configs
+from utils.common.enumerate_project_files import enumerate_project_files
+from utils.common.get_changed_files import get_changed_files
+from logger import logger
+from utils.common.partial_output import PartialOutput
+from utils.common.run_with_timeout import run_with_timeout
+from utils.common.stream_command import stream_command
+from utils.common.timed_out_output import TimedOutOutput
+from utils.reports.flake8.parse_output import STRUCTURED_FORMAT, Flake8OutputParser
+
+
+def run_command(configs: Configs) -> str | Flake8OutputParser | PartialOutput | TimedOutOutput:
     """
-    Run flake8 linting and return the output.
+    Run flake8 linting in the project directory and return the output.
+    
+    Directories pruned by the shared project walk (virtual environments, dot
+    directories, gitignored paths, ...) are passed to --extend-exclude so flake8
+    does not descend into them.
+    
+    If configs.flake8_structured is set, flake8 prints each violation in
+    STRUCTURED_FORMAT, which parse_output can split without ambiguity.
+    
+    If configs.stream is set, the output is fed to a Flake8OutputParser while
+    flake8 runs and the parser is returned instead of the output.
+    
+    If configs.changed_since is set, only the Python files changed since that git ref
+    are linted, and the output is wrapped in a PartialOutput.
+    
+    If flake8 runs for longer than configs.flake8_timeout, it is stopped and the
+    output written until then is wrapped in a TimedOutOutput.
     
     Args:
-        configs: Configuration dictionary with linting settings
+        configs: Configuration dataclass with linting settings
         
     Returns:
-        str: The output from flake8
+        str | Flake8OutputParser | PartialOutput | TimedOutOutput: The output from flake8, or the parser it was streamed to
         
     Raises:
         RuntimeError: If there's an error running flake8
     """
+    project_dir = Path(configs.test_dir).parent.resolve()
+    tree = enumerate_project_files(project_dir, configs.gitignore_spec if configs.respect_gitignore else None)
+    
     cmd = ["flake8"]
+    if getattr(configs, "flake8_structured", False):
+        cmd.append(f"--format={STRUCTURED_FORMAT}")
+    excludes = tree.flake8_excludes()
+    if excludes:
+        cmd.append(f"--extend-exclude={','.join(excludes)}")
+    
+    changed_since = getattr(configs, "changed_since", None)
+    if changed_since:
+        python_files = {Path(project_file.relative_path).as_posix() for project_file in tree.files_with_suffix(".py")}
+        files = [path for path in get_changed_files(project_dir, changed_since) if path in python_files]
+        if not files:
+            # Nothing to lint, and a bare flake8 would lint the whole project
+            return PartialOutput("", changed_since, files)
+        cmd.extend(files)
     
+    timeout = getattr(configs, "flake8_timeout", None)
+    output: str | Flake8OutputParser | TimedOutOutput
     try:
-        # Run flake8
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        # Return combined output and error
-        return result.stdout + result.stderr
+        if getattr(configs, "stream", False):
+            output = Flake8OutputParser()
+            try:
+                stream_command(cmd, output, cwd=project_dir, timeout=timeout, label="flake8")
+            except subprocess.TimeoutExpired:
+                output = TimedOutOutput(output, timeout)
+        else:
+            # Run flake8
+            result = run_with_timeout(cmd, cwd=project_dir, timeout=timeout)
+            
+            # Combine output and error
+            output = TimedOutOutput(result.output, timeout) if result.timed_out else result.output
     except Exception as e:
-        raise RuntimeError(f"Error running flake8: {e}")
\ No newline at end of file
+        raise RuntimeError(f"Error running flake8: {e}")
+    
+    if isinstance(output, TimedOutOutput):
+        logger.warning(f"flake8 timed out after {timeout} seconds. Parsing the output written until then.")
+    
+    return PartialOutput(output, changed_since, files) if changed_since else output
\ No newline at end of file
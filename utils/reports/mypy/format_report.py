@@ -26,6 +26,14 @@ def format_report(results: Any) -> List[str]:
         f"- **Type Checking (mypy)**: {results.status.upper()} ({results.errors} issues)\n",
     ]
     
+    # Note that only some files were checked
+    if getattr(results, "partial", False):
+        content.append(f"- **Partial run**: only the {len(results.checked_files)} files changed since `{results.changed_since}` or importing a changed file were checked\n")
+    
+    # Note that the tool was stopped before it finished
+    if getattr(results, "timed_out", False):
+        content.append(f"- **Timed out**: mypy was stopped after {results.timeout} seconds, so the issues below may be incomplete\n")
+    
     # Add mypy issues
     if results.issues:
         content.append("## Type Checking Issues (mypy)\n")
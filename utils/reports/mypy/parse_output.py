@@ -5,71 +5,107 @@ import re
 from typing import Any
 
 
-def parse_output(output: str, results: Any) -> bool:
+from utils.common.partial_output import PartialOutput, unwrap_partial_output
+from utils.common.timed_out_output import TimedOutOutput, unwrap_timed_out_output
+
+
+# Format: file:line: error message  [error-code]
+_ERROR_PATTERN = re.compile(r'([^:]+):(\d+)(?::(\d+))?: (?:error|warning|note): (.+?)(?:\s+\[([^\]]+)\])?$')
+
+
+class MypyOutputParser:
     """
-    Parse mypy output and update results.
-    
-    Args:
-        output: String output from mypy
-        results: Results object to update
-        
-    Returns:
-        bool: True if no issues found, False otherwise
+    Incremental mypy output parser.
+
+    Lines are fed one at a time, e.g. while mypy is still running,
+    and finish() writes the parsed issues to a results object.
     """
-    # Reset issues
-    results.issues = []
-    error_count = 0
-    
-    # Define pattern to match mypy error lines
-    # Format: file:line: error message  [error-code]
-    error_pattern = r'([^:]+):(\d+)(?::(\d+))?: (?:error|warning|note): (.+?)(?:\s+\[([^\]]+)\])?$'
-    
-    # Parse each line of output
-    for line in output.strip().split('\n'):
+
+    def __init__(self):
+        self.issues: list[dict[str, str]] = []
+        self.success = False
+
+    def feed(self, line: str) -> None:
+        """
+        Parse one line of mypy output.
+        """
+        if 'Success: no issues found' in line:
+            self.success = True
         if not line or line.startswith('Success:'):
-            continue
-        
-        match = re.match(error_pattern, line)
+            return
+
+        match = _ERROR_PATTERN.match(line)
         if match:
             file_path, line_num, col_num, message, error_code = match.groups()
-            
-            results.issues.append({
+            self.issues.append({
                 "file": file_path,
                 "line": line_num,
                 "column": col_num or "",
                 "error_code": error_code or "",
                 "message": message
             })
-            
-            error_count += 1
-        else:
-            # Handle lines that don't match the pattern (e.g., summary lines)
-            continue
-    
-    # Check for success message
-    success = 'Success: no issues found' in output
-    
-    # Update result fields
-    results.errors = error_count
-    results.status = "pass" if success else "fail"
-    
-    # Apply gitignore filtering if requested
-    if getattr(results, 'configs', None) and getattr(results.configs, 'respect_gitignore', False) and getattr(results.configs, 'gitignore_spec', None):
-        from utils.common.should_ignore_file import should_ignore_file
-        
-        # Filter out issues in ignored files
-        filtered_issues = []
-        filtered_count = 0
-        
-        for issue in results.issues:
-            file_path = issue.get("file", "")
-            if file_path and should_ignore_file(file_path, results.configs.gitignore_spec):
-                filtered_count += 1
-            else:
-                filtered_issues.append(issue)
-        
-        if filtered_count > 0:
-            results.issues = filtered_issues
-            results.errors -= filtered_count
-    
-    return success
\ No newline at end of file
+        # Lines that don't match the pattern (e.g., summary lines) are skipped
+
+    def progress(self) -> dict[str, int]:
+        """
+        Return the number of issues found so far.
+        """
+        return {"issues": len(self.issues)}
+
+    def finish(self, results: Any) -> bool:
+        """
+        Update results with the issues found.
+
+        Args:
+            results: Results object to update
+
+        Returns:
+            bool: True if mypy reported success, False otherwise
+        """
+        results.issues = self.issues
+        results.errors = len(self.issues)
+        results.status = "pass" if self.success else "fail"
+
+        # Apply gitignore filtering if requested
+        if getattr(results, 'configs', None) and getattr(results.configs, 'respect_gitignore', False) and getattr(results.configs, 'gitignore_spec', None):
+            from utils.common.should_ignore_file import should_ignore_file
+
+            # Filter out issues in ignored files
+            filtered_issues = []
+            filtered_count = 0
+
+            for issue in results.issues:
+                file_path = issue.get("file", "")
+                if file_path and should_ignore_file(file_path, results.configs.gitignore_spec):
+                    filtered_count += 1
+                else:
+                    filtered_issues.append(issue)
+
+            if filtered_count > 0:
+                results.issues = filtered_issues
+                results.errors -= filtered_count
+
+        return self.success
+
+
+def parse_output(output: str | MypyOutputParser | PartialOutput | TimedOutOutput, results: Any) -> bool:
+    """
+    Parse mypy output and update results.
+
+    Args:
+        output: String output from mypy, or a parser that was already fed the output while mypy ran,
+            optionally wrapped in a PartialOutput if only changed files were checked
+            and in a TimedOutOutput if mypy was stopped for running out of time
+        results: Results object to update
+
+    Returns:
+        bool: True if no issues found, False otherwise
+    """
+    tool_output: str | MypyOutputParser = unwrap_timed_out_output(unwrap_partial_output(output, results), results)
+    if isinstance(tool_output, MypyOutputParser):
+        return tool_output.finish(results)
+
+    parser = MypyOutputParser()
+    for line in tool_output.splitlines():
+        parser.feed(line)
+    return parser.finish(results)
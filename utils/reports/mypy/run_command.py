@@ -1,30 +1,228 @@
 """
 Utility function to run mypy type checking.
 """
+from datetime import datetime
+import hashlib
+import json
+import shutil
 import subprocess
-from typing import Any, Dict
+import time
+from pathlib import Path
+from typing import Any, Optional
 
 
-def run_command(configs: Dict[str, Any]) -> str:
+from configs import Configs
+from logger import logger
+from utils.common.enumerate_project_files import ProjectTree, enumerate_project_files
+from utils.common.get_changed_files import get_changed_files
+from utils.common.import_graph import build_import_graph
+from utils.common.partial_output import PartialOutput
+from utils.common.run_with_timeout import run_with_timeout
+from utils.common.stream_command import stream_command
+from utils.common.timed_out_output import TimedOutOutput
+from utils.reports.mypy.parse_output import MypyOutputParser
+
+
+# Files mypy reads its configuration from. A change to any of them restarts the daemon.
+_MYPY_CONFIG_FILES = ("mypy.ini", ".mypy.ini", "pyproject.toml", "setup.cfg")
+
+# Number of daemon runs kept in the state file.
+_MAX_RECORDED_RUNS = 100
+
+
+def run_command(configs: Configs) -> str | MypyOutputParser | PartialOutput | TimedOutOutput:
     """
-    Run mypy type checking and return the output.
-    
+    Run mypy type checking in the project directory and return the output.
+
+    Directories pruned by the shared project walk (virtual environments, dot
+    directories, gitignored paths, ...) are passed to --exclude.
+
+    If configs.mypy_daemon is set, the check is run through the mypy daemon (dmypy)
+    so that unchanged modules are not re-checked. Plain mypy is used instead
+    if the daemon is not available or fails.
+
+    If configs.stream is set, the output is fed to a MypyOutputParser while
+    mypy runs and the parser is returned instead of the output.
+
+    If configs.changed_since is set, only the Python files changed since that git ref
+    and the files that import them, directly or indirectly, are checked. The output
+    is then wrapped in a PartialOutput.
+
+    If mypy runs for longer than configs.mypy_timeout, it is stopped and the output
+    written until then is wrapped in a TimedOutOutput.
+
     Args:
-        configs: Configuration dictionary with type checking settings
-        
+        configs: Configuration dataclass with type checking settings
+
     Returns:
-        str: The output from mypy
-        
+        str | MypyOutputParser | PartialOutput | TimedOutOutput: The output from mypy, or the parser it was streamed to
+
     Raises:
         RuntimeError: If there's an error running mypy
     """
-    cmd = ["mypy", "."]
-    
+    project_dir = Path(configs.test_dir).parent.resolve()
+    tree = enumerate_project_files(project_dir, configs.gitignore_spec if configs.respect_gitignore else None)
+    exclude = tree.mypy_exclude()
+    flags = ["--exclude", exclude] if exclude else []
+
+    changed_since = getattr(configs, "changed_since", None)
+    targets = ["."]
+    if changed_since:
+        targets = _changed_targets(project_dir, tree, changed_since, Path(configs.reports_dir))
+        if not targets:
+            # Nothing to check. This is what mypy prints when it checks no files.
+            return PartialOutput("Success: no issues found in 0 source files\n", changed_since, targets)
+
+    output = None
+    if getattr(configs, "mypy_daemon", False):
+        output = _run_daemon(configs, project_dir, flags, targets)
+        if output is None:
+            logger.warning("mypy daemon is unavailable. Falling back to plain mypy.")
+
+    if output is None:
+        cmd = ["mypy", *targets, *flags]
+
+        try:
+            # Run mypy
+            _, output = _execute(cmd, project_dir, configs)
+        except Exception as e:
+            raise RuntimeError(f"Error running mypy: {e}")
+
+    return PartialOutput(output, changed_since, targets) if changed_since else output
+
+
+def _changed_targets(project_dir: Path, tree: ProjectTree, changed_since: str, reports_dir: Path) -> list[str]:
+    """
+    Return the Python files changed since a git ref and every file that imports them.
+    """
+    python_files = {Path(project_file.relative_path).as_posix() for project_file in tree.files_with_suffix(".py")}
+    changed = [path for path in get_changed_files(project_dir, changed_since) if path in python_files]
+    if not changed:
+        return []
+
+    graph = build_import_graph(tree, reports_dir / "import_graph.json")
+    targets = sorted(graph.dependents(changed))
+    logger.info(f"mypy: {len(changed)} changed files and {len(targets) - len(changed)} files that import them")
+    return targets
+
+
+def _execute(cmd: list[str], project_dir: Path, configs: Any) -> tuple[Optional[int], str | MypyOutputParser | TimedOutOutput]:
+    """
+    Run a mypy or dmypy check command, streaming its output to a parser if configs.stream is set.
+
+    If the command runs for longer than configs.mypy_timeout, it is stopped and the
+    output written until then is returned in a TimedOutOutput.
+
+    Returns:
+        tuple: The exit code, or None if a streamed command timed out, and the combined
+            output or the parser it was streamed to
+    """
+    timeout = getattr(configs, "mypy_timeout", None)
+    if getattr(configs, "stream", False):
+        parser = MypyOutputParser()
+        try:
+            returncode = stream_command(cmd, parser, cwd=project_dir, timeout=timeout, label="mypy")
+        except subprocess.TimeoutExpired:
+            logger.warning(f"mypy timed out after {timeout} seconds. Parsing the output written until then.")
+            return None, TimedOutOutput(parser, timeout)
+        return returncode, parser
+
+    result = run_with_timeout(cmd, cwd=project_dir, timeout=timeout)
+    if result.timed_out:
+        logger.warning(f"mypy timed out after {timeout} seconds. Parsing the output written until then.")
+        return result.returncode, TimedOutOutput(result.output, timeout)
+    return result.returncode, result.output
+
+
+def _run_daemon(configs: Any, project_dir: Path, flags: list[str], targets: list[str]) -> Optional[str | MypyOutputParser | TimedOutOutput]:
+    """
+    Run mypy through dmypy, starting or restarting the daemon as needed.
+
+    The daemon is restarted if the mypy configuration files or the flags changed.
+
+    Returns:
+        Optional[str | MypyOutputParser]: The output of "dmypy check" or the parser it was
+            streamed to, or None if the daemon could not be used
+    """
+    if shutil.which("dmypy") is None:
+        return None
+
+    state_path = Path(configs.reports_dir) / "mypy_daemon.json"
+    state = _load_state(state_path)
+    config_hash = _hash_config_files(project_dir, flags)
+
     try:
-        # Run mypy
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        # Return combined output and error
-        return result.stdout + result.stderr
-    except Exception as e:
-        raise RuntimeError(f"Error running mypy: {e}")
\ No newline at end of file
+        start = time.perf_counter()
+        running = subprocess.run(["dmypy", "status"], capture_output=True, text=True, cwd=project_dir).returncode == 0
+
+        warm = running and state.get("config_hash") == config_hash
+        if not running:
+            _run_dmypy(["dmypy", "start", "--", *flags], project_dir)
+        elif not warm:
+            logger.info("mypy configuration changed. Restarting the mypy daemon.")
+            _run_dmypy(["dmypy", "restart", "--", *flags], project_dir)
+
+        returncode, output = _execute(["dmypy", "check", *targets], project_dir, configs)
+        if isinstance(output, TimedOutOutput):
+            # Out of time. Falling back to plain mypy would take even longer.
+            return output
+
+        # 0 means no issues and 1 means issues were found. Anything else is a daemon error.
+        if returncode not in (0, 1):
+            details = f": {output.strip()}" if isinstance(output, str) else ""
+            logger.warning(f"mypy daemon failed with exit code {returncode}{details}")
+            subprocess.run(["dmypy", "kill"], capture_output=True, text=True, cwd=project_dir)
+            return None
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.warning(f"Error running the mypy daemon: {e}")
+        return None
+
+    duration = round(time.perf_counter() - start, 3)
+    logger.info(f"mypy daemon run was {'warm' if warm else 'cold'} ({duration} seconds)")
+
+    runs = state.get("runs", [])
+    runs.append({"timestamp": datetime.now().isoformat(), "warm": warm, "duration": duration})
+    _save_state(state_path, {"config_hash": config_hash, "runs": runs[-_MAX_RECORDED_RUNS:]})
+
+    return output
+
+
+def _run_dmypy(cmd: list[str], project_dir: Path) -> None:
+    """
+    Run a dmypy management command, raising if it fails.
+    """
+    result = subprocess.run(cmd, capture_output=True, text=True, cwd=project_dir)
+    if result.returncode != 0:
+        raise subprocess.SubprocessError(f"'{' '.join(cmd)}' failed: {result.stdout + result.stderr}")
+
+
+def _hash_config_files(directory: Path, flags: list[str]) -> str:
+    """
+    Hash the mypy flags and the contents of the mypy configuration files in a directory.
+    """
+    digest = hashlib.sha256(json.dumps(flags).encode())
+    for name in _MYPY_CONFIG_FILES:
+        path = directory / name
+        if path.is_file():
+            digest.update(name.encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _load_state(state_path: Path) -> dict[str, Any]:
+    """
+    Load the daemon state file, returning an empty state if it is missing or unreadable.
+    """
+    try:
+        with open(state_path, 'r') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _save_state(state_path: Path, state: dict[str, Any]) -> None:
+    """
+    Save the daemon state file.
+    """
+    with open(state_path, 'w') as f:
+        json.dump(state, f, indent=2)
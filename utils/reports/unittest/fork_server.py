@@ -0,0 +1,265 @@
+"""
+Client of the unittest fork server in utils/for_tests/run_tests.py.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+import signal
+import socket
+import stat
+import subprocess
+import tempfile
+import threading
+import time
+from typing import Any, Optional, Sequence
+
+
+from logger import logger
+from utils.common.run_with_timeout import GRACE_PERIOD, CommandResult
+
+
+# Seconds to wait for a new fork server to import the project's dependencies and listen.
+START_TIMEOUT = 120.0
+
+# Log of the fork server, in the reports directory.
+FORK_SERVER_LOG = "unittest_fork_server.log"
+
+# Shards run in threads, and only one of them may start the server.
+_start_lock = threading.Lock()
+
+# Sockets whose server could not start in this process, e.g. because a dependency
+# starts a thread when imported. They are not tried again.
+_failed_servers: set[Path] = set()
+
+
+def fork_server_socket(project_root: Path) -> Path:
+    """
+    Return the socket path of the fork server of a project and test virtual environment.
+
+    The socket is in a directory only the current user can access, in $XDG_RUNTIME_DIR
+    or else in the temporary directory, since Unix socket paths are limited to about
+    100 characters. The directory is created if needed.
+
+    Args:
+        project_root: Directory of the project
+
+    Returns:
+        Path: The socket path
+
+    Raises:
+        PermissionError: If the directory exists but is not private to the current user
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    base = Path(runtime_dir) if runtime_dir and os.path.isdir(runtime_dir) else Path(tempfile.gettempdir())
+    directory = base / f"unittest-fork-server-{os.getuid()}"
+    try:
+        directory.mkdir(mode=0o700)
+    except FileExistsError:
+        pass
+    # Anyone may have created it first in a shared directory such as /tmp.
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"{directory} is not a directory that only the current user can access")
+
+    key = f"{Path(project_root).resolve()}\0{os.environ.get('TEST_VENV_PATH', '')}"
+    return directory / f"{hashlib.sha256(key.encode()).hexdigest()[:16]}.sock"
+
+
+def run_in_fork_server(cmd: list[str], project_root: Path, reports_dir: Path, timeout: Optional[float],
+                       events_path: Optional[str] = None, test_ids: Sequence[str] = ()) -> Optional[CommandResult]:
+    """
+    Run the tests in a child of the project's fork server, starting the server if it is not running.
+
+    Args:
+        cmd: The command that runs Python in the test virtual environment, e.g. the unittest shell script
+        project_root: Directory of the project
+        reports_dir: Directory the server's log is written to
+        timeout: Seconds the run may take before the child's process group is stopped, or None for no limit
+        events_path: File to copy the test events the event runner wrote to, or None to run the tests as
+            "python -m unittest" does
+        test_ids: Tests to run, or all of them if empty
+
+    Returns:
+        Optional[CommandResult]: The exit code and output of the run, or None if the fork server could not be used
+    """
+    project_root = Path(project_root).resolve()
+    # The server creates the files the child writes to, and sends their content back.
+    request = {
+        "project_root": str(project_root),
+        "events": events_path is not None,
+        "test_ids": list(test_ids),
+    }
+    try:
+        socket_path = fork_server_socket(project_root)
+        if socket_path in _failed_servers:
+            return None
+        # A server whose preloaded modules changed on disk stops and asks for a new one.
+        for _ in range(2):
+            conn = _connect(cmd, project_root, socket_path, Path(reports_dir))
+            if conn is None:
+                return None
+            with conn:
+                replies = conn.makefile('r', encoding='utf-8')
+                conn.sendall((json.dumps(request) + "\n").encode('utf-8'))
+                reply = _read_reply(replies)
+                if reply.get("restart"):
+                    logger.info("The unittest fork server's dependencies changed. Starting a new one.")
+                    continue
+                if "pid" not in reply:
+                    logger.warning(f"The unittest fork server could not run the tests: {reply.get('error', reply)}")
+                    return None
+                return _wait_for_child(conn, replies, reply["pid"], events_path, timeout)
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Error running the tests in the unittest fork server: {e}")
+        return None
+
+
+def stop_fork_server(project_root: Path) -> bool:
+    """
+    Stop the fork server of a project, if it is running.
+
+    Args:
+        project_root: Directory of the project
+
+    Returns:
+        bool: Whether a server was running
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.connect(str(fork_server_socket(project_root)))
+            conn.sendall(b'{"command": "stop"}\n')
+            conn.settimeout(5)
+            return bool(_read_reply(conn.makefile('r', encoding='utf-8')).get("stopped"))
+    except (OSError, ValueError):
+        return False
+
+
+def _connect(cmd: list[str], project_root: Path, socket_path: Path, reports_dir: Path) -> Optional[socket.socket]:
+    """
+    Connect to the fork server, starting it in the test virtual environment if it is not running.
+    """
+    with _start_lock:
+        conn = _try_connect(socket_path)
+        if conn is not None:
+            return conn
+
+        run_tests = Path(__file__).resolve().parents[2] / "for_tests" / "run_tests.py"
+        logger.info("Starting the unittest fork server")
+        reports_dir.mkdir(parents=True, exist_ok=True)
+        with open(reports_dir / FORK_SERVER_LOG, 'a') as log:
+            # Its own session, so it outlives this run and is not stopped with it.
+            server = subprocess.Popen(
+                cmd + [str(run_tests), "--serve", str(socket_path), str(project_root)],
+                stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT, start_new_session=True,
+            )
+
+        deadline = time.monotonic() + START_TIMEOUT
+        while time.monotonic() < deadline:
+            conn = _try_connect(socket_path)
+            if conn is not None:
+                return conn
+            if server.poll() is not None:
+                logger.warning(f"The unittest fork server exited with code {server.returncode}. See {reports_dir / FORK_SERVER_LOG}")
+                _failed_servers.add(socket_path)
+                return None
+            time.sleep(0.05)
+
+        logger.warning(f"The unittest fork server did not start within {START_TIMEOUT} seconds")
+        server.kill()
+        return None
+
+
+def _try_connect(socket_path: Path) -> Optional[socket.socket]:
+    """
+    Connect to a listening fork server, or return None if there is none.
+    """
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(str(socket_path))
+        return conn
+    except OSError:
+        conn.close()
+        return None
+
+
+def _read_reply(replies: Any) -> dict[str, Any]:
+    """
+    Read one JSON reply line from the server.
+    """
+    line = replies.readline()
+    if not line:
+        raise ConnectionError("The unittest fork server closed the connection")
+    return json.loads(line)
+
+
+def _wait_for_child(conn: socket.socket, replies: Any, pid: int, events_path: Optional[str],
+                    timeout: Optional[float]) -> CommandResult:
+    """
+    Wait for the forked child to exit, stopping its process group if it runs out of time.
+    """
+    conn.settimeout(timeout)
+    try:
+        reply = _read_reply(replies)
+    except socket.timeout:
+        reply = _stop_child(conn, pid)
+        output = reply.get("output", "")
+        _write_events(events_path, reply)
+        # The last line may have been cut off by the signal.
+        return CommandResult(-signal.SIGTERM, output[:output.rfind('\n') + 1], "", timed_out=True)
+    except BaseException:
+        # e.g. KeyboardInterrupt. Do not leave the tests running.
+        _kill_group(pid, signal.SIGKILL)
+        raise
+
+    _write_events(events_path, reply)
+    return CommandResult(reply["returncode"], reply.get("output", ""), "")
+
+
+def _stop_child(conn: socket.socket, pid: int) -> dict[str, Any]:
+    """
+    Send SIGTERM to the child's process group, and SIGKILL if it has not exited after the grace period.
+
+    Returns the server's reply once the child exited, or an empty dict if there was none.
+    """
+    _kill_group(pid, signal.SIGTERM)
+    reply = _read_reply_within(conn, GRACE_PERIOD)
+    # Also stops anything the tests started that outlived the child.
+    _kill_group(pid, signal.SIGKILL)
+    return reply or _read_reply_within(conn, GRACE_PERIOD)
+
+
+def _read_reply_within(conn: socket.socket, timeout: float) -> dict[str, Any]:
+    """
+    Read a reply with a new reader, since one that timed out cannot be read from again.
+    Returns an empty dict if none came within timeout seconds.
+    """
+    conn.settimeout(timeout)
+    try:
+        return _read_reply(conn.makefile('r', encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_events(events_path: Optional[str], reply: dict[str, Any]) -> None:
+    """
+    Write the events the server sent back to the client's events file.
+    """
+    if events_path is not None and reply.get("events") is not None:
+        with open(events_path, 'w', encoding='utf-8') as f:
+            f.write(reply["events"])
+
+
+def _kill_group(pid: int, sig: int) -> None:
+    """
+    Send a signal to the process group the child leads, if it still exists.
+    """
+    try:
+        os.killpg(pid, sig)
+    except (ProcessLookupError, PermissionError):
+        # The child may not have started its own session yet.
+        try:
+            os.kill(pid, sig)
+        except (ProcessLookupError, PermissionError):
+            pass
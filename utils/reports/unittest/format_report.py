@@ -5,6 +5,10 @@ from datetime import datetime
 from typing import Any, List, Dict
 
 
+# Number of tests and test classes listed in the slowest tests sections.
+SLOWEST_COUNT = 10
+
+
 def format_report(results: Any) -> List[str]:
     """
     Generate a Markdown report of the unittest results.
@@ -35,6 +39,22 @@ def format_report(results: Any) -> List[str]:
         "",
     ]
     
+    # Note that only the tests affected by changed files were run
+    if getattr(results, "partial", False):
+        since = f"`{results.changed_since}`" if results.changed_since else "the last run"
+        content.append(
+            f"- **Partial run**: only the {len(results.checked_files)} test modules affected by changes since {since} were run, "
+            f"{len(results.skipped_unaffected)} tests were skipped as unaffected\n"
+        )
+    
+    # Note that the run was stopped before every test finished
+    unfinished_tests: List[str] = getattr(results, "unfinished_tests", None) or []
+    if getattr(results, "timed_out", False):
+        content.append(
+            f"- **Timed out**: the tests were stopped after {results.timeout} seconds, "
+            f"{len(unfinished_tests)} tests never finished\n"
+        )
+    
     # Add test details if there are any issues
     if results.test_cases:
         content.extend([
@@ -70,4 +90,59 @@ def format_report(results: Any) -> List[str]:
                     f"```\n{tc_traceback.strip()}\n```\n",
                 ])
     
-    return content
\ No newline at end of file
+    # Add the slowest tests and test classes if per-test timings were recorded
+    test_durations: Dict[str, float] = getattr(results, "test_durations", None) or {}
+    if test_durations:
+        content.extend(_format_slowest_tests(test_durations))
+    
+    # List the tests that were still to run when the time ran out
+    if unfinished_tests:
+        content.append("\n## Unfinished tests\n")
+        content.extend(f"- {test_id}" for test_id in unfinished_tests)
+        content.append("")
+    
+    # List the tests impact analysis did not run
+    skipped_unaffected: List[str] = getattr(results, "skipped_unaffected", None) or []
+    if skipped_unaffected:
+        content.append("\n## Skipped as unaffected\n")
+        content.extend(f"- {test_id}" for test_id in skipped_unaffected)
+        content.append("")
+    
+    return content
+
+
+def _format_slowest_tests(test_durations: Dict[str, float]) -> List[str]:
+    """
+    Format the slowest tests and the slowest test classes as markdown tables.
+    
+    Args:
+        test_durations: Wall-clock duration in seconds of each test, keyed by test id
+        
+    Returns:
+        List[str]: Lines of the markdown sections
+    """
+    slowest_tests = sorted(test_durations.items(), key=lambda item: item[1], reverse=True)[:SLOWEST_COUNT]
+    content: List[str] = [
+        f"\n## Slowest {len(slowest_tests)} tests\n",
+        "| Test | Duration (s) |",
+        "|------|--------------|",
+    ]
+    for test_id, duration in slowest_tests:
+        content.append(f"| {test_id} | {duration:.3f} |")
+    
+    # Group the tests by class, e.g. "tests.test_a.TestA.test_x" belongs to "tests.test_a.TestA"
+    class_durations: Dict[str, List[float]] = {}
+    for test_id, duration in test_durations.items():
+        class_durations.setdefault(test_id.rsplit('.', 1)[0], []).append(duration)
+    slowest_classes = sorted(class_durations.items(), key=lambda item: sum(item[1]), reverse=True)[:SLOWEST_COUNT]
+    
+    content.extend([
+        f"\n## Slowest {len(slowest_classes)} test classes\n",
+        "| Class | Tests | Duration (s) |",
+        "|-------|-------|--------------|",
+    ])
+    for class_id, durations in slowest_classes:
+        content.append(f"| {class_id} | {len(durations)} | {sum(durations):.3f} |")
+    content.append("")
+    
+    return content
@@ -1,122 +1,498 @@
 """
 Utility function to parse the output of unittest test runs.
 """
+from collections import deque
+import json
 import re
 import time
 from typing import Any, Dict, Optional
 
 
-def parse_output(output: str, results: Any) -> bool:
+from utils.common.partial_output import PartialOutput, unwrap_partial_output
+from utils.common.timed_out_output import TimedOutOutput, unwrap_timed_out_output
+
+# Counters that are summed across shards when merging sharded output.
+_COUNT_FIELDS = ("tests", "errors", "failures", "skipped", "expected_failures", "unexpected_successes")
+
+
+# Separator lines unittest prints around each failure section and before the summary.
+_SEPARATOR1 = "=" * 70
+_SEPARATOR2 = "-" * 70
+
+_RAN_PATTERN = re.compile(r'Ran (\d+) tests? in ([\d.]+)s')
+_SUMMARY_PATTERN = re.compile(r'(FAILED|OK)(?: \((.+?)\))?')
+_SECTION_HEADER_PATTERN = re.compile(r'(FAIL|ERROR): (.+)')
+_COUNTER_PATTERNS = {
+    "errors": re.compile(r'errors=(\d+)'),
+    "failures": re.compile(r'failures=(\d+)'),
+    "skipped": re.compile(r'skipped=(\d+)'),
+    "expected_failures": re.compile(r'expected failures=(\d+)'),
+    "unexpected_successes": re.compile(r'unexpected successes=(\d+)'),
+}
+
+# Progress lines: a line of result characters, or one verbose result per line.
+_DOTS_PATTERN = re.compile(r'[.FEsxu]+')
+_DOT_STATUSES = {".": "pass", "F": "FAIL", "E": "ERROR", "s": "skipped", "x": "expected_failure", "u": "unexpected_success"}
+# A verbose line starts with the test's description, e.g. "test_a (tests.test_x.TestX.test_a) ... ok".
+# The result is on a later line if the test wrote output of its own.
+_VERBOSE_LINE_PATTERN = re.compile(r'(.*?) \.\.\. ?(.*)')
+_VERBOSE_OUTCOME_PATTERN = re.compile(r'(ok|FAIL|ERROR|skipped|expected failure|unexpected success)(?: .*)?')
+_VERBOSE_STATUSES = {
+    "ok": "pass",
+    "FAIL": "FAIL",
+    "ERROR": "ERROR",
+    "skipped": "skipped",
+    "expected failure": "expected_failure",
+    "unexpected success": "unexpected_success",
+}
+# "test_a (tests.test_x.TestX.test_a)" since Python 3.11, "test_a (tests.test_x.TestX)" before.
+_DESCRIPTION_PATTERN = re.compile(r'(\w+) \(([\w.]+)\)')
+# A failed subtest is reported on a line of its own, e.g. "  test_a (tests.test_x.TestX.test_a) (i=1) ... FAIL".
+_SUBTEST_PATTERN = re.compile(r'\s+\w+ \([\w.]+\) \(.*\)')
+
+# Maps test statuses to the counter they are added to.
+_STATUS_COUNTERS = {
+    "FAIL": "failures",
+    "ERROR": "errors",
+    "skipped": "skipped",
+    "expected_failure": "expected_failures",
+    "unexpected_success": "unexpected_successes",
+}
+
+# Number of trailing output lines kept for error messages.
+_TAIL_LINES = 50
+
+
+class UnittestOutputParser:
+    """
+    Incremental unittest output parser.
+
+    Lines are fed one at a time, e.g. while the tests are still running, and
+    finish() writes the parsed counts and failures to a results object. Only the
+    failure sections and the last few lines of output are kept in memory.
+
+    If the run was stopped before unittest printed its summary, the counts are
+    taken from the progress output instead, and with verbose output the test that
+    had started but not finished is known too.
+    """
+
+    def __init__(self):
+        self.counts = dict.fromkeys(_COUNT_FIELDS, 0)
+        self.progress_counts = dict.fromkeys(_COUNT_FIELDS, 0)
+        self.success = False
+        self.failed = False
+        self.summarized = False
+        self.tests_run = 0
+        self.duration = 0.0
+        self.test_cases: list[dict[str, str]] = []
+        # Status of each test by id, known only from verbose output
+        self.test_statuses: dict[str, str] = {}
+        self.tail: deque[str] = deque(maxlen=_TAIL_LINES)
+
+        # State of the failure section being read: None, "header", "dashes", "traceback" or "traceback_dashes"
+        self._state: Optional[str] = None
+        self._section: Optional[tuple[str, str]] = None
+        self._traceback: list[str] = []
+        # Id of the test whose verbose result has not been printed yet, and whether any of its subtests failed
+        self._started: Optional[str] = None
+        self._subtests_failed = False
+
+    def feed(self, line: str) -> None:
+        """
+        Parse one line of unittest output.
+        """
+        self.tail.append(line)
+        self._feed(line)
+
+    def _feed(self, line: str) -> None:
+        state = self._state
+
+        if state == "traceback":
+            if line == _SEPARATOR1:
+                self._close_section()
+                self._state = "header"
+            elif line == _SEPARATOR2:
+                self._state = "traceback_dashes"
+            else:
+                self._traceback.append(line)
+            return
+
+        if state == "traceback_dashes":
+            # A dash line followed by "Ran N tests" ends the last failure section.
+            if _RAN_PATTERN.match(line):
+                self._close_section()
+                self._state = None
+            else:
+                self._traceback.append(_SEPARATOR2)
+                self._state = "traceback"
+                self._feed(line)
+                return
+
+        elif state == "header":
+            match = _SECTION_HEADER_PATTERN.fullmatch(line)
+            if match:
+                self._section = (match.group(1), match.group(2))
+                self._state = "dashes"
+                return
+            self._state = None
+
+        elif state == "dashes":
+            if line == _SEPARATOR2:
+                self._traceback = []
+                self._state = "traceback"
+                return
+            self._state = None
+
+        if line == _SEPARATOR1:
+            self._state = "header"
+            return
+
+        ran_match = _RAN_PATTERN.match(line)
+        if ran_match:
+            self._finish_subtested_test()
+            self.summarized = True
+            self.counts["tests"] = int(ran_match.group(1))
+            self.duration = float(ran_match.group(2))
+            return
+
+        summary_match = _SUMMARY_PATTERN.fullmatch(line)
+        if summary_match:
+            self.success = summary_match.group(1) == "OK"
+            self.failed = not self.success
+            for field, pattern in _COUNTER_PATTERNS.items():
+                counter_match = pattern.search(summary_match.group(2) or "")
+                if counter_match:
+                    self.counts[field] = int(counter_match.group(1))
+            return
+
+        if _DOTS_PATTERN.fullmatch(line):
+            for char in line:
+                self._count(_DOT_STATUSES[char])
+        else:
+            self._feed_verbose(line)
+
+    def _feed_verbose(self, line: str) -> None:
+        match = _VERBOSE_LINE_PATTERN.fullmatch(line)
+        if match and _SUBTEST_PATTERN.fullmatch(match.group(1)):
+            outcome = _VERBOSE_OUTCOME_PATTERN.fullmatch(match.group(2))
+            if outcome and self._started is not None:
+                status = _VERBOSE_STATUSES[outcome.group(1)]
+                self._count(status, test_finished=False)
+                _record_status(self.test_statuses, self._started, status)
+                self._subtests_failed = True
+            return
+        if match:
+            test_id = _described_test_id(match.group(1))
+            if test_id is None and len(self.tail) > 1:
+                # A test with a docstring is described on two lines: its name, then the docstring's first line.
+                test_id = _described_test_id(self.tail[-2])
+            if test_id is not None:
+                self._finish_subtested_test()
+                self._started = test_id
+                line = match.group(2)
+
+        if self._started is None:
+            return
+        outcome = _VERBOSE_OUTCOME_PATTERN.fullmatch(line)
+        if outcome:
+            status = _VERBOSE_STATUSES[outcome.group(1)]
+            self._count(status)
+            _record_status(self.test_statuses, self._started, status)
+            self._started = None
+            self._subtests_failed = False
+
+    def _finish_subtested_test(self) -> None:
+        # unittest prints no result for a test whose subtests failed, so it ends when the next one starts.
+        if self._subtests_failed:
+            self.tests_run += 1
+            self._started = None
+            self._subtests_failed = False
+
+    def _count(self, status: str, test_finished: bool = True) -> None:
+        if test_finished:
+            self.tests_run += 1
+        counter = _STATUS_COUNTERS.get(status)
+        if counter:
+            self.progress_counts[counter] += 1
+
+    def _close_section(self) -> None:
+        if self._section is None:
+            return
+        status, test_id = self._section
+        self.test_cases.append(_test_case(status, test_id, "\n".join(self._traceback)))
+        self._section = None
+        self._traceback = []
+
+    def progress(self) -> dict[str, int]:
+        """
+        Return the number of tests run and failure sections read so far.
+        """
+        return {"tests_run": self.tests_run, "failed_or_errored": len(self.test_cases)}
+
+    def finish(self, results: Any) -> bool:
+        """
+        Populate results with the parsed counts and failures.
+
+        Args:
+            results: Results object to populate
+
+        Returns:
+            bool: True if all tests passed, False otherwise
+        """
+        if self._state in ("traceback", "traceback_dashes"):
+            self._close_section()
+            self._state = None
+
+        if self.summarized:
+            counts = self.counts
+            unfinished_tests = []
+        else:
+            # unittest prints the summary and the failures only once every test has run.
+            counts = {**self.progress_counts, "tests": self.tests_run}
+            unfinished_tests = [self._started] if self._started is not None else []
+
+        for field, count in counts.items():
+            setattr(results, field, count)
+        results.success_rate = _calculate_success_rate(results)
+        results.test_cases = list(self.test_cases)
+        results.duration = self.duration
+        # The text output has no per-test timings.
+        results.test_durations = {}
+        results.test_statuses = dict(self.test_statuses)
+        results.unfinished_tests = unfinished_tests
+        return self.success
+
+
+class UnittestEventParser:
+    """
+    Parser for the JSON events written by utils/for_tests/event_runner.py.
+
+    Each event line is decoded with json.loads, so counts and failures are
+    taken from the test results themselves rather than from the text output.
+    """
+
+    def __init__(self):
+        self.counts = dict.fromkeys(_COUNT_FIELDS, 0)
+        self.test_cases: list[dict[str, str]] = []
+        self.test_ids: set[str] = set()
+        self.test_durations: dict[str, float] = {}
+        self.test_statuses: dict[str, str] = {}
+        self.finished: set[str] = set()
+        self.planned: list[str] = []
+        self.run: Optional[dict[str, Any]] = None
+
+    def feed(self, line: str) -> None:
+        """
+        Parse one event line.
+        """
+        if not line.strip():
+            return
+
+        event = json.loads(line)
+        if event.get("event") == "run":
+            self.run = event
+            return
+        if event.get("event") == "plan":
+            self.planned = event["tests"]
+            return
+
+        self.test_ids.add(event["id"])
+        self.finished.add(event.get("test_id", event["id"]))
+        # Errors outside a test, e.g. in setUpClass, have no class and no duration.
+        if event["class"]:
+            self.test_durations[event.get("test_id", event["id"])] = event["duration"]
+            _record_status(self.test_statuses, event.get("test_id", event["id"]), event["status"])
+        counter = _STATUS_COUNTERS.get(event["status"])
+        if counter:
+            self.counts[counter] += 1
+        if event["status"] in ("FAIL", "ERROR"):
+            self.test_cases.append({field: event[field] for field in ("id", "name", "module", "class", "status", "message", "traceback")})
+
+    def progress(self) -> dict[str, int]:
+        """
+        Return the number of tests and failure events read so far.
+        """
+        return {"tests_run": len(self.test_ids), "failed_or_errored": len(self.test_cases)}
+
+    def finish(self, results: Any) -> bool:
+        """
+        Populate results with the counts and failures from the events.
+
+        Per-test wall-clock durations are stored in results.test_durations and statuses
+        in results.test_statuses, keyed by test id. If the run did not finish, the tests are counted from the test events
+        and the planned tests that never finished are stored in results.unfinished_tests.
+
+        Args:
+            results: Results object to populate
+
+        Returns:
+            bool: True if all tests passed, False otherwise
+        """
+        for field, count in self.counts.items():
+            setattr(results, field, count)
+        if self.run is not None:
+            results.tests = self.run["tests"]
+            results.duration = self.run["duration"]
+            success = self.run["successful"]
+        else:
+            results.tests = len(self.test_ids)
+            results.duration = round(sum(self.test_durations.values()), 6)
+            success = False
+        results.success_rate = _calculate_success_rate(results)
+        results.test_cases = list(self.test_cases)
+        results.test_durations = dict(self.test_durations)
+        results.test_statuses = dict(self.test_statuses)
+        results.unfinished_tests = [] if self.run is not None else [
+            test_id for test_id in self.planned if test_id not in self.finished
+        ]
+        return success
+
+
+def parse_output(output: str | UnittestOutputParser | UnittestEventParser | list | PartialOutput, results: Any) -> bool:
     """
     Parse the output from the unittest run and populate the results object.
     
     Args:
-        output: String output from the unittest run
+        output: String output from the unittest run, a parser that was already fed the
+            output or the test events, or a list of any of these from a sharded run,
+            optionally wrapped in a PartialOutput if only the affected tests were run.
+            The output of a run or shard that timed out is wrapped in a TimedOutOutput.
         results: Results object to populate
         
     Returns:
         bool: True if all tests passed, False otherwise
     """
-    # Initialize results
-    results.tests = 0
-    results.errors = 0
-    results.failures = 0
-    results.skipped = 0
-    results.expected_failures = 0
-    results.unexpected_successes = 0
-    results.test_cases = []
-    
-    # Extract test count using regex
-    test_count_match = re.search(r'Ran (\d+) tests', output)
-    if test_count_match:
-        results.tests = int(test_count_match.group(1))
-    
-    # Check if tests were successful
-    success = "OK" in output
+    return _parse_output(unwrap_partial_output(output, results), results)
+
+
+def _parse_output(output: str | UnittestOutputParser | UnittestEventParser | list | TimedOutOutput, results: Any) -> bool:
+    """
+    Parse the output of a whole run or of one shard.
+    """
+    if isinstance(output, list):
+        return _merge_shard_outputs(output, results)
+
+    run_output: str | UnittestOutputParser | UnittestEventParser = unwrap_timed_out_output(output, results)
+    if isinstance(run_output, (UnittestOutputParser, UnittestEventParser)):
+        return run_output.finish(results)
+
+    parser = UnittestOutputParser()
+    for line in run_output.splitlines():
+        parser.feed(line)
+    return parser.finish(results)
+
+
+def _merge_shard_outputs(outputs: list, results: Any) -> bool:
+    """
+    Parse the output of each shard and merge them into a single results object.
     
-    # Extract failures and errors
-    error_match = re.search(r'FAILED \((.+?)\)', output)
-    if error_match:
-        error_info = error_match.group(1)
-        
-        # Extract error count
-        errors_match = re.search(r'errors=(\d+)', error_info)
-        if errors_match:
-            results.errors = int(errors_match.group(1))
+    Args:
+        outputs: String outputs or parsers from each shard of the unittest run
+        results: Results object to populate
         
-        # Extract failure count
-        failures_match = re.search(r'failures=(\d+)', error_info)
-        if failures_match:
-            results.failures = int(failures_match.group(1))
-            
-        # Extract skipped count
-        skipped_match = re.search(r'skipped=(\d+)', error_info)
-        if skipped_match:
-            results.skipped = int(skipped_match.group(1))
-            
-        # Extract expected failures count
-        expected_failures_match = re.search(r'expected failures=(\d+)', error_info)
-        if expected_failures_match:
-            results.expected_failures = int(expected_failures_match.group(1))
-            
-        # Extract unexpected successes count
-        unexpected_successes_match = re.search(r'unexpected successes=(\d+)', error_info)
-        if unexpected_successes_match:
-            results.unexpected_successes = int(unexpected_successes_match.group(1))
-    
-    # Calculate success rate
+    Returns:
+        bool: True if the tests in every shard passed, False otherwise
+    """
+    totals = dict.fromkeys(_COUNT_FIELDS, 0)
+    test_cases = []
+    test_durations = {}
+    test_statuses = {}
+    unfinished_tests = []
+    duration = 0.0
+    timeout = None
+    success = True
+
+    for output in outputs:
+        success = _parse_output(output, results) and success
+        for field in _COUNT_FIELDS:
+            totals[field] += getattr(results, field)
+        test_cases.extend(results.test_cases)
+        test_durations.update(results.test_durations)
+        test_statuses.update(results.test_statuses)
+        unfinished_tests.extend(results.unfinished_tests)
+        if results.timed_out:
+            timeout = results.timeout
+        # Shards run at the same time, so the slowest one is the suite's duration.
+        duration = max(duration, results.duration)
+
+    for field, total in totals.items():
+        setattr(results, field, total)
+    results.test_cases = test_cases
+    results.test_durations = test_durations
+    results.test_statuses = test_statuses
+    results.unfinished_tests = unfinished_tests
+    results.duration = duration
+    results.timed_out = timeout is not None
+    if results.timed_out:
+        results.timeout = timeout
+    results.success_rate = _calculate_success_rate(results)
+
+    return success
+
+
+def _calculate_success_rate(results: Any) -> float:
+    """
+    Calculate the percentage of tests that neither failed nor errored.
+    """
     if results.tests > 0:
         success_count = results.tests - results.errors - results.failures
-        results.success_rate = (success_count / results.tests) * 100
-    else:
-        results.success_rate = 0
-    
-    # Parse individual test failures/errors from traceback sections
-    test_failures = _extract_test_failures(output)
-    for failure in test_failures:
-        results.test_cases.append(failure)
-    
-    return success
+        return (success_count / results.tests) * 100
+    return 0
 
 
-def _extract_test_failures(output: str) -> list:
+def _record_status(statuses: dict[str, str], test_id: str, status: str) -> None:
     """
-    Extract individual test failures from unittest output.
+    Record the status of a test, keeping an error or failure of any of its subtests.
+    """
+    if statuses.get(test_id) == "ERROR" or (statuses.get(test_id) == "FAIL" and status != "ERROR"):
+        return
+    statuses[test_id] = status
+
+
+def _described_test_id(description: str) -> Optional[str]:
+    """
+    Return the id of the test a verbose line describes, or None if it describes none.
+    """
+    match = _DESCRIPTION_PATTERN.fullmatch(description)
+    if match is None:
+        return None
+    name, location = match.groups()
+    return location if location.endswith(f".{name}") else f"{location}.{name}"
+
+
+def _test_case(status: str, test_id: str, traceback: str) -> dict[str, str]:
+    """
+    Build the test case entry for a failure section.
     
     Args:
-        output: String output from unittest
+        status: "FAIL" or "ERROR"
+        test_id: The test description from the section header
+        traceback: The traceback printed in the section
         
     Returns:
-        list: List of test failure dictionaries
+        dict: The test failure dictionary
     """
-    failure_sections = re.findall(r'======================================================================\n(FAIL|ERROR): (.+?)\n----------------------------------------------------------------------\n(.+?)(?=\n======================================================================|\Z)', 
-                                output, re.DOTALL)
+    # Parse test_id into module, class, and method
+    parts = test_id.split('.')
+    if len(parts) >= 3:
+        module = '.'.join(parts[:-2])
+        class_name = parts[-2]
+        method_name = parts[-1]
+    else:
+        module = parts[0] if parts else ""
+        class_name = parts[1] if len(parts) > 1 else ""
+        method_name = parts[2] if len(parts) > 2 else test_id
     
-    test_failures = []
-    for status, test_id, traceback in failure_sections:
-        # Parse test_id into module, class, and method
-        parts = test_id.split('.')
-        if len(parts) >= 3:
-            module = '.'.join(parts[:-2])
-            class_name = parts[-2]
-            method_name = parts[-1]
-        else:
-            module = parts[0] if parts else ""
-            class_name = parts[1] if len(parts) > 1 else ""
-            method_name = parts[2] if len(parts) > 2 else test_id
-        
-        # Extract error message from traceback
-        message_match = re.search(r'\n([^\n]+)$', traceback.strip())
-        message = message_match.group(1) if message_match else "Unknown error"
-        
-        test_failures.append({
-            "id": test_id,
-            "name": method_name,
-            "module": module,
-            "class": class_name,
-            "status": status,
-            "message": message,
-            "traceback": traceback
-        })
+    # Extract error message from traceback
+    message_match = re.search(r'\n([^\n]+)$', traceback.strip())
+    message = message_match.group(1) if message_match else "Unknown error"
     
-    return test_failures
\ No newline at end of file
+    return {
+        "id": test_id,
+        "name": method_name,
+        "module": module,
+        "class": class_name,
+        "status": status,
+        "message": message,
+        "traceback": traceback
+    }
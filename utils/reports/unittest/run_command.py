@@ -1,25 +1,75 @@
 """
 Utility function to run unittest tests through subprocess.
 """
+from concurrent.futures import ThreadPoolExecutor
+import json
 import os
 import subprocess
+import tempfile
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional, Sequence
 
 
 from logger import logger
 from configs import Configs
+from utils.common.enumerate_project_files import enumerate_project_files
+from utils.common.partial_output import PartialOutput
+from utils.common.report_files import latest_report_path, read_report
+from utils.common.run_with_timeout import CommandResult, run_with_timeout
+from utils.common.stream_command import stream_command
+from utils.common.timed_out_output import TimedOutOutput
+from utils.reports.unittest.parse_output import UnittestEventParser, UnittestOutputParser
+from utils.reports.unittest.select_tests import ImpactSelection, plan_impact_run, record_impact_run
+from utils.reports.unittest.shard_tests import shard_tests
+
+
+# Lines printed by the discovery snippet start with this prefix,
+# so they can be told apart from the shell script's own output.
+_TEST_ID_PREFIX = "TEST_ID:"
+
+# What unittest prints when it runs no tests.
+_NO_TESTS_OUTPUT = "Ran 0 tests in 0.000s\n\nOK\n"
+
+# Run inside the test virtual environment to list test IDs the same way
+# "python -m unittest discover -s PROJECT_DIR -p test_*.py" would find them.
+_LIST_TEST_IDS = f"""
+import sys
+import unittest
+
+def iter_tests(suite):
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            yield from iter_tests(test)
+        else:
+            yield test
+
+for test in iter_tests(unittest.defaultTestLoader.discover(sys.argv[1], pattern="test_*.py")):
+    print("{_TEST_ID_PREFIX}" + test.id())
+"""
 
 
 def run_command(configs: Configs) -> Any:
     """
     Run the unittest tests using a subprocess call to bash script.
     
+    If configs.unittest_events is set, the tests are run by utils/for_tests/event_runner.py
+    instead of "python -m unittest discover", and the parser of the events it wrote
+    is returned in place of the output.
+
+    If configs.test_impact is set, only the test modules that import a file changed
+    since the last run (or since configs.changed_since) are run, apart from a periodic
+    full run. The output is then wrapped in a PartialOutput that lists the skipped tests.
+    A run that timed out does not count as a run, so the same tests are chosen again.
+    
     Args:
         configs: Configuration dataclass with test_dir and other settings
         
     Returns:
-        unittest.TestResult: The result of running the tests
+        str | list[str]: The output of the test run, or one output per shard
+            when configs.unittest_shards is greater than 1. If configs.stream is set,
+            each output is instead the UnittestOutputParser it was streamed to.
+            Wrapped in a PartialOutput if impact analysis skipped some tests, and
+            in a TimedOutOutput if the run took longer than configs.unittest_timeout.
         
     Raises:
         ValueError: If the operating system is not supported
@@ -43,24 +93,242 @@ def run_command(configs: Configs) -> Any:
     else:
         raise ValueError(f"Unsupported operating system: {os.name}")
 
+    if not getattr(configs, "test_impact", False):
+        return _run_suite(cmd, project_root, configs)
+
+    tree = enumerate_project_files(project_root, configs.gitignore_spec if configs.respect_gitignore else None)
+    selection = plan_impact_run(
+        project_root, tree, Path(configs.reports_dir), _load_latest_report(configs.reports_dir),
+        configs.changed_since, configs.test_impact_full_run_every,
+    )
+    if selection.modules is None:
+        logger.info(f"Running the whole test suite because {selection.reason}")
+        output = _run_suite(cmd, project_root, configs)
+        _record_finished_run(Path(configs.reports_dir), selection, output)
+        return output
+
+    logger.info(
+        f"{len(selection.changed_files)} files changed. Running {len(selection.modules)} affected test modules "
+        f"and skipping {len(selection.skipped)} unaffected tests"
+    )
+    if selection.modules:
+        output = _run_suite(cmd, project_root, configs, selection.modules)
+    else:
+        output = _NO_TESTS_OUTPUT
+    _record_finished_run(Path(configs.reports_dir), selection, output)
+    return PartialOutput(output, configs.changed_since or "", selection.files, selection.skipped)
+
+
+def _record_finished_run(reports_dir: Path, selection: ImpactSelection, output: Any) -> None:
+    """
+    Save the impact-analysis state of a run, unless the run or any of its shards timed out.
+
+    The state marks every file as seen, so saving it after a timeout would skip the
+    tests that never ran until the files they import change again.
+    """
+    outputs = output if isinstance(output, list) else [output]
+    if any(isinstance(shard_output, TimedOutOutput) for shard_output in outputs):
+        logger.warning("Not saving the test impact state, since the tests timed out. The same tests run next time.")
+        return
+    record_impact_run(reports_dir, selection)
+
+
+def _run_suite(cmd: list[str], project_root: Path, configs: Configs, modules: Sequence[str] = ()) -> Any:
+    """
+    Run the whole suite, or only the given test modules, sharded if configs.unittest_shards is greater than 1.
+    """
+    if configs.unittest_shards > 1:
+        return _run_shards(cmd, project_root, configs, modules)
+
     print(f"Running command: {' '.join(cmd)}")
+    return _run_tests(cmd, project_root, configs, modules)
+
+
+def _run_tests(cmd: list[str], project_root: Path, configs: Configs, test_ids: Sequence[str] = ()) -> Any:
+    """
+    Run the whole suite, or only the given tests, in one process.
+
+    With configs.unittest_events, the text output is returned instead of the events
+    if the event runner did not write any, e.g. because it could not start.
+    Either is wrapped in a TimedOutOutput if the run timed out.
+    """
+    output: str | UnittestOutputParser | TimedOutOutput | None
+    if not configs.unittest_events:
+        output = _run_forked(cmd, project_root, configs, None, test_ids)
+        if output is not None:
+            return output
+        if test_ids:
+            cmd = cmd + ["-m", "unittest", *test_ids]
+        return _run_script(cmd, configs)
+
+    event_runner = Path(configs.ROOT_DIR) / "utils" / "for_tests" / "event_runner.py"
+    fd, events_path = tempfile.mkstemp(prefix="unittest_events_", suffix=".jsonl")
+    os.close(fd)
+    try:
+        output = _run_forked(cmd, project_root, configs, events_path, test_ids)
+        if output is None:
+            output = _run_script(cmd + [str(event_runner), events_path, str(project_root), *test_ids], configs)
+        events = _read_events(Path(events_path))
+    finally:
+        os.unlink(events_path)
+
+    if events is None:
+        logger.warning("The unittest event runner wrote no events. Parsing its text output instead.")
+        return output
+    if isinstance(output, TimedOutOutput):
+        return TimedOutOutput(events, output.timeout)
+    return events
+
+
+def _read_events(events_path: Path) -> Optional[UnittestEventParser]:
+    """
+    Read the events written by the event runner, or return None if there are none.
+    """
+    parser = UnittestEventParser()
+    with open(events_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                parser.feed(line)
+            except json.JSONDecodeError:
+                # The last line is cut off if the run was interrupted while writing it.
+                break
+    return parser if parser.run is not None or parser.test_ids else None
+
+
+def _run_shards(cmd: list[str], project_root: Path, configs: Configs, modules: Sequence[str] = ()) -> Any:
+    """
+    Discover the test IDs, split them into shards and run each shard in its own process.
+
+    If modules are given, only the tests in those modules are run, and no process
+    is started if none of the tests are in them.
+    Falls back to a single unsharded run if the test IDs cannot be discovered,
+    e.g. because a test module fails to import.
+    """
+    test_ids = _list_test_ids(cmd, project_root)
+    if not test_ids or any(test_id.startswith("unittest.loader.") for test_id in test_ids):
+        logger.warning("Could not discover test IDs for sharding. Running the tests in a single process.")
+        return _run_tests(cmd, project_root, configs, modules)
+    if modules:
+        prefixes = tuple(f"{module}." for module in modules)
+        test_ids = [test_id for test_id in test_ids if test_id.startswith(prefixes)]
+    if not test_ids:
+        # None of the tests are in the given modules.
+        return _NO_TESTS_OUTPUT
+
+    shards = shard_tests(test_ids, configs.unittest_shards, _load_test_durations(configs.reports_dir))
+    logger.info(f"Running {len(test_ids)} tests in {len(shards)} shards")
+
+    with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+        return list(executor.map(lambda shard: _run_tests(cmd, project_root, configs, shard), shards))
+
+
+def _list_test_ids(cmd: list[str], project_root: Path) -> list[str]:
+    """
+    List the IDs of all tests that discover would run, using the test virtual environment.
+    """
+    result = run_with_timeout(cmd + ["-c", _LIST_TEST_IDS, str(project_root)], timeout=30)
+    if result.timed_out:
+        raise RuntimeError("Test discovery timed out after 30 seconds")
+
+    return [
+        line[len(_TEST_ID_PREFIX):] for line in result.stdout.splitlines()
+        if line.startswith(_TEST_ID_PREFIX)
+    ]
+
+
+def _load_test_durations(reports_dir: Path) -> dict[str, float]:
+    """
+    Load per-test durations from the latest unittest report, if there is one.
+    """
+    return _load_latest_report(reports_dir).get("details", {}).get("test_durations") or {}
+
+
+def _load_latest_report(reports_dir: Path) -> dict[str, Any]:
+    """
+    Load the latest unittest JSON report, or an empty dict if there is none.
+    """
+    path = latest_report_path(reports_dir, "unittest")
+    if path is None:
+        return {}
+    try:
+        return read_report(path)
+    except (OSError, EOFError, ValueError):
+        return {}
+
+
+def _run_script(cmd: list[str], configs: Configs) -> str | UnittestOutputParser | TimedOutOutput:
+    """
+    Run the unittest shell script and return its combined output,
+    or the parser it was streamed to if configs.stream is set.
+
+    If the script runs for longer than configs.unittest_timeout, its process group is
+    stopped and the output written until then is returned in a TimedOutOutput.
+    """
+    timeout = configs.unittest_timeout or None
+    if configs.stream:
+        return _stream_script(cmd, timeout)
 
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-        if result.returncode != 0: # This should cause the try-except to be called.
-            raise subprocess.CalledProcessError(result.returncode, cmd, output=result.stdout, stderr=result.stderr)
-        logger.debug(f"Command output: {result.stdout}")
-
-        # Return the combined output and error
-        # This should happen if all tests pass.
-        return result.stdout + result.stderr
-    except subprocess.CalledProcessError as e: # NOTE This should be called if any of the tests fail.
-        if e.returncode != 0:
-            if "FAILED" in e.stdout:
-                return e.stdout + e.stderr
-            else:
-                raise RuntimeError(f"Command failed with exit code {e.returncode}\nstdout: {e.stdout}\nstderr: {e.stderr}\n") from e
-    except subprocess.TimeoutExpired as e:
-        raise RuntimeError(f"Command timed out: {e}") from e
+        result = run_with_timeout(cmd, timeout=timeout)
     except Exception as e:
-        raise RuntimeError(f"An unexpected error occurred: {e}") from e
\ No newline at end of file
+        raise RuntimeError(f"An unexpected error occurred: {e}") from e
+
+    return _check_result(result, timeout)
+
+
+def _run_forked(cmd: list[str], project_root: Path, configs: Configs, events_path: Optional[str],
+                test_ids: Sequence[str]) -> str | TimedOutOutput | None:
+    """
+    Run the tests in a child of the fork server if configs.unittest_fork_server is set.
+
+    Returns None if the fork server is not used or could not run the tests, so the
+    caller runs them with the shell script instead. Streaming needs the tool's output
+    as it is written, so configs.stream runs the tests without the fork server.
+    """
+    if not getattr(configs, "unittest_fork_server", False) or configs.stream:
+        return None
+
+    from utils.reports.unittest.fork_server import run_in_fork_server
+    timeout = configs.unittest_timeout or None
+    result = run_in_fork_server(cmd, project_root, Path(configs.reports_dir), timeout, events_path, test_ids)
+    if result is None:
+        logger.warning("Running the tests without the unittest fork server.")
+        return None
+    return _check_result(result, timeout)
+
+
+def _check_result(result: CommandResult, timeout: Optional[float]) -> str | TimedOutOutput:
+    """
+    Return the combined output of a test run, raising if the tests could not run at all.
+    """
+    if result.timed_out:
+        logger.warning(f"The tests timed out after {timeout} seconds. Parsing the output written until then.")
+        return TimedOutOutput(result.output, timeout)
+
+    # A non-zero exit code is expected if any of the tests fail.
+    if result.returncode != 0 and "FAILED" not in result.stdout:
+        raise RuntimeError(f"Command failed with exit code {result.returncode}\nstdout: {result.stdout}\nstderr: {result.stderr}\n")
+    logger.debug(f"Command output: {result.stdout}")
+
+    # Return the combined output and error
+    return result.output
+
+
+def _stream_script(cmd: list[str], timeout: Optional[float]) -> UnittestOutputParser | TimedOutOutput:
+    """
+    Run the unittest shell script, feeding its output to a parser while the tests run.
+    """
+    parser = UnittestOutputParser()
+    try:
+        returncode = stream_command(cmd, parser, timeout=timeout, label="unittest")
+    except subprocess.TimeoutExpired:
+        logger.warning(f"The tests timed out after {timeout} seconds. Parsing the output written until then.")
+        return TimedOutOutput(parser, timeout)
+    except Exception as e:
+        raise RuntimeError(f"An unexpected error occurred: {e}") from e
+
+    # A non-zero exit code is expected if any of the tests fail.
+    if returncode != 0 and not parser.failed:
+        output = "\n".join(parser.tail)
+        raise RuntimeError(f"Command failed with exit code {returncode}\noutput (last {len(parser.tail)} lines): {output}\n")
+    return parser
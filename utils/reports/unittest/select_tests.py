@@ -0,0 +1,236 @@
+"""
+Utility functions to select the unittest tests affected by changed files.
+"""
+from dataclasses import dataclass, field
+import fnmatch
+import json
+import os
+from pathlib import Path
+import re
+from typing import Any, Iterable, Optional
+
+
+from utils.common.enumerate_project_files import ProjectTree
+from utils.common.get_changed_files import get_changed_files
+from utils.common.import_graph import build_import_graph
+
+
+# Name of the file in the reports directory that holds the test dependency map
+# and the snapshot of the project's Python files at the last run.
+STATE_FILE = "test_impact.json"
+
+# Bump this when the shape of the state file changes, so old state is discarded.
+STATE_VERSION = 1
+
+# unittest names a failure "test_y (tests.test_x.TestX.test_y)" in its text output, and an
+# error in a fixture "setUpClass (tests.test_x.TestX)" or "setUpModule (tests.test_x)".
+# A failed subtest's parameters follow, e.g. "test_y (tests.test_x.TestX.test_y) (i=1)".
+_DESCRIBED_ID_PATTERN = re.compile(r'[^\s.]+ \(([^\s()]+)\)(?: \(.*\))?')
+
+# Prefix of the ID of the test unittest reports a module that failed to import as.
+_FAILED_IMPORT_PREFIX = "unittest.loader._FailedTest."
+
+
+@dataclass
+class ImpactSelection:
+    """
+    The tests chosen to run by impact analysis.
+
+    Attributes:
+        modules: Dotted names of the test modules to run, or None to run the whole suite
+        files: Relative paths of the test module files to run
+        skipped: IDs of the tests skipped as unaffected. Modules whose tests are not known
+            from earlier runs are listed by module name instead.
+        changed_files: Relative paths of the Python files changed since the last run or the git ref
+        reason: Why the whole suite is run, if it is
+        state: The state to save once the tests have run
+    """
+    modules: Optional[list[str]]
+    files: list[str] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    changed_files: list[str] = field(default_factory=list)
+    reason: str = ""
+    state: dict[str, Any] = field(default_factory=dict, repr=False)
+
+
+def plan_impact_run(
+    project_dir: Path,
+    tree: ProjectTree,
+    reports_dir: Path,
+    latest_report: dict[str, Any],
+    changed_since: Optional[str] = None,
+    full_run_every: int = 10,
+) -> ImpactSelection:
+    """
+    Choose the test modules that import, directly or indirectly, a changed file.
+
+    Each test module's dependencies are read from the project's static import graph.
+    Changed files are found with git if changed_since is set, and otherwise by comparing
+    the mtime and size of each Python file with the snapshot taken at the last run.
+    Test modules with failures or errors in the last report, including errors in their
+    fixtures and failures to import them, are always run again.
+
+    The whole suite is run instead if there is no previous run to compare against,
+    if files were deleted, if the last run had failures outside the known test modules,
+    or if full_run_every runs have passed since the last full run.
+
+    Args:
+        project_dir: The project directory, which the test modules are named relative to
+        tree: The project walk, from enumerate_project_files
+        reports_dir: Directory the state file and the import graph cache are kept in
+        latest_report: The last unittest JSON report, or an empty dict
+        changed_since: Optional git ref to find the changed files against
+        full_run_every: Run the whole suite at least once every this many runs
+
+    Returns:
+        ImpactSelection: The test modules to run and the tests skipped as unaffected
+    """
+    state = _load_state(reports_dir / STATE_FILE)
+    graph = build_import_graph(tree, reports_dir / "import_graph.json")
+    test_files = _test_module_files(tree)
+    dependencies = {module: sorted(graph.dependencies([path])) for path, module in test_files.items()}
+    snapshot = {
+        Path(project_file.relative_path).as_posix(): [project_file.mtime_ns, project_file.size]
+        for project_file in tree.files_with_suffix(".py")
+    }
+
+    # Test IDs per module, from the last report and, for modules it did not run, from earlier runs
+    known_tests = dict(state.get("tests", {}))
+    known_tests.update(_group_by_module(latest_report.get("details", {}).get("test_durations") or {}))
+    known_tests = {module: test_ids for module, test_ids in known_tests.items() if module in dependencies}
+
+    runs_since_full = state.get("runs_since_full", 0) + 1 if state else 0
+    new_state = {
+        "version": STATE_VERSION,
+        "runs_since_full": runs_since_full,
+        "files": snapshot,
+        "dependencies": dependencies,
+        "tests": known_tests,
+    }
+
+    if changed_since:
+        changed = set(get_changed_files(project_dir, changed_since)) & snapshot.keys()
+        deleted: set[str] = set()
+    elif state:
+        previous = state["files"]
+        changed = {path for path, stat in snapshot.items() if previous.get(path) != stat}
+        deleted = previous.keys() - snapshot.keys()
+    else:
+        changed, deleted = set(snapshot), set()
+
+    failures = [
+        test_case for test_case in latest_report.get("details", {}).get("test_cases", [])
+        if test_case.get("status") in ("FAIL", "ERROR")
+    ]
+    failed_modules = {_failed_module(test_case, dependencies.keys()) for test_case in failures}
+
+    reason = ""
+    if not state and not changed_since:
+        reason = "there is no previous impact-analysis run"
+    elif full_run_every > 0 and runs_since_full >= full_run_every:
+        reason = f"a full run is due every {full_run_every} runs"
+    elif deleted:
+        reason = f"{len(deleted)} files were deleted since the last run"
+    elif None in failed_modules:
+        reason = "the last run had failures outside the known test modules, e.g. a test package that failed to import"
+
+    if reason:
+        new_state["runs_since_full"] = 0
+        return ImpactSelection(None, changed_files=sorted(changed), reason=reason, state=new_state)
+
+    modules = [
+        module for module, module_dependencies in dependencies.items()
+        if module in failed_modules or not changed.isdisjoint(module_dependencies)
+    ]
+    skipped = []
+    for module in dependencies:
+        if module not in modules:
+            skipped.extend(known_tests.get(module, [module]))
+    return ImpactSelection(
+        modules=modules,
+        files=[path for path, module in test_files.items() if module in modules],
+        skipped=skipped,
+        changed_files=sorted(changed),
+        state=new_state,
+    )
+
+
+def record_impact_run(reports_dir: Path, selection: ImpactSelection) -> None:
+    """
+    Save the dependency map and file snapshot of a run, replacing the state file atomically.
+
+    Args:
+        reports_dir: Directory the state file is kept in
+        selection: The selection the tests were run with
+    """
+    state_path = reports_dir / STATE_FILE
+    temp_path = state_path.with_name(f"{state_path.name}.{os.getpid()}.tmp")
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(selection.state, f)
+    os.replace(temp_path, state_path)
+
+
+def _test_module_files(tree: ProjectTree) -> dict[str, str]:
+    """
+    Map the relative path of each test module that discover would find to its dotted name.
+    """
+    modules = {}
+    for project_file in tree.files_with_suffix(".py"):
+        relative_path = Path(project_file.relative_path).as_posix()
+        if fnmatch.fnmatch(relative_path.rsplit('/', 1)[-1], "test_*.py"):
+            modules[relative_path] = relative_path[:-len(".py")].replace('/', '.')
+    return dict(sorted(modules.items()))
+
+
+def _failed_module(test_case: dict[str, Any], test_modules: Iterable[str]) -> Optional[str]:
+    """
+    Return the test module a failure or error of the last run belongs to.
+
+    The module is read from the test's ID, since errors in setUpClass or setUpModule
+    have no module of their own, and a module that failed to import is reported as
+    a test of unittest's loader.
+
+    Args:
+        test_case: A FAIL or ERROR test case of the last report
+        test_modules: Dotted names of the project's test modules
+
+    Returns:
+        Optional[str]: The test module, or None if the failure is not in any of them
+    """
+    # Reports from before the IDs were kept only have the module.
+    test_id = test_case.get("id") or test_case.get("module", "")
+    described = _DESCRIBED_ID_PATTERN.fullmatch(test_id)
+    if described:
+        test_id = described.group(1)
+    test_id = test_id.removeprefix(_FAILED_IMPORT_PREFIX)
+
+    # The longest known module the ID starts with, e.g. tests.test_x for tests.test_x.TestX.test_y
+    modules = set(test_modules)
+    parts = test_id.split('.')
+    for end in range(len(parts), 0, -1):
+        module = '.'.join(parts[:end])
+        if module in modules:
+            return module
+    return None
+
+
+def _group_by_module(test_ids: Iterable[str]) -> dict[str, list[str]]:
+    """
+    Group test IDs such as "tests.test_x.TestX.test_y" by their module.
+    """
+    by_module: dict[str, list[str]] = {}
+    for test_id in sorted(test_ids):
+        by_module.setdefault(test_id.rsplit('.', 2)[0], []).append(test_id)
+    return by_module
+
+
+def _load_state(state_path: Path) -> dict[str, Any]:
+    """
+    Load the state of the last run, or nothing if it is missing or outdated.
+    """
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return state if state.get("version") == STATE_VERSION else {}
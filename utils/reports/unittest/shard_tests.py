@@ -0,0 +1,51 @@
+"""
+Utility function to split unittest test IDs into balanced shards.
+"""
+import heapq
+from statistics import median
+from typing import Optional
+
+
+def shard_tests(test_ids: list[str], shards: int, durations: Optional[dict[str, float]] = None) -> list[list[str]]:
+    """
+    Split test IDs into at most `shards` groups of roughly equal cost.
+
+    Tests are kept together per test class so that setUpClass/tearDownClass
+    fixtures only run once. Each class is weighted by the historical duration
+    of its tests when any are known (unknown tests get the median known duration),
+    otherwise by its number of tests. Classes are then assigned greedily,
+    heaviest first, to the shard with the least work so far.
+
+    Args:
+        test_ids: Fully qualified test IDs, e.g. "tests.test_x.TestX.test_y"
+        shards: Maximum number of shards to create
+        durations: Optional mapping of test ID to its last known duration in seconds
+
+    Returns:
+        list[list[str]]: Non-empty shards, each in the original discovery order
+    """
+    if shards < 1:
+        raise ValueError(f"shards must be at least 1, got {shards}.")
+
+    durations = durations or {}
+    known = [durations[test_id] for test_id in test_ids if test_id in durations]
+    default_weight = median(known) if known else 1.0
+
+    # Group tests by class, remembering the discovery order.
+    groups: dict[str, list[int]] = {}
+    weights: dict[str, float] = {}
+    for index, test_id in enumerate(test_ids):
+        class_id = test_id.rsplit('.', 1)[0]
+        groups.setdefault(class_id, []).append(index)
+        weight = durations.get(test_id, default_weight) if known else 1.0
+        weights[class_id] = weights.get(class_id, 0.0) + weight
+
+    # Longest-processing-time-first assignment.
+    heap = [(0.0, shard) for shard in range(min(shards, len(groups)))]
+    assigned: list[list[int]] = [[] for _ in heap]
+    for class_id in sorted(groups, key=lambda class_id: (-weights[class_id], groups[class_id][0])):
+        load, shard = heapq.heappop(heap)
+        assigned[shard].extend(groups[class_id])
+        heapq.heappush(heap, (load + weights[class_id], shard))
+
+    return [[test_ids[index] for index in sorted(indices)] for indices in assigned if indices]